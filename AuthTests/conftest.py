@@ -0,0 +1,102 @@
+# Offline test suite for the auth Lambdas.
+#
+# Every lambda_handler runs in-process against the Cognito stand-in in
+# LambdaTools/fakeCognito.py, so the whole auth matrix needs no AWS account
+# and no network:
+#
+#   python -m pytest AuthTests -q
+#   python -m pytest AuthTests -q -n auto    # in parallel, with pytest-xdist
+#
+# Each test gets a fresh stand-in and cleared warm-container caches, so tests
+# never depend on each other's order or on which worker runs them.
+#
+# The modules of DB_Handling are importable too and are tested with stubbed
+# cursors, so they need no MySQL either. lambdaDBHandling gets placeholder
+# DB_* settings and a stub connection (test_offline_dbHandler.py).
+#
+# test_login.py, test_passwordReset.py, test_signOut.py and
+# test_tokenRefresh.py are scripts that post to the deployed API Gateway and
+# only print the responses. They are kept out of collection and still run
+# with `python AuthTests/test_login.py`.
+
+import json
+import os
+import sys
+import time
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, 'LambdaFuncsAuth'), os.path.join(ROOT, 'LambdaTools'), os.path.join(ROOT, 'DB_Handling'),
+                os.path.join(ROOT, 'LambdaShared')]
+
+collect_ignore = ['test_login.py', 'test_passwordReset.py', 'test_signOut.py', 'test_tokenRefresh.py']
+
+import fakeCognito
+
+# The handlers read these at import time, so they are set before any import
+os.environ['COGNITO_CLIENT_ID'] = fakeCognito.DEFAULT_CLIENT_ID
+os.environ['COGNITO_USER_POOL_ID'] = fakeCognito.DEFAULT_USER_POOL_ID
+for name, value in (('DB_HOST', 'localhost'), ('DB_USER', 'offline'), ('DB_PASSWORD', 'offline'), ('DB_NAME', 'offline')):
+    os.environ[name] = value
+for name in ('DB_HANDLER_FUNCTION', 'TOKEN_REFRESH_CACHE_DB', 'LOG_SAMPLE_RATE', 'TRACE_SAMPLE_RATE', 'TRACE_FILE'):
+    os.environ.pop(name, None)
+
+import cognitoClient
+import cognitoThrottle
+import lambdaInitiateForgotPWD
+import refreshCache
+import tokenValidation
+
+# Users every test starts with, mirroring the accounts the live scripts use
+CONFIRMED_USER = ('kela_02', 'Kels@123')
+UNCONFIRMED_USER = ('keerthi_06', 'Keerthi@007')
+TEMP_PASSWORD_USER = ('cn_amal', 'Temp#Pass1')
+
+class FakeLambdaContext:
+    def __init__(self, remaining_ms=30000):
+        self.deadline = time.monotonic() + remaining_ms / 1000
+
+    def get_remaining_time_in_millis(self):
+        return max(int((self.deadline - time.monotonic()) * 1000), 0)
+
+@pytest.fixture(autouse=True)
+def cognito(monkeypatch):
+    stand_in = fakeCognito.FakeCognito()
+    stand_in.add_user(*CONFIRMED_USER)
+    stand_in.add_user(*UNCONFIRMED_USER, status='UNCONFIRMED')
+    stand_in.add_user(*TEMP_PASSWORD_USER, status='FORCE_CHANGE_PASSWORD')
+
+    monkeypatch.setattr(cognitoClient, '_client', stand_in)
+
+    # Start every test from a cold container, with the stand-in's signing key
+    # already in the JWKS cache so access tokens are verified for real
+    cognitoThrottle._buckets.clear()
+    refreshCache._results.clear()
+    lambdaInitiateForgotPWD._user_status_cache.clear()
+    monkeypatch.setattr(tokenValidation, '_jwks', {
+        'keys': stand_in.signing_keys(),
+        'fetched_at': time.time(),
+        'failed_at': 0
+    })
+    return stand_in
+
+@pytest.fixture
+def context():
+    return FakeLambdaContext()
+
+@pytest.fixture
+def invoke(context):
+    # Calls a handler the way API Gateway does and returns (statusCode, parsed body)
+    def call(handler, event):
+        response = handler.lambda_handler(event, context)
+        return response['statusCode'], json.loads(response['body'])
+    return call
+
+@pytest.fixture
+def tokens(invoke):
+    # Tokens from a real sign-in of the confirmed user
+    import lambdaSignIn
+    username, password = CONFIRMED_USER
+    status, body = invoke(lambdaSignIn, {'username': username, 'password': password})
+    assert status == 200
+    return body['tokens']
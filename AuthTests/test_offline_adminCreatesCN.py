@@ -0,0 +1,58 @@
+import lambdaAdminCreatesCN
+from conftest import CONFIRMED_USER
+
+def test_create_care_navigator(invoke, cognito):
+    status, body = invoke(lambdaAdminCreatesCN, {'username': 'cn_sunil', 'email': 'sunil@example.com'})
+
+    assert status == 200
+    assert body['user']['status'] == 'FORCE_CHANGE_PASSWORD'
+    assert cognito.users['cn_sunil']['email'] == 'sunil@example.com'
+
+def test_create_requires_username_and_email(invoke, cognito):
+    status, body = invoke(lambdaAdminCreatesCN, {'username': 'cn_sunil'})
+
+    assert status == 400
+    assert body['code'] == 'InvalidParameterException'
+    assert cognito.calls == []
+
+def test_create_existing_username(invoke):
+    status, body = invoke(lambdaAdminCreatesCN, {'username': CONFIRMED_USER[0], 'email': 'x@example.com'})
+
+    assert status == 409
+    assert body['code'] == 'UsernameExistsException'
+
+def test_bulk_create(invoke, cognito):
+    users = [{'username': f'cn_{i}', 'email': f'cn_{i}@example.com'} for i in range(20)]
+
+    status, body = invoke(lambdaAdminCreatesCN, {'users': users})
+
+    assert status == 200
+    assert all(result['success'] for result in body['results'])
+    assert body['database'] == {'inserted': 0, 'skipped': 'DB_HANDLER_FUNCTION is not configured'}
+    assert all(f'cn_{i}' in cognito.users for i in range(20))
+
+def test_bulk_create_partial_failure(invoke):
+    users = [
+        {'username': 'cn_new', 'email': 'new@example.com'},
+        {'username': CONFIRMED_USER[0], 'email': 'dup@example.com'},
+        {'username': 'cn_no_email'}
+    ]
+
+    status, body = invoke(lambdaAdminCreatesCN, {'users': users})
+
+    assert status == 207
+    assert [result['success'] for result in body['results']] == [True, False, False]
+    assert [result.get('code') for result in body['results'][1:]] == ['UsernameExistsException', 'InvalidParameterException']
+
+def test_bulk_create_rejects_empty_list(invoke):
+    assert invoke(lambdaAdminCreatesCN, {'users': []})[0] == 400
+
+def test_bulk_create_invalid_items(invoke, cognito):
+    users = ['bob', None, {'username': 5, 'email': 'five@example.com'}, {'username': 'cn_ok', 'email': 'ok@example.com'}]
+
+    status, body = invoke(lambdaAdminCreatesCN, {'users': users})
+
+    assert status == 207
+    assert [result['success'] for result in body['results']] == [False, False, False, True]
+    assert all(result['code'] == 'InvalidParameterException' for result in body['results'][:3])
+    assert cognito.call_count('admin_create_user') == 1
@@ -0,0 +1,182 @@
+import json
+from datetime import datetime
+from types import SimpleNamespace
+import pymysql
+import pytest
+import appointmentStats
+import lambdaDBHandling
+import navigatorClients
+import slotAvailability
+from conftest import FakeLambdaContext
+
+class StubCursor:
+    # Answers each execute with the next queued result: a list of rows, a
+    # row count for writes, or an exception to raise
+    def __init__(self, results):
+        self.results = results
+        self.statements = []
+        self.rows = []
+        self.lastrowid = None
+
+    def execute(self, sql, params=None):
+        self.statements.append((sql, params))
+        result = self.results.pop(0) if self.results else []
+        if isinstance(result, Exception):
+            raise result
+        if isinstance(result, int):
+            self.rows = []
+            return result
+        self.rows = list(result)
+        return len(self.rows)
+
+    def executemany(self, sql, params):
+        self.statements.append((sql, params))
+        return len(params)
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class StubConnection:
+    def __init__(self):
+        self.results = []
+        self.cursors = []
+        self.commits = 0
+        self.commit_error = None
+        self.open = True
+
+    def cursor(self, cursorclass=None):
+        cursor = StubCursor(self.results)
+        self.cursors.append(cursor)
+        return cursor
+
+    def statements(self):
+        return [sql for cursor in self.cursors for sql, _ in cursor.statements]
+
+    def commit(self):
+        if self.commit_error is not None:
+            raise self.commit_error
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def ping(self, reconnect=True):
+        pass
+
+    def close(self):
+        self.open = False
+
+@pytest.fixture
+def db(monkeypatch):
+    conn = StubConnection()
+    monkeypatch.setattr(pymysql, 'connect', lambda **kwargs: conn)
+    monkeypatch.setattr(lambdaDBHandling, '_roles', {})
+    monkeypatch.setattr(slotAvailability, '_index', {})
+    monkeypatch.setattr(appointmentStats, '_stats', {})
+    monkeypatch.setattr(navigatorClients, '_caseloads', {})
+    monkeypatch.setattr(navigatorClients, '_navigator_of', {})
+    lambdaDBHandling.discard_connection()
+    yield conn
+    lambdaDBHandling.discard_connection()
+
+@pytest.fixture
+def internal(context):
+    # Invoked by the auth Lambdas, so no access token is needed
+    context.client_context = SimpleNamespace(custom={'caller': 'LambdaFuncsAuth'})
+    return context
+
+def call(context, action, data):
+    result = lambdaDBHandling.lambda_handler({'action': action, 'data': data}, context)
+    return result['statusCode'], json.loads(result['body'])
+
+def test_overlapping_booking_is_refused(db, internal):
+    db.results.append(0)    # the conditional insert found a clash
+
+    status, body = call(internal, 'create_appointment', {
+        'client_username': 'kela_02',
+        'local_start_time': '2026-10-20T04:00:00Z'
+    })
+
+    assert status == 409
+    assert body['error'] == 'The client or their care navigator already has an appointment at this time'
+    assert len(db.statements()) == 1
+
+def test_exhausted_budget_answers_without_the_database(db):
+    context = FakeLambdaContext(remaining_ms=lambdaDBHandling.RESPONSE_MARGIN_MS)
+    context.client_context = SimpleNamespace(custom={'caller': 'LambdaFuncsAuth'})
+
+    status, body = call(context, 'get_user_status', {'username': 'kela_02'})
+
+    assert (status, body['code'], body['retryable']) == (503, 'QueryTimeout', True)
+    assert db.cursors == []
+
+def test_query_stopped_by_mysql_is_a_timeout(db, internal):
+    db.results.append(pymysql.err.OperationalError(lambdaDBHandling.MAX_EXECUTION_TIME_EXCEEDED, 'Query execution was interrupted'))
+
+    status, body = call(internal, 'get_user_status', {'username': 'kela_02'})
+
+    assert (status, body['code'], body['retryable']) == (503, 'QueryTimeout', True)
+    assert 'MAX_EXECUTION_TIME' in db.statements()[0]
+
+def test_unanswered_commit_reports_unknown_state(db, internal):
+    db.results.append(1)
+    db.commit_error = pymysql.err.OperationalError(lambdaDBHandling.SERVER_LOST, 'Lost connection to MySQL server during query')
+
+    status, body = call(internal, 'active_user', {'username': 'kela_02'})
+
+    assert (status, body['code'], body['commit_state'], body['retryable']) == (503, 'CommitTimeout', 'unknown', False)
+
+def test_readiness_stream_matches_usernames_case_insensitively(db, internal):
+    db.results.append([{
+        'client_username': 'kela_02',
+        'questionnaire_data': '{"q1": true}',
+        'client_note': 'Prefers mornings',
+        'appointment_date_time': datetime(2026, 10, 20, 9, 30)
+    }])
+
+    status, body = call(internal, 'get_clients_readiness_details', {'client_usernames': ['Kela_02', 'nimal_10']})
+
+    assert status == 200
+    assert [entry['client_username'] for entry in body['data']] == ['kela_02']
+    assert body['data'][0]['client_note'] == 'Prefers mornings'
+    assert body['not_found'] == ['nimal_10']
+    assert body['total_clients'] == 1
+
+@pytest.mark.parametrize('action', ['cancel_appointment', 'complete_appointment'])
+def test_finished_appointment_drops_its_navigators_caches(db, internal, action):
+    slotAvailability._index.update({'cn_amal': object(), 'cn_kamal': object()})
+    appointmentStats._stats.update({'cn_amal': {}, 'cn_kamal': {}})
+    db.results.extend([
+        [{'appointment_id': 41}],                       # latest active appointment
+        1,                                              # status update
+        [{'care_navigator_username': 'cn_amal'}],       # navigator it was booked with
+    ])
+
+    status, _ = call(internal, action, {'client_username': 'kela_02'})
+
+    assert status == 200
+    assert db.commits == 1
+    assert list(slotAvailability._index) == ['cn_kamal']
+    assert list(appointmentStats._stats) == ['cn_kamal']
+
+def test_created_user_drops_cached_role(db, internal):
+    lambdaDBHandling.remember_role('cn_new', 0)
+    db.results.append(1)
+
+    status, _ = call(internal, 'create_user', {
+        'username': 'cn_new', 'email': 'cn_new@example.com', 'role': 1, 'status': 1,
+        'created_at': '2026-10-19 10:00:00'
+    })
+
+    assert status == 200
+    assert lambdaDBHandling.cached_role('cn_new') is None
@@ -0,0 +1,288 @@
+import base64
+import time
+from datetime import date, datetime, timedelta, timezone
+import pytest
+import callerIdentity
+import navigatorClients
+from callerIdentity import CallerIdentityError, check_access, signature_valid, verify_token
+from caseloadRebalance import caseload_counts, plan_moves
+from navigatorClients import clients_of, clients_of_many, invalidate_client, navigator_assigned
+from slotAvailability import COLOMBO_TZ, SlotIndex, merge_intervals
+
+class StubCursor:
+    # Answers each execute with the next queued result set
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+        self.rows = []
+
+    def execute(self, sql, params=None):
+        self.statements.append((sql, params))
+        self.rows = self.results.pop(0) if self.results else []
+        return len(self.rows)
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+@pytest.fixture
+def jwks(cognito, monkeypatch):
+    monkeypatch.setattr(callerIdentity, '_jwks', {
+        'keys': cognito.signing_keys(),
+        'fetched_at': time.time(),
+        'failed_at': 0
+    })
+    monkeypatch.setattr(callerIdentity, '_verified', {})
+
+def access_claims(cognito, **changes):
+    now = int(time.time())
+    claims = {'sub': 'sub-1', 'iss': cognito.issuer(), 'iat': now, 'exp': now + 3600,
+              'token_use': 'access', 'client_id': cognito.client_id, 'username': 'Kela_02'}
+    claims.update(changes)
+    return claims
+
+def test_verify_token_accepts_cognito_token(cognito, jwks):
+    token = cognito.issue_tokens('kela_02')['AccessToken']
+
+    assert verify_token(token)['username'] == 'kela_02'
+    assert callerIdentity.username_for_token(cognito.jwt(access_claims(cognito))) == 'kela_02'
+
+@pytest.mark.parametrize('changes', [
+    {'token_use': 'id'},
+    {'iss': 'https://cognito-idp.ap-south-1.amazonaws.com/ap-south-1_Other'},
+    {'client_id': 'another-client'},
+    {'username': ''},
+])
+def test_verify_token_rejects_wrong_claims(cognito, jwks, changes):
+    with pytest.raises(CallerIdentityError, match='Invalid access token'):
+        verify_token(cognito.jwt(access_claims(cognito, **changes)))
+
+def test_verify_token_rejects_expired_token(cognito, jwks):
+    with pytest.raises(CallerIdentityError, match='expired'):
+        verify_token(cognito.jwt(access_claims(cognito, exp=int(time.time()) - 1)))
+
+def test_verify_token_rejects_tampering(cognito, jwks):
+    header, claims, signature = cognito.jwt(access_claims(cognito)).split('.')
+    other_claims = cognito.jwt(access_claims(cognito, username='cn_amal')).split('.')[1]
+    other_header = base64.urlsafe_b64encode(b'{"kid": "fake-key-1", "alg": "none"}').decode().rstrip('=')
+
+    for token in (f'{header}.{other_claims}.{signature}',     # claims swapped under a valid signature
+                  f'{header}.{claims}.{signature[:-4]}AAAA',  # signature altered
+                  f'{header}.{claims}.{signature[:-8]}',      # signature truncated
+                  f'{other_header}.{claims}.{signature}',     # algorithm downgraded
+                  'not-a-token', None):
+        with pytest.raises(CallerIdentityError):
+            verify_token(token)
+
+def test_verify_token_rejects_unknown_key(cognito, jwks):
+    header = base64.urlsafe_b64encode(b'{"kid": "other-key", "alg": "RS256"}').decode().rstrip('=')
+    _, claims, signature = cognito.jwt(access_claims(cognito)).split('.')
+
+    with pytest.raises(CallerIdentityError, match='Invalid access token'):
+        verify_token(f'{header}.{claims}.{signature}')
+
+def test_signature_valid_checks_padding_and_digest(cognito):
+    [(n, e)] = cognito.signing_keys().values()
+    key_length = (n.bit_length() + 7) // 8
+    header, claims, signature = cognito.jwt({'a': 1}).split('.')
+    message = f'{header}.{claims}'.encode()
+    signature = callerIdentity.b64url_decode(signature)
+
+    assert signature_valid(message, signature, n, e)
+    assert not signature_valid(b'header.claims', signature, n, e)
+    assert not signature_valid(message, b'\x00' * key_length, n, e)
+    assert not signature_valid(message, b'\x01' * (key_length + 1), n, e)
+
+def test_check_access_allows_self_and_unrestricted_actions():
+    cursor = StubCursor()
+
+    assert check_access(cursor, 'kela_02', 'get_user_role', {'username': 'Kela_02'}) is None
+    assert check_access(cursor, 'kela_02', 'rebalance_caseloads', {'username': 'someone_else'}) is None
+    assert check_access(cursor, None, 'get_user_role', {'username': 'someone_else'}) is None
+    assert check_access(cursor, 'kela_02', 'get_user_role', {}) is None
+    assert cursor.statements == []
+
+def test_check_access_denies_other_users():
+    cursor = StubCursor()
+
+    assert check_access(cursor, 'kela_02', 'get_user_role', {'username': 'cn_amal'}) == "Not allowed to access 'cn_amal'"
+    assert check_access(cursor, 'kela_02', 'get_user_role', {'username': 42}) == "'username' must be a string"
+    assert cursor.statements == []
+
+def test_check_access_profile_and_calendly_rules():
+    cursor = StubCursor([])
+
+    assert check_access(cursor, 'kela_02', 'create_user', {'username': 'cn_amal'}) == "Not allowed to access 'cn_amal'"
+    assert check_access(cursor, 'kela_02', 'get_cn_calendly_name', {'cn_username': 'cn_kamal'}) == "Not allowed to access 'cn_kamal'"
+    assert check_access(cursor, 'cn_kamal', 'get_cn_calendly_name', {'cn_username': 'cn_kamal'}) is None
+
+def test_token_required_by_default(cognito, jwks):
+    def identify(body, headers=None):
+        return callerIdentity.caller_identity({'headers': headers or {}}, body, None)
+
+    with pytest.raises(CallerIdentityError, match='required'):
+        identify({'action': 'get_user_role', 'data': {'username': 'kela_02'}})
+    assert identify({'action': 'confirmed_client', 'data': {'username': 'kela_02'}}) is None
+
+    token = cognito.issue_tokens('kela_02')['AccessToken']
+    assert identify({'action': 'get_user_role'}, {'Authorization': f'Bearer {token}'}) == 'kela_02'
+
+def test_check_access_navigator_of_client():
+    cursor = StubCursor([{'1': 1}], [])
+
+    assert check_access(cursor, 'cn_amal', 'get_client_details', {'username': 'kela_02'}) is None
+    assert check_access(cursor, 'cn_amal', 'get_client_details', {'username': 'nimal_10'}) == "Not allowed to access 'nimal_10'"
+    assert [params for _, params in cursor.statements] == [('kela_02', 'cn_amal'), ('nimal_10', 'cn_amal')]
+
+def test_check_access_client_of_navigator():
+    cursor = StubCursor([{'1': 1}])
+
+    assert check_access(cursor, 'kela_02', 'get_available_slots', {'care_navigator_username': 'cn_amal'}) is None
+    assert cursor.statements[0][1] == ('kela_02', 'cn_amal')
+
+def test_check_access_bulk_clients_in_one_query():
+    cursor = StubCursor([{'client_username': 'Kela_02'}], [{'client_username': 'kela_02'}])
+    data = {'client_usernames': ['cn_amal', 'kela_02', 'nimal_10']}
+
+    assert check_access(cursor, 'cn_amal', 'get_clients_readiness_details', {'client_usernames': ['cn_amal', 'kela_02']}) is None
+    assert check_access(cursor, 'cn_amal', 'get_clients_readiness_details', data) == "Not allowed to access 'nimal_10'"
+    assert len(cursor.statements) == 2
+    assert cursor.statements[1][1] == ['cn_amal', 'kela_02', 'nimal_10']
+
+def test_check_access_bulk_self_list():
+    data = {'care_navigator_usernames': ['cn_amal', 'cn_kamal']}
+
+    assert check_access(StubCursor(), 'cn_amal', 'get_navigators_clients', {'care_navigator_usernames': ['CN_AMAL']}) is None
+    assert check_access(StubCursor(), 'cn_amal', 'get_navigators_clients', data) == "Not allowed to access 'cn_kamal'"
+
+def utc(day, hour, minute=0):
+    # A Colombo wall-clock time as an aware UTC datetime
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=COLOMBO_TZ).astimezone(timezone.utc)
+
+MONDAY = date(2026, 10, 19)
+MORNING = {0: [(9 * 60, 11 * 60)]}   # Mondays, 09:00 - 11:00
+
+def slot_starts(slots):
+    return [datetime.fromisoformat(slot['start']).astimezone(COLOMBO_TZ).strftime('%a %H:%M') for slot in slots]
+
+def test_merge_intervals():
+    assert merge_intervals([]) == []
+    assert merge_intervals([(5, 7), (1, 3), (2, 4), (4, 5), (10, 12), (10, 11)]) == [(1, 7), (10, 12)]
+    assert merge_intervals([(1, 10), (2, 3)]) == [(1, 10)]
+
+def test_free_slots_skip_busy_time():
+    busy = merge_intervals([(utc(MONDAY, 9, 30), utc(MONDAY, 10))])
+    index = SlotIndex(MORNING, busy, utc(MONDAY, 0))
+
+    slots = index.free_slots(MONDAY, MONDAY, 30, utc(MONDAY, 0))
+
+    assert slot_starts(slots) == ['Mon 09:00', 'Mon 10:00', 'Mon 10:30']
+    assert slots[0] == {'start': utc(MONDAY, 9).isoformat(), 'end': utc(MONDAY, 9, 30).isoformat()}
+
+def test_free_slots_overlapping_and_past_appointments():
+    # 09:45 - 10:15 blocks two slots; the past ones are never offered
+    busy = merge_intervals([(utc(MONDAY, 9, 45), utc(MONDAY, 10, 15)), (utc(MONDAY, 9, 50), utc(MONDAY, 10, 5))])
+    index = SlotIndex(MORNING, busy, utc(MONDAY, 0))
+
+    assert slot_starts(index.free_slots(MONDAY, MONDAY, 30, utc(MONDAY, 0))) == ['Mon 09:00', 'Mon 10:30']
+    assert slot_starts(index.free_slots(MONDAY, MONDAY, 30, utc(MONDAY, 10, 10))) == ['Mon 10:30']
+
+def test_free_slots_over_several_days():
+    hours = {0: [(9 * 60, 10 * 60), (14 * 60, 15 * 60)], 2: [(9 * 60, 10 * 60)]}
+    busy = [(utc(MONDAY, 14), utc(MONDAY, 14, 30))]
+    index = SlotIndex(hours, busy, utc(MONDAY, 0))
+
+    slots = index.free_slots(MONDAY, MONDAY + timedelta(days=6), 60, utc(MONDAY, 0))
+
+    assert slot_starts(slots) == ['Mon 09:00', 'Wed 09:00']
+
+def test_free_slots_ignore_partial_windows():
+    index = SlotIndex({0: [(9 * 60, 9 * 60 + 50)]}, [], utc(MONDAY, 0))
+
+    assert slot_starts(index.free_slots(MONDAY, MONDAY, 30, utc(MONDAY, 0))) == ['Mon 09:00']
+
+def test_plan_moves_balances_with_fewest_moves():
+    assignments = {'c1': 'cn_a', 'c2': 'cn_a', 'c3': 'cn_a', 'c4': 'cn_a', 'c5': 'cn_b'}
+
+    moves = plan_moves(['cn_a', 'cn_b', 'cn_c'], assignments)
+
+    assert len(moves) == 2
+    assert all(source == 'cn_a' for _, source, _ in moves)
+    assert sorted(caseload_counts(['cn_a', 'cn_b', 'cn_c'], assignments, moves).values()) == [1, 2, 2]
+    assert plan_moves(['cn_a', 'cn_b'], {'c1': 'cn_a', 'c2': 'cn_b', 'c3': 'cn_b'}) == []
+    assert plan_moves([], assignments) == []
+
+def test_plan_moves_orphans_and_booked_clients():
+    assignments = {'c1': 'cn_a', 'c2': 'cn_a', 'c3': 'cn_a', 'c4': 'cn_gone'}
+
+    moves = plan_moves(['cn_a', 'cn_b'], assignments, booked={'c1', 'c2'})
+
+    assert moves == [('c4', 'cn_gone', 'cn_b'), ('c3', 'cn_a', 'cn_b')]
+
+def test_plan_moves_fills_every_receiving_navigator():
+    # Only orphans, all of them moving: the receiving heap runs out exactly
+    # as the last client is placed
+    assignments = {f'c{i}': 'cn_gone' for i in range(7)}
+
+    moves = plan_moves(['cn_a', 'cn_b', 'cn_c'], assignments)
+
+    assert len(moves) == 7
+    assert caseload_counts(['cn_a', 'cn_b', 'cn_c'], assignments, moves) == {'cn_a': 3, 'cn_b': 2, 'cn_c': 2}
+
+def test_plan_moves_repeated_navigator_does_not_exhaust_heap():
+    assignments = {'c1': 'cn_gone', 'c2': 'cn_gone', 'c3': 'cn_b'}
+
+    moves = plan_moves(['cn_a', 'cn_a', 'cn_b'], assignments)
+
+    assert caseload_counts(['cn_a', 'cn_b'], assignments, moves) == {'cn_a': 1, 'cn_b': 2}
+    assert plan_moves(['cn_a', 'cn_a'], {'c1': 'cn_gone'}) == [('c1', 'cn_gone', 'cn_a')]
+
+@pytest.fixture
+def caseloads(monkeypatch):
+    monkeypatch.setattr(navigatorClients, '_caseloads', {})
+    monkeypatch.setattr(navigatorClients, '_navigator_of', {})
+
+def caseload_rows(navigator, *clients):
+    return [{'care_navigator_username': navigator, 'client_username': client} for client in clients]
+
+@pytest.mark.usefixtures('caseloads')
+def test_caseloads_keep_query_order_and_ignore_case():
+    # Rows come back in the database's collation order, which is kept as is
+    cursor = StubCursor(caseload_rows('CN_Amal', 'Zara_1', 'amal_c', 'Kela_02'))
+
+    assert clients_of(cursor, 'cn_amal') == ['Zara_1', 'amal_c', 'Kela_02']
+    assert 'ORDER BY care_navigator_username, client_username' in cursor.statements[0][0]
+    assert cursor.statements[0][1] == ['cn_amal']
+    assert clients_of_many(cursor, ['CN_AMAL', 'cn_amal']) == {
+        'CN_AMAL': ['Zara_1', 'amal_c', 'Kela_02'],
+        'cn_amal': ['Zara_1', 'amal_c', 'Kela_02'],
+    }
+    assert len(cursor.statements) == 1
+
+@pytest.mark.usefixtures('caseloads')
+def test_assignment_moves_client_between_cached_lists():
+    cursor = StubCursor(caseload_rows('cn_amal', 'c1', 'c2') + caseload_rows('cn_kamal', 'c3'))
+    clients_of_many(cursor, ['cn_amal', 'cn_kamal'])
+
+    navigator_assigned('C2', 'CN_Kamal')
+
+    assert clients_of(cursor, 'cn_amal') == ['c1']
+    # The receiving list is read again, in order
+    cursor.results.append(caseload_rows('cn_kamal', 'c2', 'c3'))
+    assert clients_of(cursor, 'cn_kamal') == ['c2', 'c3']
+
+@pytest.mark.usefixtures('caseloads')
+def test_load_overtaken_by_a_change_is_not_stored():
+    class RacingCursor(StubCursor):
+        def fetchall(self):
+            # Another request reassigns a client while the rows are read
+            invalidate_client('c1')
+            navigator_assigned('c9', 'cn_amal')
+            return super().fetchall()
+
+    cursor = RacingCursor(caseload_rows('cn_amal', 'c1'))
+
+    assert clients_of(cursor, 'cn_amal') == ['c1']
+    assert clients_of(StubCursor(caseload_rows('cn_amal', 'c1', 'c9')), 'cn_amal') == ['c1', 'c9']
@@ -0,0 +1,130 @@
+import cognitoThrottle
+import lambdaConfirmForgotPWD
+import lambdaInitiateForgotPWD
+import lambdaNewTempPWDResquest
+import lambdaPasswordReset
+import lambdaSignIn
+from conftest import CONFIRMED_USER, UNCONFIRMED_USER
+
+USERNAME, PASSWORD = CONFIRMED_USER
+
+def change_password(invoke, tokens, previous_password, new_password):
+    return invoke(lambdaPasswordReset, {
+        'previous_password': previous_password,
+        'new_password': new_password,
+        'access_token': tokens['accessToken']
+    })
+
+def sign_in(invoke, username, password):
+    return invoke(lambdaSignIn, {'username': username, 'password': password})[0]
+
+# ---- lambdaPasswordReset (signed-in password change) ----
+
+def test_change_password(invoke, tokens):
+    status, body = change_password(invoke, tokens, PASSWORD, 'NewKela@123')
+
+    assert status == 200
+    assert body['success'] is True
+    assert sign_in(invoke, USERNAME, 'NewKela@123') == 200
+    assert sign_in(invoke, USERNAME, PASSWORD) == 401
+
+def test_change_password_missing_fields(invoke, tokens):
+    status, body = change_password(invoke, tokens, '', 'NewKela@123')
+
+    assert status == 404
+    assert body['code'] == 'InvalidParameterException'
+
+def test_change_password_wrong_previous_password(invoke, tokens):
+    status, body = change_password(invoke, tokens, 'WrongPassword@123', 'NewKela@123')
+
+    assert status == 401
+    assert body['code'] == 'NotAuthorizedException'
+
+def test_change_password_weak_new_password(invoke, tokens):
+    status, body = change_password(invoke, tokens, PASSWORD, '123')
+
+    assert status == 400
+    assert body['code'] == 'InvalidPasswordException'
+
+def test_change_password_invalid_token(invoke, cognito):
+    status, body = change_password(invoke, {'accessToken': 'invalid'}, PASSWORD, 'NewKela@123')
+
+    assert status == 401
+    assert body['message'] == 'Invalid Access Token'
+    assert cognito.call_count('change_password') == 0
+
+# ---- forgot password (initiate + confirm) ----
+
+def test_forgot_password_flow(invoke, cognito):
+    status, body = invoke(lambdaInitiateForgotPWD, {'username': USERNAME})
+
+    assert status == 200
+    assert body['delivery'] == {'destination': 'k***@e***', 'medium': 'EMAIL'}
+
+    code, _ = cognito.codes[USERNAME]
+    status, body = invoke(lambdaConfirmForgotPWD, {'username': USERNAME, 'code': code, 'password': 'Reset@1234'})
+
+    assert status == 200
+    assert sign_in(invoke, USERNAME, 'Reset@1234') == 200
+
+def test_forgot_password_unknown_user_is_cached(invoke, cognito):
+    for _ in range(3):
+        status, body = invoke(lambdaInitiateForgotPWD, {'username': 'GhostUser123'})
+        assert status == 404
+        assert body['code'] == 'UserNotFoundException'
+
+    assert cognito.call_count('admin_get_user') == 1
+
+def test_forgot_password_unconfirmed_user(invoke, cognito):
+    status, body = invoke(lambdaInitiateForgotPWD, {'username': UNCONFIRMED_USER[0]})
+
+    assert status == 400
+    assert body['code'] == 'UserNotConfirmedException'
+    assert cognito.call_count('forgot_password') == 0
+
+def test_forgot_password_requires_username(invoke):
+    assert invoke(lambdaInitiateForgotPWD, {})[0] == 404
+
+def test_confirm_with_wrong_code(invoke):
+    invoke(lambdaInitiateForgotPWD, {'username': USERNAME})
+
+    status, body = invoke(lambdaConfirmForgotPWD, {'username': USERNAME, 'code': 'nope', 'password': 'Reset@1234'})
+
+    assert status == 400
+    assert body['code'] == 'CodeMismatchException'
+
+def test_confirm_with_expired_code(invoke, cognito):
+    invoke(lambdaInitiateForgotPWD, {'username': USERNAME})
+    cognito.expire_code(USERNAME)
+    code, _ = cognito.codes[USERNAME]
+
+    status, body = invoke(lambdaConfirmForgotPWD, {'username': USERNAME, 'code': code, 'password': 'Reset@1234'})
+
+    assert status == 410
+    assert body['code'] == 'ExpiredCodeException'
+
+def test_confirm_attempt_limit(invoke, cognito):
+    cognito.fail_next('confirm_forgot_password', 'LimitExceededException', times=10)
+
+    status, body = invoke(lambdaConfirmForgotPWD, {'username': USERNAME, 'code': '123456', 'password': 'Reset@1234'})
+
+    assert status == 429
+    assert body['code'] == 'LimitExceededException'
+    # One user's attempt limit is not throttling: no retries, shared rate untouched
+    assert cognito.call_count('confirm_forgot_password') == 1
+    assert cognitoThrottle.get_bucket('confirm_forgot_password').rate == cognitoThrottle.INITIAL_RATE
+
+# ---- lambdaNewTempPWDResquest (admin issues a new temporary password) ----
+
+def test_new_temporary_password_forces_change(invoke):
+    status, body = invoke(lambdaNewTempPWDResquest, {'username': USERNAME, 'tempPWD': 'Temp#9999'})
+
+    assert status == 200
+    assert body['username'] == USERNAME
+    assert sign_in(invoke, USERNAME, 'Temp#9999') == 202
+
+def test_new_temporary_password_unknown_user(invoke):
+    status, body = invoke(lambdaNewTempPWDResquest, {'username': 'GhostUser123', 'tempPWD': 'Temp#9999'})
+
+    assert status == 404
+    assert body['code'] == 'UserNotFoundException'
@@ -0,0 +1,48 @@
+import json
+import lambdaAuthRouter
+from conftest import CONFIRMED_USER
+
+def test_routes_by_operation(invoke):
+    username, password = CONFIRMED_USER
+    status, body = invoke(lambdaAuthRouter, {'operation': 'signIn', 'username': username, 'password': password})
+
+    assert status == 200
+    assert body['tokens']['accessToken']
+
+def test_routes_proxy_request_by_path(invoke, tokens):
+    status, body = invoke(lambdaAuthRouter, {
+        'path': '/dev/mobile/refreshToken',
+        'body': json.dumps({'refreshToken': tokens['refreshToken']})
+    })
+
+    assert status == 200
+    assert body['message'] == 'Token refreshed successfully'
+
+def test_unknown_operation(invoke, cognito):
+    status, body = invoke(lambdaAuthRouter, {'path': '/dev/mobile/deleteEverything'})
+
+    assert status == 400
+    assert body['code'] == 'InvalidParameterException'
+    assert cognito.calls == []
+
+def test_proxy_request_ignores_operation_in_body(invoke, cognito):
+    # The path decides; a body naming an admin operation still signs in
+    username, password = CONFIRMED_USER
+    status, body = invoke(lambdaAuthRouter, {
+        'path': '/dev/mobile/signIn',
+        'body': json.dumps({'operation': 'adminCreatesCN', 'username': username, 'password': password,
+                            'email': 'mallory@example.com'})
+    })
+
+    assert status == 200
+    assert body['tokens']['accessToken']
+    assert cognito.call_count('admin_create_user') == 0
+
+def test_admin_operation_not_routed_from_api_gateway(invoke, cognito):
+    status, body = invoke(lambdaAuthRouter, {
+        'path': '/dev/mobile/adminCreatesCN',
+        'body': json.dumps({'username': 'mallory_cn', 'email': 'mallory@example.com'})
+    })
+
+    assert status == 400
+    assert cognito.calls == []
@@ -0,0 +1,195 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+import cognitoClient
+import cognitoThrottle
+import lambdaSignIn
+import lambdaTempPWDReset
+import tokenValidation
+from conftest import CONFIRMED_USER, UNCONFIRMED_USER, TEMP_PASSWORD_USER
+
+def sign_in(invoke, username, password):
+    return invoke(lambdaSignIn, {'username': username, 'password': password})
+
+def test_successful_login_returns_verifiable_tokens(invoke):
+    status, body = sign_in(invoke, *CONFIRMED_USER)
+
+    assert status == 200
+    assert body['success'] is True
+    assert set(body['tokens']) == {'idToken', 'accessToken', 'refreshToken', 'expiresIn'}
+    claims = tokenValidation.validate_access_token(body['tokens']['accessToken'])
+    assert claims['username'] == CONFIRMED_USER[0]
+
+def test_missing_username_or_password(invoke, cognito):
+    assert sign_in(invoke, None, 'Kelci@237')[0] == 400
+    status, body = invoke(lambdaSignIn, {'username': CONFIRMED_USER[0]})
+
+    assert status == 400
+    assert body['code'] == 'InvalidParameterException'
+    assert cognito.calls == []
+
+def test_incorrect_password(invoke):
+    status, body = sign_in(invoke, CONFIRMED_USER[0], 'WrongPassword')
+
+    assert status == 401
+    assert body == {'success': False, 'message': 'Incorrect username or password', 'code': 'NotAuthorizedException'}
+
+def test_unconfirmed_user(invoke):
+    status, body = sign_in(invoke, *UNCONFIRMED_USER)
+
+    assert status == 403
+    assert body['code'] == 'UserNotConfirmedException'
+
+def test_nonexistent_user(invoke):
+    status, body = sign_in(invoke, 'GhostUser123', 'Password123')
+
+    assert status == 404
+    assert body['code'] == 'UserNotFoundException'
+
+def test_throttled_login_is_retried(invoke, cognito):
+    cognito.fail_next('initiate_auth', 'TooManyRequestsException')
+
+    status, _ = sign_in(invoke, *CONFIRMED_USER)
+
+    assert status == 200
+    assert cognito.call_count('initiate_auth') == 2
+
+def test_persistent_throttling_returns_429(invoke, cognito):
+    cognito.fail_next('initiate_auth', 'TooManyRequestsException', times=10)
+
+    status, body = sign_in(invoke, *CONFIRMED_USER)
+
+    assert status == 429
+    assert body['code'] == 'TooManyRequestsException'
+
+def test_botocore_leaves_throttle_retries_to_the_controller(monkeypatch):
+    # A real Cognito client against a local endpoint that always throttles:
+    # every HTTP request must be one of throttled_call's own attempts
+    boto3 = pytest.importorskip('boto3')
+    requests = []
+
+    class Throttling(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            requests.append(self.headers.get('X-Amz-Target'))
+            body = json.dumps({'__type': 'TooManyRequestsException', 'message': 'Rate exceeded'}).encode()
+            self.send_response(400)
+            self.send_header('Content-Type', 'application/x-amz-json-1.1')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Throttling)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = boto3.client(
+            'cognito-idp', region_name='ap-south-1', endpoint_url=f'http://127.0.0.1:{server.server_port}',
+            aws_access_key_id='test', aws_secret_access_key='test', config=cognitoClient.client_config()
+        )
+        monkeypatch.setattr(cognitoClient, '_client', client)
+        monkeypatch.setattr(cognitoThrottle, 'RETRY_BASE_DELAY', 0.001)
+
+        with pytest.raises(client.exceptions.TooManyRequestsException):
+            cognitoThrottle.throttled_call('initiate_auth', None, ClientId='client', AuthFlow='USER_PASSWORD_AUTH',
+                                           AuthParameters={'USERNAME': 'kela_02', 'PASSWORD': 'x'})
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(requests) == cognitoThrottle.MAX_RETRIES + 1
+
+def test_enriched_login_returns_role_and_status(invoke, cognito, monkeypatch):
+    # The DB lookup starts only once Cognito has accepted the password
+    calls = []
+    initiate_auth = cognito.initiate_auth
+
+    def initiate_auth_first(**params):
+        calls.append('initiate_auth')
+        return initiate_auth(**params)
+
+    def call_db(action, data):
+        calls.append(action)
+        assert data == {'username': CONFIRMED_USER[0]}
+        return 200, {'role': 0, 'status': 2}
+
+    monkeypatch.setattr(cognito, 'initiate_auth', initiate_auth_first)
+    monkeypatch.setattr(lambdaSignIn, 'db_configured', lambda: True)
+    monkeypatch.setattr(lambdaSignIn, 'call_db', call_db)
+    username, password = CONFIRMED_USER
+
+    status, body = invoke(lambdaSignIn, {'username': username, 'password': password, 'includeProfile': True})
+
+    assert status == 200
+    assert body['user'] == {'role': 0, 'status': 2}
+    assert calls == ['initiate_auth', 'get_user_role_status']
+
+def test_enriched_login_without_profile_when_lookup_fails(invoke, monkeypatch):
+    monkeypatch.setattr(lambdaSignIn, 'db_configured', lambda: True)
+    monkeypatch.setattr(lambdaSignIn, 'call_db', lambda action, data: (404, {'error': 'User not found'}))
+    username, password = CONFIRMED_USER
+
+    status, body = invoke(lambdaSignIn, {'username': username, 'password': password, 'includeProfile': True})
+
+    assert status == 200
+    assert 'user' not in body
+    assert body['tokens']['accessToken']
+
+def test_enriched_login_hides_profile_on_wrong_password(invoke, monkeypatch):
+    lookups = []
+    monkeypatch.setattr(lambdaSignIn, 'db_configured', lambda: True)
+    monkeypatch.setattr(lambdaSignIn, 'call_db', lambda action, data: lookups.append(data) or (200, {'role': 1, 'status': 2}))
+
+    status, body = invoke(lambdaSignIn, {'username': CONFIRMED_USER[0], 'password': 'WrongPassword', 'includeProfile': True})
+
+    assert status == 401
+    assert 'user' not in body
+    assert lookups == []
+
+def test_temporary_password_login_and_reset(invoke):
+    username, temp_password = TEMP_PASSWORD_USER
+    status, body = sign_in(invoke, username, temp_password)
+
+    assert status == 202
+    assert body['requiresNewPassword'] is True
+
+    status, body = invoke(lambdaTempPWDReset, {
+        'username': username,
+        'new_password': 'Amal@2024',
+        'session': body['session']
+    })
+
+    assert status == 200
+    assert body['tokens']['accessToken']
+    assert sign_in(invoke, username, 'Amal@2024')[0] == 200
+
+def test_temporary_password_reset_rejects_weak_password(invoke):
+    _, body = sign_in(invoke, *TEMP_PASSWORD_USER)
+
+    status, body = invoke(lambdaTempPWDReset, {
+        'username': TEMP_PASSWORD_USER[0],
+        'new_password': 'weak',
+        'session': body['session']
+    })
+
+    assert status == 400
+    assert body['code'] == 'InvalidPasswordException'
+
+def test_temporary_password_reset_with_bad_session(invoke):
+    status, body = invoke(lambdaTempPWDReset, {
+        'username': TEMP_PASSWORD_USER[0],
+        'new_password': 'Amal@2024',
+        'session': 'not-a-session'
+    })
+
+    assert status == 401
+    assert body['code'] == 'NotAuthorizedException'
+
+def test_temporary_password_reset_requires_new_password(invoke):
+    status, body = invoke(lambdaTempPWDReset, {'username': TEMP_PASSWORD_USER[0], 'session': 'x'})
+
+    assert status == 404
+    assert body['code'] == 'InvalidParameterException'
@@ -0,0 +1,115 @@
+import dbClient
+import lambdaSignUp
+from conftest import CONFIRMED_USER
+
+def sign_up(invoke, **fields):
+    event = {'username': 'nimal_10', 'password': 'Nimal@123', 'email': 'nimal@example.com'}
+    event.update(fields)
+    return invoke(lambdaSignUp, event)
+
+def test_successful_sign_up(invoke, cognito):
+    status, body = sign_up(invoke)
+
+    assert status == 200
+    assert body['userConfirmed'] is False
+    assert body['userSub'] == cognito.users['nimal_10']['sub']
+    assert cognito.users['nimal_10']['status'] == 'UNCONFIRMED'
+    assert cognito.users['nimal_10']['attributes']['preferred_username'] == 'nimal_10'
+
+def test_missing_fields(invoke, cognito):
+    for missing in ('username', 'password', 'email'):
+        status, body = sign_up(invoke, **{missing: None})
+        assert status == 400
+        assert body['code'] == 'InvalidParameterException'
+    assert cognito.calls == []
+
+def test_existing_username(invoke):
+    status, body = sign_up(invoke, username=CONFIRMED_USER[0])
+
+    assert status == 409
+    assert body['code'] == 'UsernameExistsException'
+
+def test_invalid_email(invoke):
+    status, body = sign_up(invoke, email='not-an-email')
+
+    assert status == 400
+    assert body['code'] == 'InvalidParameterException'
+
+def test_weak_password(invoke, cognito):
+    status, body = sign_up(invoke, password='password')
+
+    assert status == 400
+    assert body == {'success': False, 'message': 'Password does not meet requirements', 'code': 'InvalidPasswordException'}
+    assert 'nimal_10' not in cognito.users
+
+def test_sign_up_creates_profile(invoke, cognito, monkeypatch):
+    inserts = []
+
+    def call_db(action, data):
+        inserts.append((action, data))
+        return 200, {'message': 'User created', 'username': data['username']}
+
+    monkeypatch.setattr(lambdaSignUp, 'db_configured', lambda: True)
+    monkeypatch.setattr(lambdaSignUp, 'call_db', call_db)
+
+    status, body = sign_up(invoke, username='Nimal_10')
+
+    assert status == 200
+    assert body['profileCreated'] is True
+    assert [action for action, _ in inserts] == ['create_user']
+    profile = inserts[0][1]
+    assert (profile['username'], profile['email'], profile['role'], profile['status']) == ('nimal_10', 'nimal@example.com', 0, 0)
+
+def test_sign_up_without_db_leaves_profile_to_app(invoke):
+    status, body = sign_up(invoke)
+
+    assert status == 200
+    assert body['profileCreated'] is False
+
+def test_failed_profile_insert_removes_cognito_user(invoke, cognito, monkeypatch):
+    monkeypatch.setattr(lambdaSignUp, 'db_configured', lambda: True)
+    monkeypatch.setattr(lambdaSignUp, 'call_db', lambda action, data: (500, {'error': 'Duplicate entry'}))
+
+    status, body = sign_up(invoke)
+
+    assert status == 500
+    assert body['code'] == 'ProfileCreationFailed'
+    assert body['rolledBack'] is True
+    assert 'nimal_10' not in cognito.users
+
+    # Nothing is left behind, so the same sign-up can be retried
+    monkeypatch.setattr(lambdaSignUp, 'call_db', lambda action, data: (200, {}))
+    assert sign_up(invoke)[0] == 200
+
+def test_existing_profile_for_same_email_is_kept(invoke, cognito, monkeypatch):
+    # The DB handler's answer when a retried insert finds its own row
+    monkeypatch.setattr(lambdaSignUp, 'db_configured', lambda: True)
+    monkeypatch.setattr(lambdaSignUp, 'call_db',
+                        lambda action, data: (200, {'message': 'User already exists', 'username': data['username'], 'existing': True}))
+
+    status, body = sign_up(invoke)
+
+    assert status == 200
+    assert body['profileCreated'] is True
+    assert 'nimal_10' in cognito.users
+    assert 'admin_delete_user' not in cognito.calls
+
+def test_db_invoke_is_never_retried():
+    config = dbClient.lambda_client_config()
+
+    assert config.retries['total_max_attempts'] == 1
+    assert config.read_timeout > dbClient.DB_HANDLER_TIMEOUT
+
+def test_failed_rollback_is_reported(invoke, cognito, monkeypatch):
+    def unreachable_db(action, data):
+        raise ConnectionError('DB handler unreachable')
+
+    monkeypatch.setattr(lambdaSignUp, 'db_configured', lambda: True)
+    monkeypatch.setattr(lambdaSignUp, 'call_db', unreachable_db)
+    cognito.fail_next('admin_delete_user', 'InternalErrorException', times=10)
+
+    status, body = sign_up(invoke)
+
+    assert status == 500
+    assert body['rolledBack'] is False
+    assert 'nimal_10' in cognito.users
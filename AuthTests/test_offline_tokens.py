@@ -0,0 +1,102 @@
+import time
+import fakeCognito
+import lambdaSignOut
+import lambdaTokenRefresh
+import refreshCache
+
+def test_refresh_returns_new_access_token(invoke, tokens):
+    status, body = invoke(lambdaTokenRefresh, {'refreshToken': tokens['refreshToken']})
+
+    assert status == 200
+    assert body['tokens']['accessToken'] != tokens['accessToken']
+    assert body['tokens']['expiresIn'] == 3600
+
+def test_repeated_refresh_is_served_from_cache(invoke, cognito, tokens):
+    first = invoke(lambdaTokenRefresh, {'refreshToken': tokens['refreshToken']})
+    second = invoke(lambdaTokenRefresh, {'refreshToken': tokens['refreshToken']})
+
+    assert first[0] == second[0] == 200
+    assert first[1]['tokens']['accessToken'] == second[1]['tokens']['accessToken']
+    # One call for the sign-in, one for the refresh
+    assert cognito.call_count('initiate_auth') == 2
+
+def test_refresh_with_missing_or_invalid_token(invoke):
+    assert invoke(lambdaTokenRefresh, {})[0] == 400
+    assert invoke(lambdaTokenRefresh, {'refreshToken': ''})[0] == 400
+
+    status, body = invoke(lambdaTokenRefresh, {'refreshToken': 'invalid-token'})
+
+    assert status == 401
+    assert body['code'] == 'NotAuthorizedException'
+
+def test_sign_out_revokes_tokens(invoke, tokens):
+    status, body = invoke(lambdaSignOut, {'accessToken': tokens['accessToken']})
+
+    assert status == 200
+    assert body == {'success': True, 'message': 'User signed out successfully'}
+    assert invoke(lambdaTokenRefresh, {'refreshToken': tokens['refreshToken']})[0] == 401
+    assert invoke(lambdaSignOut, {'accessToken': tokens['accessToken']})[0] == 401
+
+def test_sign_out_evicts_cached_refresh(invoke, cognito, tokens):
+    # A refresh just before sign-out is cached; afterwards it must reach Cognito again
+    assert invoke(lambdaTokenRefresh, {'refreshToken': tokens['refreshToken']})[0] == 200
+
+    status, _ = invoke(lambdaSignOut, {'accessToken': tokens['accessToken'], 'refreshToken': tokens['refreshToken']})
+    assert status == 200
+
+    status, body = invoke(lambdaTokenRefresh, {'refreshToken': tokens['refreshToken']})
+    assert status == 401
+    assert body['code'] == 'NotAuthorizedException'
+
+def test_evict_clears_shared_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(refreshCache, 'SHARED_STORE_PATH', str(tmp_path / 'refresh.db'))
+    calls = []
+
+    def refresh():
+        calls.append(1)
+        return {'accessToken': 'a', 'expiresIn': 3600}
+
+    refreshCache.get_or_refresh('r1', refresh)
+    refreshCache._results.clear()
+    assert refreshCache.get_or_refresh('r1', refresh) == ({'accessToken': 'a', 'expiresIn': 3600}, True)
+
+    refreshCache.evict('r1')
+    refreshCache.get_or_refresh('r1', refresh)
+    assert len(calls) == 2
+
+def test_sign_out_requires_token(invoke):
+    status, body = invoke(lambdaSignOut, {})
+
+    assert status == 400
+    assert body['code'] == 'InvalidParameterException'
+
+def test_malformed_token_is_rejected_locally(invoke, cognito):
+    status, body = invoke(lambdaSignOut, {'accessToken': 'not.a.jwt'})
+
+    assert status == 401
+    assert body['code'] == 'NotAuthorizedException'
+    assert cognito.call_count('global_sign_out') == 0
+
+def test_expired_token_is_rejected_locally(invoke, cognito):
+    claims = {
+        'sub': 'x', 'iss': cognito.issuer(), 'token_use': 'access',
+        'client_id': cognito.client_id, 'exp': int(time.time()) - 60
+    }
+    expired = cognito.jwt(claims)
+
+    assert invoke(lambdaSignOut, {'accessToken': expired})[0] == 401
+    assert cognito.call_count('global_sign_out') == 0
+
+def test_token_from_another_pool_is_rejected_locally(invoke, cognito):
+    other_pool = fakeCognito.FakeCognito(user_pool_id='local-1_OtherPool')
+    other_pool.add_user('someone', 'Someone@123')
+    response = other_pool.initiate_auth(
+        ClientId=other_pool.client_id,
+        AuthFlow='USER_PASSWORD_AUTH',
+        AuthParameters={'USERNAME': 'someone', 'PASSWORD': 'Someone@123'}
+    )
+
+    status, _ = invoke(lambdaSignOut, {'accessToken': response['AuthenticationResult']['AccessToken']})
+
+    assert status == 401
+    assert cognito.call_count('global_sign_out') == 0
@@ -0,0 +1,117 @@
+import io
+import json
+import os
+import zipfile
+import dbClient
+import lambdaAuthRouter
+import lambdaSignIn
+import packageLambdas
+import traceReport
+import tracing
+from types import SimpleNamespace
+from conftest import CONFIRMED_USER, ROOT
+
+class FakeLambdaClient:
+    # Answers every DB handler invoke with one role/status row
+    def __init__(self):
+        self.payloads = []
+
+    def invoke(self, **params):
+        self.payloads.append(json.loads(params['Payload']))
+        result = {'statusCode': 200, 'body': json.dumps({'role': 0, 'status': 2})}
+        return {'Payload': io.BytesIO(json.dumps(result).encode())}
+
+def read_traces(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+def test_shared_tracing_is_bundled_into_every_package(tmp_path):
+    with open(os.path.join(ROOT, 'LambdaShared', 'tracing.py'), 'rb') as f:
+        shared = f.read()
+
+    for package in packageLambdas.PACKAGES:
+        assert not os.path.exists(os.path.join(ROOT, package, 'tracing.py'))
+        with zipfile.ZipFile(packageLambdas.build(package, str(tmp_path))) as bundle:
+            assert bundle.read('tracing.py') == shared
+
+def test_router_traces_the_whole_request(invoke, tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, 'TRACE_FILE', str(tmp_path / 'traces.jsonl'))
+    monkeypatch.setattr(tracing, 'TRACE_SAMPLE_RATE', 1.0)
+
+    event = {'operation': 'signIn', 'username': CONFIRMED_USER[0], 'password': CONFIRMED_USER[1]}
+    assert invoke(lambdaAuthRouter, event)[0] == 200
+
+    [trace] = read_traces(tmp_path / 'traces.jsonl')
+    assert trace['name'] == 'lambdaAuthRouter'
+    assert [child['name'] for child in trace['children']][0] == 'lambdaSignIn'
+
+def test_untraced_by_default(invoke, tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, 'TRACE_FILE', str(tmp_path / 'traces.jsonl'))
+
+    assert invoke(lambdaSignIn, {'username': CONFIRMED_USER[0], 'password': CONFIRMED_USER[1]})[0] == 200
+    assert not (tmp_path / 'traces.jsonl').exists()
+
+def test_app_trace_id_does_not_force_a_trace(invoke, tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, 'TRACE_FILE', str(tmp_path / 'traces.jsonl'))
+
+    event = {'username': CONFIRMED_USER[0], 'password': CONFIRMED_USER[1], 'traceId': 'forced',
+             'headers': {'X-Trace-Id': 'forced'}}
+    assert invoke(lambdaSignIn, event)[0] == 200
+    assert not (tmp_path / 'traces.jsonl').exists()
+
+def test_forwarded_trace_id_is_always_traced(context, tmp_path, monkeypatch):
+    trace_file = str(tmp_path / 'traces.jsonl')
+    monkeypatch.setattr(tracing, 'TRACE_FILE', trace_file)
+    context.client_context = SimpleNamespace(custom={'caller': 'LambdaFuncsAuth'})
+
+    event = {'username': CONFIRMED_USER[0], 'password': CONFIRMED_USER[1], 'traceId': 'trace-2'}
+    assert lambdaSignIn.lambda_handler(event, context)['statusCode'] == 200
+    [trace] = read_traces(trace_file)
+    assert trace['trace_id'] == 'trace-2'
+
+def test_sign_in_trace_spans_threads_and_db_call(invoke, tmp_path, monkeypatch):
+    trace_file = str(tmp_path / 'traces.jsonl')
+    lambda_client = FakeLambdaClient()
+    monkeypatch.setattr(tracing, 'TRACE_FILE', trace_file)
+    monkeypatch.setattr(tracing, 'TRACE_SAMPLE_RATE', 1)
+    monkeypatch.setattr(dbClient, 'DB_HANDLER_FUNCTION', 'dbHandling')
+    monkeypatch.setattr(dbClient, '_lambda_client', lambda_client)
+    username, password = CONFIRMED_USER
+
+    status, body = invoke(lambdaSignIn, {
+        'username': username, 'password': password, 'includeProfile': True, 'traceId': 'trace-1'
+    })
+
+    assert status == 200
+    assert body['user'] == {'role': 0, 'status': 2}
+    [trace] = read_traces(trace_file)
+    assert trace['trace_id'] == 'trace-1'
+    assert trace['name'] == 'lambdaSignIn'
+    assert trace['attrs'] == {'status': 200}
+    assert {span['name'] for span in trace['children']} == {'cognito.initiate_auth', 'db.get_user_role_status'}
+    # The DB handler receives the id, so its spans join this trace
+    assert lambda_client.payloads[0]['traceId'] == 'trace-1'
+
+def test_report_merges_spans_per_action():
+    def trace(action, connect_ms, query_ms):
+        return json.dumps({
+            'type': 'trace', 'trace_id': action, 'name': 'lambdaDBHandling',
+            'duration_ms': connect_ms + query_ms + 1, 'attrs': {'action': action},
+            'children': [
+                {'name': 'db.connect', 'duration_ms': connect_ms},
+                {'name': 'sql SELECT users', 'duration_ms': query_ms}
+            ]
+        })
+
+    lines = [trace('get_user_role', 2, 1) for _ in range(19)] + [trace('get_user_role', 50, 1)]
+    lines += ['START RequestId: 1234 Version: $LATEST', '2024-01-01T00:00:00Z\t1234\t' + trace('get_user_status', 2, 1)]
+
+    groups = traceReport.group_traces(filter(None, map(traceReport.parse_line, lines)))
+
+    assert [group.key for group in groups] == ['lambdaDBHandling get_user_role', 'lambdaDBHandling get_user_status']
+    root, tail_count = groups[0].flame(95)
+    rows = {row['name']: row for row in traceReport.flame_rows(root, root, tail_count, 20, 0)}
+    assert tail_count == 1
+    assert rows['db.connect']['calls'] == 1
+    assert rows['db.connect']['tail_share'] > rows['db.connect']['share']
+    assert rows['sql SELECT users']['avg_ms'] == 1
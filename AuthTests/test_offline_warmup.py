@@ -0,0 +1,67 @@
+import pytest
+from types import SimpleNamespace
+import lambdaAuthRouter
+import lambdaSignIn
+import lambdaSignOut
+import lambdaSignUp
+import lambdaTokenRefresh
+import tokenValidation
+
+@pytest.fixture
+def warmer(context):
+    # Warmers invoke the functions directly with a ClientContext naming them
+    context.client_context = SimpleNamespace(custom={'caller': 'warmer'})
+    return context
+
+@pytest.mark.usefixtures('warmer')
+@pytest.mark.parametrize('handler', [lambdaSignIn, lambdaSignUp, lambdaSignOut, lambdaTokenRefresh])
+@pytest.mark.parametrize('event', [{'warmup': True}, {'ping': True}])
+def test_warmup_skips_request_handling(invoke, cognito, handler, event):
+    status, body = invoke(handler, event)
+
+    assert status == 200
+    assert body['success'] is True
+    assert body['steps'] == {'cognito_client': True, 'db_client': True, 'jwks': True}
+    assert cognito.calls == []
+
+def test_scheduled_event_through_router(invoke, warmer):
+    status, body = invoke(lambdaAuthRouter, {'source': 'aws.events', 'detail-type': 'Scheduled Event', 'detail': {}})
+
+    assert status == 200
+    assert body['steps']['jwks'] is True
+
+@pytest.mark.parametrize('event', [{'warmup': True}, {'ping': True}, {'source': 'aws.events'}])
+def test_public_warmup_body_is_a_normal_request(invoke, cognito, event):
+    # API Gateway requests carry no ClientContext, so the body alone is not enough
+    status, body = invoke(lambdaSignIn, event)
+
+    assert status == 400
+    assert 'steps' not in body
+
+def test_warmup_fetches_missing_jwks(invoke, cognito, warmer, monkeypatch):
+    fetches = []
+
+    def fetch_jwks(user_pool_id):
+        fetches.append(user_pool_id)
+        return cognito.signing_keys()
+
+    monkeypatch.setattr(tokenValidation, '_jwks', {'keys': None, 'fetched_at': 0, 'failed_at': 0})
+    monkeypatch.setattr(tokenValidation, 'fetch_jwks', fetch_jwks)
+
+    assert invoke(lambdaSignIn, {'warmup': True})[0] == 200
+    assert invoke(lambdaSignIn, {'warmup': True})[0] == 200
+    assert fetches == [cognito.user_pool_id]
+
+def test_failed_warmup_step_returns_503(invoke, warmer, monkeypatch):
+    def unreachable(user_pool_id):
+        raise OSError('JWKS endpoint unreachable')
+
+    monkeypatch.setattr(tokenValidation, '_jwks', {'keys': None, 'fetched_at': 0, 'failed_at': 0})
+    monkeypatch.setattr(tokenValidation, 'fetch_jwks', unreachable)
+
+    status, body = invoke(lambdaSignIn, {'warmup': True})
+
+    assert status == 503
+    assert body['success'] is False
+    assert body['steps']['jwks'] is False
+    assert body['steps']['cognito_client'] is True
@@ -0,0 +1,118 @@
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from slotAvailability import COLOMBO_TZ, parse_day
+
+# Appointment counts per month and status for get_appointment_stats.
+#
+# Counted in SQL, grouped by Colombo calendar month, from a range scan on
+# idx_ca_navigator_time (migrations/004_appointment_stats_index.sql) that
+# never reads the table rows. Results are cached per navigator and date
+# range; create_appointment, cancel_appointment and complete_appointment
+# invalidate the navigator's entries in this container, and entries expire
+# after STATS_CACHE_TTL so writes through other containers show up too.
+#
+# Appointments count for the navigator they were booked with
+# (client_appointments.care_navigator_username), so a client moving to
+# another navigator does not move their past appointments with them, and
+# appointments booked while the client had no navigator count for no one.
+# get_navigator_appointment_history lists the appointments of a navigator's
+# current clients instead, so the two differ for clients who were reassigned.
+
+STATUSES = ("active", "completed", "cancelled")
+DEFAULT_RANGE_MONTHS = 12       # from the start of the month, 11 months back
+STATS_CACHE_TTL = 300           # seconds
+STATS_CACHE_SIZE = 500          # navigators
+STATS_RANGES_PER_NAVIGATOR = 8
+
+_stats = {}     # navigator -> {(from_date, to_date): (loaded_at, result)}
+_stats_lock = threading.Lock()
+
+def any_cached():
+    return bool(_stats)
+
+def invalidate(navigator):
+    with _stats_lock:
+        _stats.pop(navigator, None)
+
+def cached_result(navigator, key):
+    entry = _stats.get(navigator, {}).get(key)
+    if entry is not None and time.monotonic() - entry[0] < STATS_CACHE_TTL:
+        return entry[1]
+    return None
+
+def remember(navigator, key, result):
+    with _stats_lock:
+        if navigator not in _stats and len(_stats) >= STATS_CACHE_SIZE:
+            del _stats[next(iter(_stats))]
+        ranges = _stats.setdefault(navigator, {})
+        if key not in ranges and len(ranges) >= STATS_RANGES_PER_NAVIGATOR:
+            del ranges[next(iter(ranges))]
+        ranges[key] = (time.monotonic(), result)
+
+def months_back(day, months):
+    month_index = day.year * 12 + day.month - 1 - months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+def utc_midnight(day):
+    # Start of a Colombo calendar day, as naive UTC for CONVERT_TZ
+    return datetime(day.year, day.month, day.day, tzinfo=COLOMBO_TZ).astimezone(timezone.utc).replace(tzinfo=None)
+
+def load_stats(cursor, navigator, first_day, last_day):
+    conditions = ["care_navigator_username = %s",
+                  "appointment_date_time >= CONVERT_TZ(%s, '+00:00', @@session.time_zone)"]
+    params = [navigator, utc_midnight(first_day)]
+    if last_day is not None:
+        conditions.append("appointment_date_time < CONVERT_TZ(%s, '+00:00', @@session.time_zone)")
+        params.append(utc_midnight(last_day + timedelta(days=1)))
+
+    cursor.execute(
+        f"""
+        SELECT DATE_FORMAT(CONVERT_TZ(appointment_date_time, @@session.time_zone, '+05:30'), '%%Y-%%m') AS month,
+            status,
+            COUNT(*) AS appointments
+        FROM client_appointments
+        WHERE {" AND ".join(conditions)}
+        GROUP BY month, status
+        ORDER BY month
+        """,
+        params
+    )
+
+    months = {}
+    totals = dict.fromkeys(STATUSES, 0)
+    for row in cursor.fetchall():
+        counts = months.setdefault(row["month"], dict.fromkeys(STATUSES, 0))
+        counts[row["status"]] = counts.get(row["status"], 0) + row["appointments"]
+        totals[row["status"]] = totals.get(row["status"], 0) + row["appointments"]
+
+    return {
+        "months": [dict(month=month, **counts, total=sum(counts.values())) for month, counts in months.items()],
+        "totals": dict(totals, total=sum(totals.values()))
+    }
+
+def appointment_stats(cursor, navigator, data, now=None):
+    # Raises ValueError for invalid parameters
+    now = now or datetime.now(timezone.utc)
+    today = now.astimezone(COLOMBO_TZ).date()
+
+    first_day = (parse_day(data["from_date"], "from_date") if "from_date" in data
+                 else months_back(today, DEFAULT_RANGE_MONTHS - 1))
+    last_day = parse_day(data["to_date"], "to_date") if "to_date" in data else None
+    if last_day is not None and last_day < first_day:
+        raise ValueError("'to_date' is before 'from_date'")
+
+    key = (first_day, last_day)
+    stats = cached_result(navigator, key)
+    if stats is None:
+        stats = load_stats(cursor, navigator, first_day, last_day)
+        remember(navigator, key, stats)
+
+    result = {
+        "care_navigator_username": navigator,
+        "from_date": first_day.isoformat(),
+        "to_date": last_day.isoformat() if last_day is not None else None
+    }
+    result.update(stats)
+    return result
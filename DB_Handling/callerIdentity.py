@@ -0,0 +1,279 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from tracing import span
+
+# Caller identity for lambdaDBHandling.
+#
+# The app sends its Cognito access token (Authorization: Bearer <token>, or
+# "accessToken" in the request body). The token is verified here, in-process,
+# against the user pool's JWKS, and the caller's username comes from its
+# claims instead of from whatever username the request names.
+#
+# The JWKS is fetched once and cached (re-fetched hourly, or early for an
+# unknown key id), and every verified token is remembered until it expires,
+# so after the first request with a token the check is a dict lookup.
+#
+# DB_AUTH_MODE controls enforcement:
+#   required  every request from API Gateway needs a valid token (default)
+#   optional  tokens are verified when sent; requests without one are let
+#             through. Only for rolling the app out, never left on.
+#   off       tokens are ignored (previous behaviour)
+# Lambda-to-Lambda calls from the auth functions (LambdaFuncsAuth/dbClient.py)
+# are authorized by IAM and identify themselves through the invoke
+# ClientContext, so they never need a token. PUBLIC_ACTIONS are sent by the
+# app before the user has signed in, so they are accepted without one.
+
+USER_POOL_ID = os.environ.get("COGNITO_USER_POOL_ID")
+CLIENT_ID = os.environ.get("COGNITO_CLIENT_ID")
+AUTH_MODE = os.environ.get("DB_AUTH_MODE", "required")
+JWKS_TTL = 3600
+JWKS_RETRY_INTERVAL = 60        # unknown key ids and failed fetches refetch at most this often
+JWKS_FETCH_TIMEOUT = 2
+VERIFIED_CACHE_SIZE = 10000
+
+# ASN.1 DigestInfo prefix for SHA-256 (RFC 8017, section 9.2)
+SHA256_DIGEST_INFO = bytes.fromhex("3031300d060960864801650304020105000420")
+
+# Which field of "data" names the user a request acts for, and who may act
+# for them: "self" only that user, "client" the client or their assigned care
+# navigator, "navigator" the care navigator or one of their clients. Bulk
+# actions name a list of users, and the caller must be allowed for each.
+# Actions not listed here have no per-user restriction.
+ACCESS_RULES = {
+    "create_user": ("username", "self"),
+    "get_user_role": ("username", "self"),
+    "get_user_status": ("username", "self"),
+    "get_user_role_status": ("username", "self"),
+    "confirmed_client": ("username", "self"),
+    "active_user": ("username", "self"),
+    "profile_incomplete_CN": ("username", "self"),
+    "get_cn_details": ("username", "self"),
+    "update_cn_details": ("username", "self"),
+    "update_client_details": ("username", "self"),
+    "get_care_navigator_clients": ("care_navigator_username", "self"),
+    "get_navigator_clients": ("care_navigator_username", "self"),
+    "get_navigator_appointment_history": ("care_navigator_username", "self"),
+    "get_appointment_stats": ("care_navigator_username", "self"),
+    "get_clients_by_readiness": ("care_navigator_username", "self"),
+    "get_navigators_clients": ("care_navigator_usernames", "self"),
+    "get_available_slots": ("care_navigator_username", "navigator"),
+    "get_cn_calendly_name": ("cn_username", "navigator"),
+    "get_client_details": ("username", "client"),
+    "get_client_cn_calendly": ("client_username", "client"),
+    "get_client_care_navigator": ("client_username", "client"),
+    "create_appointment": ("client_username", "client"),
+    "get_active_appointment": ("client_username", "client"),
+    "cancel_appointment": ("client_username", "client"),
+    "complete_appointment": ("client_username", "client"),
+    "get_client_readiness_details": ("client_username", "client"),
+    "get_clients_readiness_details": ("client_usernames", "client"),
+    "get_client_appointment_history": ("client_username", "client"),
+    "assign_care_navigator": ("client_username", "client"),
+}
+
+# Right after email verification, before the first sign-in. confirmed_client
+# only moves an unconfirmed user on, so it cannot undo anyone's progress.
+PUBLIC_ACTIONS = {"confirmed_client"}
+
+_jwks = {"keys": None, "fetched_at": 0, "failed_at": 0}
+_jwks_lock = threading.Lock()
+_verified = {}   # token -> (exp, username)
+
+class CallerIdentityError(Exception):
+    def __init__(self, message, status_code=401):
+        super().__init__(message)
+        self.status_code = status_code
+
+def b64url_decode(segment):
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+def issuer_url():
+    # Pool ids look like "ap-south-1_AbCdEf"
+    return f"https://cognito-idp.{USER_POOL_ID.split('_')[0]}.amazonaws.com/{USER_POOL_ID}"
+
+def fetch_jwks():
+    # Only needed on a cold start or key rotation, so kept out of the import
+    import urllib.request
+    with span("jwks.fetch"), urllib.request.urlopen(issuer_url() + "/.well-known/jwks.json", timeout=JWKS_FETCH_TIMEOUT) as resp:
+        keys = json.loads(resp.read())["keys"]
+    return {
+        key["kid"]: (
+            int.from_bytes(b64url_decode(key["n"]), "big"),
+            int.from_bytes(b64url_decode(key["e"]), "big")
+        )
+        for key in keys if key.get("kty") == "RSA"
+    }
+
+def signing_key(kid):
+    now = time.time()
+    keys = _jwks["keys"]
+    age = now - _jwks["fetched_at"]
+    stale = keys is None or age > JWKS_TTL or (kid not in keys and age > JWKS_RETRY_INTERVAL)
+
+    if stale and now - _jwks["failed_at"] > JWKS_RETRY_INTERVAL:
+        with _jwks_lock:
+            if _jwks["keys"] is keys:
+                try:
+                    _jwks["keys"] = fetch_jwks()
+                    _jwks["fetched_at"] = time.time()
+                except Exception as e:
+                    print(f"JWKS fetch failed: {str(e)}")
+                    _jwks["failed_at"] = time.time()
+            keys = _jwks["keys"]
+
+    if keys is None:
+        raise CallerIdentityError("Unable to verify access token right now", 503)
+    return keys.get(kid)
+
+def prefetch_jwks():
+    # For warmup: loads the JWKS now rather than on the first request with a
+    # token. Raises CallerIdentityError when it can't be fetched.
+    if AUTH_MODE == "off" or not USER_POOL_ID:
+        return "disabled"
+    if _jwks["keys"] is None or time.time() - _jwks["fetched_at"] > JWKS_TTL:
+        signing_key(None)
+    return len(_jwks["keys"])
+
+def signature_valid(signing_input, signature, n, e):
+    # RSASSA-PKCS1-v1_5 with SHA-256
+    key_length = (n.bit_length() + 7) // 8
+    if len(signature) != key_length:
+        return False
+    decrypted = pow(int.from_bytes(signature, "big"), e, n).to_bytes(key_length, "big")
+    digest = SHA256_DIGEST_INFO + hashlib.sha256(signing_input).digest()
+    expected = b"\x00\x01" + b"\xff" * (key_length - len(digest) - 3) + b"\x00" + digest
+    return hmac.compare_digest(decrypted, expected)
+
+def verify_token(token):
+    # Returns the verified claims or raises CallerIdentityError
+    try:
+        header_segment, claims_segment, signature_segment = token.split(".")
+        header = json.loads(b64url_decode(header_segment))
+        claims = json.loads(b64url_decode(claims_segment))
+        signature = b64url_decode(signature_segment)
+    except (ValueError, AttributeError, TypeError):
+        raise CallerIdentityError("Invalid access token")
+    if not isinstance(header, dict) or not isinstance(claims, dict):
+        raise CallerIdentityError("Invalid access token")
+
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)) or exp <= time.time():
+        raise CallerIdentityError("Access token has expired")
+    if (claims.get("token_use") != "access" or claims.get("iss") != issuer_url()
+            or header.get("alg") != "RS256" or not claims.get("username")
+            or (CLIENT_ID and claims.get("client_id") != CLIENT_ID)):
+        raise CallerIdentityError("Invalid access token")
+
+    key = signing_key(header.get("kid"))
+    if key is None or not signature_valid(f"{header_segment}.{claims_segment}".encode(), signature, *key):
+        raise CallerIdentityError("Invalid access token")
+    return claims
+
+def remember(token, exp, username):
+    if len(_verified) >= VERIFIED_CACHE_SIZE:
+        now = time.time()
+        for expired in [t for t, (t_exp, _) in _verified.items() if t_exp <= now]:
+            del _verified[expired]
+        if len(_verified) >= VERIFIED_CACHE_SIZE:
+            del _verified[next(iter(_verified))]
+    _verified[token] = (exp, username)
+
+def username_for_token(token):
+    cached = _verified.get(token)
+    if cached and cached[0] > time.time():
+        return cached[1]
+    claims = verify_token(token)
+    username = claims["username"].lower()
+    remember(token, claims["exp"], username)
+    return username
+
+def bearer_token(event, body):
+    headers = event.get("headers") or {}
+    for name, value in headers.items():
+        if name.lower() == "authorization" and value:
+            return value[7:] if value[:7].lower() == "bearer " else value
+    return body.get("accessToken")
+
+def internal_call(context):
+    # Set by LambdaFuncsAuth/dbClient.py; API Gateway cannot set a ClientContext
+    client_context = getattr(context, "client_context", None)
+    custom = getattr(client_context, "custom", None) or {}
+    return bool(custom.get("caller"))
+
+def caller_identity(event, body, context):
+    # Returns the caller's username (lower case), None when the request is
+    # not identified, or raises CallerIdentityError
+    if AUTH_MODE == "off" or internal_call(context):
+        return None
+    if not USER_POOL_ID:
+        if AUTH_MODE == "required":
+            raise CallerIdentityError("Token verification is not configured", 503)
+        return None
+
+    token = bearer_token(event, body)
+    if not token:
+        if AUTH_MODE == "required" and body.get("action") not in PUBLIC_ACTIONS:
+            raise CallerIdentityError("Access token is required")
+        return None
+    try:
+        return username_for_token(token)
+    except CallerIdentityError as e:
+        # Without a JWKS the token can't be checked either way; in optional
+        # mode that is treated like a request without one
+        if e.status_code == 503 and AUTH_MODE != "required":
+            return None
+        raise
+
+def fill_caller_fields(caller, action, data):
+    # The token says who the caller is, so the user field can be left out
+    rule = ACCESS_RULES.get(action)
+    if caller is not None and rule is not None:
+        data.setdefault(rule[0], caller)
+
+def check_access(cursor, caller, action, data):
+    # Returns an error message when caller may not act on this request's data
+    rule = ACCESS_RULES.get(action)
+    if caller is None or rule is None:
+        return None
+    field, who = rule
+
+    target = data.get(field)
+    if target is None:
+        # Left to the action's own "Missing ..." validation
+        return None
+    if isinstance(target, list):
+        others = [item for item in target if not (isinstance(item, str) and item.lower() == caller)]
+        if who == "client" and others and all(isinstance(item, str) for item in others):
+            # One query for the lot: the rest must all be the caller's clients
+            cursor.execute(
+                f"SELECT client_username FROM client_details WHERE care_navigator_username = %s "
+                f"AND client_username IN ({', '.join(['%s'] * len(others))})",
+                [caller] + others
+            )
+            allowed = {row["client_username"].lower() for row in cursor.fetchall()}
+            denied = [item for item in others if item.lower() not in allowed]
+            return f"Not allowed to access '{denied[0]}'" if denied else None
+        for item in target:
+            denied = check_access(cursor, caller, action, {field: item})
+            if denied:
+                return denied
+        return None
+    if not isinstance(target, str):
+        return f"'{field}' must be a string"
+    if target.lower() == caller:
+        return None
+
+    if who in ("client", "navigator"):
+        client, navigator = (target, caller) if who == "client" else (caller, target)
+        cursor.execute(
+            "SELECT 1 FROM client_details WHERE client_username = %s AND care_navigator_username = %s",
+            (client, navigator)
+        )
+        if cursor.fetchone():
+            return None
+    return f"Not allowed to access '{target}'"
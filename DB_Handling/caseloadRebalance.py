@@ -0,0 +1,182 @@
+import heapq
+import time
+
+# Care navigator caseload rebalancing, for the rebalance_caseloads action.
+#
+# assign_care_navigator only balances when a client signs up, so caseloads
+# drift as navigators are activated and deactivated. The plan moves as few
+# clients as possible to even them out again:
+#
+#   - clients of navigators that are no longer active (role 1, status 2)
+#     always move
+#   - every active navigator ends with floor or ceil of the average caseload;
+#     the ceil places go to the navigators already holding the most clients,
+#     so only the excess above that moves
+#   - clients with an upcoming active appointment are moved last, since the
+#     appointment stays with the navigator it was booked with
+#
+# Receiving navigators are kept in a min-heap by caseload, so each moved
+# client goes to whoever currently has the fewest.
+#
+# Moves are applied in chunks of CHUNK_SIZE, one transaction per chunk, so
+# row locks are only held for a chunk's UPDATE. A move only applies if the
+# client is still with the navigator the plan saw; clients reassigned in the
+# meantime are skipped. If a statement fails after some chunks were committed,
+# RebalanceInterrupted carries the moves that went through, so the caller can
+# still account for them. Running the job again plans from the new state.
+
+CHUNK_SIZE = 500
+MAX_CHUNK_SIZE = 2000
+
+class RebalanceInterrupted(Exception):
+    def __init__(self, applied):
+        super().__init__(f"Rebalancing stopped after {len(applied)} applied moves")
+        self.applied = applied
+
+def load_state(cursor):
+    cursor.execute("SELECT username FROM users WHERE role = 1 AND status = 2 ORDER BY username")
+    navigators = [row["username"] for row in cursor.fetchall()]
+
+    cursor.execute(
+        """
+        SELECT client_username, care_navigator_username
+        FROM client_details
+        WHERE care_navigator_username IS NOT NULL AND care_navigator_username <> ''
+        """
+    )
+    assignments = {row["client_username"]: row["care_navigator_username"] for row in cursor.fetchall()}
+
+    cursor.execute(
+        """
+        SELECT DISTINCT client_username
+        FROM client_appointments
+        WHERE status = 'active' AND appointment_date_time >= UTC_TIMESTAMP()
+        """
+    )
+    booked = {row["client_username"] for row in cursor.fetchall()}
+    return navigators, assignments, booked
+
+def plan_moves(navigators, assignments, booked=()):
+    # Returns [(client, from_navigator, to_navigator)]
+    navigators = list(dict.fromkeys(navigators))   # a repeated name would skew the targets
+    if not navigators:
+        return []
+
+    caseloads = {navigator: [] for navigator in navigators}
+    orphaned = []
+    for client, navigator in assignments.items():
+        if navigator in caseloads:
+            caseloads[navigator].append(client)
+        else:
+            orphaned.append(client)
+
+    # Targets: floor of the average for everyone, plus one for the
+    # navigators with the most clients while the remainder lasts
+    base, extra = divmod(len(assignments), len(navigators))
+    by_load = sorted(navigators, key=lambda navigator: (-len(caseloads[navigator]), navigator))
+    targets = {navigator: base + (i < extra) for i, navigator in enumerate(by_load)}
+
+    # Clients leaving: the orphans, then each overloaded navigator's excess,
+    # unbooked clients first
+    leaving = [(client, assignments[client]) for client in sorted(orphaned, key=lambda c: (c in booked, c))]
+    for navigator in by_load:
+        excess = len(caseloads[navigator]) - targets[navigator]
+        if excess > 0:
+            clients = sorted(caseloads[navigator], key=lambda c: (c in booked, c))
+            leaving.extend((client, navigator) for client in clients[:excess])
+
+    receiving = [(len(caseloads[navigator]), navigator) for navigator in navigators
+                 if len(caseloads[navigator]) < targets[navigator]]
+    heapq.heapify(receiving)
+
+    moves = []
+    for client, source in leaving:
+        load, navigator = heapq.heappop(receiving)
+        moves.append((client, source, navigator))
+        if load + 1 < targets[navigator]:
+            heapq.heappush(receiving, (load + 1, navigator))
+    return moves
+
+def caseload_counts(navigators, assignments, moves=()):
+    counts = dict.fromkeys(navigators, 0)
+    for navigator in assignments.values():
+        if navigator in counts:
+            counts[navigator] += 1
+    for _, source, target in moves:
+        if source in counts:
+            counts[source] -= 1
+        counts[target] += 1
+    return counts
+
+def apply_moves(conn, cursor, moves, chunk_size=CHUNK_SIZE):
+    # Returns the moves that were applied
+    applied = []
+    try:
+        for start in range(0, len(moves), chunk_size):
+            applied.extend(apply_chunk(conn, cursor, moves[start:start + chunk_size]))
+    except Exception as e:
+        if applied:
+            raise RebalanceInterrupted(applied) from e
+        raise
+    return applied
+
+def apply_chunk(conn, cursor, chunk):
+    # Commits the chunk and returns the moves in it that applied; nothing is
+    # committed if a statement fails
+    cases = " ".join(["WHEN %s THEN %s"] * len(chunk))
+    pairs = ", ".join(["(%s, %s)"] * len(chunk))
+    params = []
+    for client, _, target in chunk:
+        params.extend((client, target))
+    for client, source, _ in chunk:
+        params.extend((client, source))
+
+    affected = cursor.execute(
+        f"""
+        UPDATE client_details
+        SET care_navigator_username = CASE client_username {cases} END
+        WHERE (client_username, care_navigator_username) IN ({pairs})
+        """,
+        params
+    )
+    if affected == len(chunk):
+        conn.commit()
+        return chunk
+
+    # Some clients were reassigned since the plan was made; re-read the chunk
+    # before committing to know which moves went through
+    placeholders = ", ".join(["%s"] * len(chunk))
+    cursor.execute(
+        f"SELECT client_username, care_navigator_username FROM client_details WHERE client_username IN ({placeholders})",
+        [client for client, _, _ in chunk]
+    )
+    now_with = {row["client_username"]: row["care_navigator_username"] for row in cursor.fetchall()}
+    conn.commit()
+    return [move for move in chunk if now_with.get(move[0]) == move[2]]
+
+def rebalance(conn, cursor, dry_run=True, chunk_size=CHUNK_SIZE):
+    started = time.perf_counter()
+    navigators, assignments, booked = load_state(cursor)
+    conn.rollback()     # nothing held while planning
+    if not navigators:
+        raise ValueError("No active care navigators found")
+
+    moves = plan_moves(navigators, assignments, booked)
+    result = {
+        "dry_run": dry_run,
+        "navigators": len(navigators),
+        "clients": len(assignments),
+        "planned_moves": len(moves),
+        "before": caseload_counts(navigators, assignments)
+    }
+
+    if not dry_run:
+        applied = apply_moves(conn, cursor, moves, chunk_size)
+        result["applied_moves"] = len(applied)
+        result["skipped_moves"] = len(moves) - len(applied)
+        moves = applied
+
+    result["after"] = caseload_counts(navigators, assignments, moves)
+    result["moves"] = [{"client_username": client, "from": source, "to": target} for client, source, target in moves]
+    result["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result, moves
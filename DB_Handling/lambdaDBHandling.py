@@ -1,7 +1,17 @@
 import json
 import pymysql
 import os
-from datetime import datetime, date
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta, timezone
+from caseloadRebalance import CHUNK_SIZE, MAX_CHUNK_SIZE, RebalanceInterrupted, rebalance
+from callerIdentity import CallerIdentityError, caller_identity, check_access, fill_caller_fields, internal_call, prefetch_jwks
+from navigatorClients import clients_of, clients_of_many, invalidate_client, navigator_assigned, prime_caseloads
+from appointmentStats import any_cached as any_stats_cached, appointment_stats, invalidate as invalidate_stats
+from slotAvailability import APPOINTMENT_MINUTES, any_cached as any_slots_cached, available_slots, invalidate as invalidate_slots
+from tracing import active as tracing_active, current as current_span, span, traced_handler
 
 db_config = {
     "host": os.environ['DB_HOST'],
@@ -18,12 +28,441 @@ def serialize_result(result):
 
     return {k: convert(v) for k, v in result.items()}
 
+# Readiness questionnaire answers, in the order the app asks them.
+# Each key maps to the indexed generated column on client_appointments
+# (see migrations/001_questionnaire_json.sql)
+QUESTIONNAIRE_COLUMNS = {
+    "new_symptoms": "q_new_symptoms",
+    "care_plan_challenges": "q_care_plan_challenges",
+    "needs_assistance": "q_needs_assistance",
+    "lifestyle_changes": "q_lifestyle_changes",
+    "tried_resources": "q_tried_resources",
+}
+
+def compact_questionnaire(questionnaire_data):
+    # Store answers only - the question text is static in the app and
+    # was being duplicated into every appointment row
+    if questionnaire_data is None:
+        return None
+    if isinstance(questionnaire_data, str):
+        questionnaire_data = json.loads(questionnaire_data)
+    if not isinstance(questionnaire_data, dict):
+        raise ValueError("questionnaire_data must be a JSON object")
+
+    compact = {k: v for k, v in questionnaire_data.items() if k != "questions"}
+    return json.dumps(compact, separators=(",", ":"))
+
+def questionnaire_columns(keys):
+    # Whitelist requested keys before they are used as column names
+    unknown = [key for key in keys if key not in QUESTIONNAIRE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown questionnaire keys: {', '.join(unknown)}")
+    return [QUESTIONNAIRE_COLUMNS[key] for key in keys]
+
+def answer_value(value):
+    # Generated columns hold 1/0, or NULL when the question was skipped
+    return None if value is None else bool(value)
+
+def readiness_entry(row, questionnaire_keys=None, columns=None):
+    # The readiness details in a row of client_appointments; with
+    # questionnaire_keys only those answers, from the generated columns
+    entry = {
+        "client_note": row["client_note"],
+        "appointment_date_time": row["appointment_date_time"]
+    }
+    if questionnaire_keys is not None:
+        entry["questionnaire"] = {
+            key: answer_value(row[column])
+            for key, column in zip(questionnaire_keys, columns)
+        }
+    else:
+        entry["questionnaire_data"] = row["questionnaire_data"]
+    return serialize_result(entry)
+
+def stream_readiness(cursor, requested, questionnaire_keys=None, columns=None):
+    # Response body for get_clients_readiness_details, encoded one row at a
+    # time as rows arrive from an unbuffered cursor - a full caseload is never
+    # held as a list of rows and then encoded in one go
+    found = set()
+    parts = ['{"data": [']
+    for row in iter(cursor.fetchone, None):
+        if found:
+            parts.append(", ")
+        found.add(row["client_username"].lower())
+        entry = {"client_username": row["client_username"]}
+        entry.update(readiness_entry(row, questionnaire_keys, columns))
+        parts.append(json.dumps(entry))
+    not_found = [client for client in requested if client.lower() not in found]
+    parts.append(f'], "not_found": {json.dumps(not_found)}, "total_clients": {len(found)}}}')
+    return "".join(parts)
+
+def appointments_changed(cursor, appointment_id):
+    # After an appointment was booked, cancelled or completed: the cached free
+    # slots and statistics of the navigator it is booked with are out of date.
+    # That is the navigator on the appointment row, which stays put when the
+    # client moves to another navigator. The lookup is skipped while neither
+    # is cached.
+    if not (any_slots_cached() or any_stats_cached()):
+        return
+    try:
+        cursor.execute(
+            "SELECT care_navigator_username FROM client_appointments WHERE appointment_id = %s",
+            (appointment_id,)
+        )
+    except QueryTimeout:
+        # The write is already committed; the cache entries expire anyway
+        return
+    row = cursor.fetchone()
+    if row and row["care_navigator_username"]:
+        invalidate_slots(row["care_navigator_username"])
+        invalidate_stats(row["care_navigator_username"])
+
+LATEST_ACTIVE_APPOINTMENT_SQL = """
+    SELECT appointment_id
+    FROM client_appointments
+    WHERE client_username = %s AND status = 'active'
+    ORDER BY appointment_id DESC
+    LIMIT 1
+"""
+
+def utc_datetime(value):
+    # ISO 8601 from the app (Calendly start times end in "Z") -> naive UTC
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+# Inserts the appointment unless the client or their care navigator already
+# has an active appointment overlapping it; zero affected rows means a
+# conflict. Both checks are range scans (idx_ca_navigator_time and
+# idx_ca_client_status_time). Under InnoDB's default REPEATABLE READ the
+# statement holds next-key locks on the ranges it scanned until commit, so a
+# concurrent booking into the same range waits, or deadlocks and is retried.
+BOOK_APPOINTMENT_SQL = """
+    INSERT INTO client_appointments (
+        client_username,
+        care_navigator_username,
+        appointment_date_time,
+        client_note,
+        questionnaire_data
+    )
+    SELECT %(client)s, cd.care_navigator_username, CONVERT_TZ(%(start)s, '+00:00', @@session.time_zone), %(note)s, %(questionnaire)s
+    FROM (SELECT 1) AS booking
+    LEFT JOIN client_details cd ON cd.client_username = %(client)s
+    WHERE NOT EXISTS (
+        SELECT 1 FROM client_appointments ca
+        WHERE ca.care_navigator_username = cd.care_navigator_username
+        AND ca.appointment_date_time > CONVERT_TZ(%(after)s, '+00:00', @@session.time_zone)
+        AND ca.appointment_date_time < CONVERT_TZ(%(before)s, '+00:00', @@session.time_zone)
+        AND ca.status = 'active'
+    )
+    AND NOT EXISTS (
+        SELECT 1 FROM client_appointments ca
+        WHERE ca.client_username = %(client)s
+        AND ca.status = 'active'
+        AND ca.appointment_date_time > CONVERT_TZ(%(after)s, '+00:00', @@session.time_zone)
+        AND ca.appointment_date_time < CONVERT_TZ(%(before)s, '+00:00', @@session.time_zone)
+    )
+"""
+BOOKING_ATTEMPTS = 3
+LOCK_CONFLICT_ERRORS = (1205, 1213)     # lock wait timeout, deadlock
+
+MAX_BULK_NAVIGATORS = 200       # per get_navigators_clients request
+MAX_BULK_CLIENTS = 500          # per get_clients_readiness_details request
+
+# First table a statement reads or writes, for naming its trace span
+SQL_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+`?(\w+)", re.IGNORECASE)
+
+def sql_label(sql):
+    verb = sql.split(None, 1)[0].upper() if sql.strip() else "?"
+    table = SQL_TABLE.search(sql)
+    return f"{verb} {table.group(1)}" if table else verb
+
+class TracedCursor:
+    # Times every statement as a "sql ..." span, everything else passes through
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def execute(self, sql, args=None):
+        with span("sql " + sql_label(sql)):
+            return self.cursor.execute(sql, args)
+
+    def executemany(self, sql, args):
+        with span("sql " + sql_label(sql), rows=len(args)):
+            return self.cursor.executemany(sql, args)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+# Execution budgets: every statement of a request has to finish within the
+# action's budget, cut down to what the Lambda has left (minus
+# RESPONSE_MARGIN_MS to answer in), so a slow query ends with a
+# QueryTimeout instead of running until the function itself times out.
+# SELECTs carry a MAX_EXECUTION_TIME hint and are stopped by MySQL. Other
+# statements and commits are bounded by the connection's READ_TIMEOUT, and
+# no statement starts once the deadline has passed.
+# A QueryTimeout means the statement did not complete and the request's open
+# transaction is rolled back. A CommitTimeout is different: the commit was
+# sent but no answer came back, so whether it was applied is unknown. Writes the action committed before it stay:
+# the single-write actions commit last, so for them nothing changed, and
+# rebalance_caseloads, which commits chunk by chunk, reports the moves it
+# applied (see caseloadRebalance.py). Either way the request can be retried.
+DEFAULT_QUERY_BUDGET_MS = 3000
+ACTION_QUERY_BUDGETS_MS = {
+    "get_navigator_appointment_history": 6000,
+    "get_client_appointment_history": 5000,
+    "get_clients_readiness_details": 6000,
+    "get_appointment_stats": 5000,
+    "assign_care_navigator": 4000,
+    "rebalance_caseloads": 60000,
+}
+RESPONSE_MARGIN_MS = 300
+MIN_QUERY_BUDGET_MS = 50
+READ_TIMEOUT = 10               # seconds, socket read timeout for any statement or commit
+CONNECT_TIMEOUT = 3             # seconds
+MAX_EXECUTION_TIME_EXCEEDED = 3024
+SERVER_LOST = 2013
+DUPLICATE_ENTRY = 1062
+
+class QueryTimeout(Exception):
+    pass
+
+class CommitTimeout(QueryTimeout):
+    pass
+
+def query_budget_ms(action, context):
+    budget = ACTION_QUERY_BUDGETS_MS.get(action, DEFAULT_QUERY_BUDGET_MS)
+    remaining = getattr(context, "get_remaining_time_in_millis", None)
+    if remaining is not None:
+        budget = min(budget, remaining() - RESPONSE_MARGIN_MS)
+    return budget
+
+class BudgetedCursor:
+    # Fits every statement into the time left before the request's deadline
+    def __init__(self, cursor, conn, deadline):
+        self.cursor = cursor
+        self.conn = conn
+        self.deadline = deadline
+
+    def remaining_ms(self):
+        remaining = int((self.deadline - time.monotonic()) * 1000)
+        if remaining < MIN_QUERY_BUDGET_MS:
+            raise QueryTimeout("Query time budget exhausted")
+        return remaining
+
+    def run(self, method, sql, args):
+        remaining = self.remaining_ms()
+        stripped = sql.lstrip()
+        if stripped[:6].upper() == "SELECT":
+            sql = f"SELECT /*+ MAX_EXECUTION_TIME({remaining}) */" + stripped[6:]
+        started = time.monotonic()
+        try:
+            return method(sql, args)
+        except pymysql.err.OperationalError as e:
+            now = time.monotonic()
+            if e.args[0] == MAX_EXECUTION_TIME_EXCEEDED or (
+                e.args[0] == SERVER_LOST and (now >= self.deadline or now - started >= READ_TIMEOUT)
+            ):
+                raise QueryTimeout("Query exceeded its time budget") from e
+            raise
+
+    def execute(self, sql, args=None):
+        return self.run(self.cursor.execute, sql, args)
+
+    def executemany(self, sql, args):
+        return self.run(self.cursor.executemany, sql, args)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+class BudgetedConnection:
+    # Reports a commit that got no answer as a CommitTimeout
+    def __init__(self, conn):
+        self.conn = conn
+
+    def commit(self):
+        try:
+            self.conn.commit()
+        except pymysql.err.OperationalError as e:
+            if e.args[0] == SERVER_LOST:
+                raise CommitTimeout("No answer to commit") from e
+            raise
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+# The connection is kept open while the container is warm, one per thread
+# (a Lambda container serves one request at a time). Every request's
+# transaction is rolled back when it ends, so the next request never reads
+# from an old snapshot; the actions commit their own writes.
+CONNECTION_CHECK_AFTER = 30     # seconds idle before a reused connection is pinged
+
+_connections = threading.local()
+
+def get_connection():
+    conn = getattr(_connections, "conn", None)
+    if conn is not None and conn.open:
+        if time.monotonic() - _connections.released_at > CONNECTION_CHECK_AFTER:
+            with span("db.ping"):
+                conn.ping(reconnect=True)
+        return conn
+
+    with span("db.connect"):
+        conn = pymysql.connect(
+            host=db_config["host"],
+            user=db_config["user"],
+            password=db_config["password"],
+            database=db_config["database"],
+            cursorclass=pymysql.cursors.DictCursor,
+            connect_timeout=CONNECT_TIMEOUT,
+            read_timeout=READ_TIMEOUT
+        )
+    _connections.conn = conn
+    return conn
+
+def discard_connection():
+    conn = getattr(_connections, "conn", None)
+    _connections.conn = None
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+@contextmanager
+def database_connection():
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
+        try:
+            conn.rollback()
+            _connections.released_at = time.monotonic()
+        except Exception as e:
+            # The next request opens a new connection
+            print(f"Dropping database connection: {str(e)}")
+            discard_connection()
+
+# Roles are cached so get_user_role is answered without touching the
+# database. They are set when a user is created, but accounts can be
+# re-created with another role (e.g. navigators provisioned by an admin) or
+# edited in the database, so entries are dropped when create_user writes
+# the username and expire after ROLE_CACHE_TTL on other containers.
+ROLE_CACHE_SIZE = 10000
+ROLE_CACHE_TTL = 300            # seconds
+_roles = {}     # username (lower case) -> (role, cached at)
+
+def remember_role(username, role):
+    if not isinstance(username, str) or role is None:
+        return
+    if len(_roles) >= ROLE_CACHE_SIZE:
+        del _roles[next(iter(_roles))]
+    _roles[username.lower()] = (role, time.monotonic())
+
+def forget_role(username):
+    if isinstance(username, str):
+        _roles.pop(username.lower(), None)
+
+def cached_role(username):
+    entry = _roles.get(username.lower()) if isinstance(username, str) else None
+    if entry is None:
+        return None
+    role, cached_at = entry
+    if time.monotonic() - cached_at > ROLE_CACHE_TTL:
+        forget_role(username)
+        return None
+    return role
+
+# Warmup: scheduled warmers and provisioned-concurrency pings send
+# {"warmup": true} or {"ping": true} (or {"source": "aws.events"}). Instead
+# of being treated as a request, they open and check the database connection,
+# load the JWKS and preload hot caches, so the first real request on a new
+# container is not a cold one. They are only accepted from direct invokes
+# whose ClientContext names a caller (see internal_call), never from the
+# body alone, and the response only says which steps passed.
+WARMUP_SOURCES = ("aws.events", "serverless-plugin-warmup")
+WARMUP_ROLE_LIMIT = 5000        # most recently created users preloaded into the role cache
+
+_primed = {"roles": False, "caseloads": False}
+
+def is_warmup(event, context):
+    if not internal_call(context):
+        return False
+    return bool(event.get("warmup") or event.get("ping")) or event.get("source") in WARMUP_SOURCES
+
+def check_database():
+    with database_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+
+def prime_roles():
+    # Once per container; later pings only keep the connection alive
+    if _primed["roles"]:
+        return "cached"
+    with database_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT username, role FROM users ORDER BY created_at DESC LIMIT %s",
+                (WARMUP_ROLE_LIMIT,)
+            )
+            rows = cursor.fetchall()
+    for row in rows:
+        remember_role(row["username"], row["role"])
+    _primed["roles"] = True
+    return len(rows)
+
+def prime_navigator_clients():
+    # Client lists for messaging and notifications, see navigatorClients.py
+    if _primed["caseloads"]:
+        return "cached"
+    with database_connection() as conn:
+        with conn.cursor() as cursor:
+            count = prime_caseloads(cursor)
+    _primed["caseloads"] = True
+    return count
+
+WARMUP_STEPS = [
+    ("database", check_database),
+    ("jwks", prefetch_jwks),
+    ("roles", prime_roles),
+    ("navigator_clients", prime_navigator_clients),
+]
+
+def warm_up():
+    started = time.perf_counter()
+    steps = {}
+    for name, step in WARMUP_STEPS:
+        step_started = time.perf_counter()
+        try:
+            with span("warmup." + name):
+                detail = step()
+            steps[name] = True
+            print(f"Warmup step '{name}' done in {round((time.perf_counter() - step_started) * 1000, 1)}ms: {detail}")
+        except Exception as e:
+            print(f"Warmup step '{name}' failed: {str(e)}")
+            steps[name] = False
+
+    warm = all(steps.values())
+    return response(200 if warm else 503, {
+        "warm": warm,
+        "steps": steps,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1)
+    })
+
+@traced_handler("lambdaDBHandling")
 def lambda_handler(event, context):
     try:
-        body = json.loads(event["body"]) if "body" in event else event
+        with span("parse"):
+            body = json.loads(event["body"]) if "body" in event else event
+
+        if is_warmup(body, context):
+            current_span().set(action="warmup")
+            return warm_up()
 
         action = body.get("action")
         data = body.get("data", {})
+        current_span().set(action=action)
 
         # To be removed
         print("String action:",action)
@@ -32,20 +471,79 @@ def lambda_handler(event, context):
         # Input validation
         if not action:
             return response(400, {"error": "Missing required parameter 'action'"})
+
+        # Who is calling, from their Cognito access token (see callerIdentity.py)
+        try:
+            with span("caller_identity"):
+                caller = caller_identity(event, body, context)
+        except CallerIdentityError as e:
+            return response(e.status_code, {"error": str(e)})
+        if isinstance(data, dict):
+            fill_caller_fields(caller, action, data)
+
         if not data:
             return response(400, {"error": "Missing required parameter 'data'"})
 
-        conn = pymysql.connect(
-            host=db_config["host"],
-            user=db_config["user"],
-            password=db_config["password"],
-            database=db_config["database"],
-            cursorclass=pymysql.cursors.DictCursor
-        )
+        if action == "get_user_role":
+            role = cached_role(data.get("username"))
+            if role is not None:
+                denied = check_access(None, caller, action, data)
+                if denied:
+                    return response(403, {"error": denied})
+                return response(200, {"role": role})
 
-        with conn:
+        budget_ms = query_budget_ms(action, context)
+        if budget_ms < MIN_QUERY_BUDGET_MS:
+            return timeout_response()
+        deadline = time.monotonic() + budget_ms / 1000
+        current_span().set(budget_ms=budget_ms)
+
+        with database_connection() as conn:
             with conn.cursor() as cursor:
-                if action == "create_user":
+                conn = BudgetedConnection(conn)
+                cursor = BudgetedCursor(cursor, conn, deadline)
+                if tracing_active():
+                    cursor = TracedCursor(cursor)
+                denied = check_access(cursor, caller, action, data)
+                if denied:
+                    return response(403, {"error": denied})
+
+                if action == "create_user" and "users" in data:
+                    # Bulk insert, e.g. for care navigators provisioned by lambdaAdminCreatesCN.
+                    # Names other users, so only taken from the auth Lambdas
+                    if not internal_call(context):
+                        return response(403, {"error": "Bulk user creation is not available to app users"})
+                    users = data["users"]
+                    if not isinstance(users, list) or not users:
+                        return response(400, {"error": "'users' must be a non-empty list"})
+
+                    required_fields = ["username", "email", "role", "status", "created_at"]
+                    for index, user in enumerate(users):
+                        for field in required_fields:
+                            if field not in user:
+                                return response(400, {"error": f"Missing required field '{field}' for user {index}"})
+
+                    sql = """
+                        INSERT INTO users (username, email, role, status, calendly_name, created_at)
+                        VALUES (%s, %s, %s, %s, %s, %s)
+                    """
+                    cursor.executemany(sql, [
+                        (
+                            user["username"],
+                            user["email"],
+                            user["role"],
+                            user["status"],
+                            user.get("calendly_name", None),
+                            user["created_at"]
+                        )
+                        for user in users
+                    ])
+                    conn.commit()
+                    for user in users:
+                        forget_role(user["username"])
+                    return response(200, {"message": "Users created", "count": len(users)})
+
+                elif action == "create_user":
                     # Validate required fields
                     required_fields = ["username", "email", "role", "status", "created_at"]
                     for field in required_fields:
@@ -56,15 +554,28 @@ def lambda_handler(event, context):
                         INSERT INTO users (username, email, role, status, calendly_name, created_at)
                         VALUES (%s, %s, %s, %s, %s, %s)
                     """
-                    cursor.execute(sql, (
-                        data["username"],
-                        data["email"],
-                        data["role"],
-                        data["status"],
-                        data.get("calendly_name", None),  # Optional field (Value or None)
-                        data["created_at"]
-                    ))
+                    try:
+                        cursor.execute(sql, (
+                            data["username"],
+                            data["email"],
+                            data["role"],
+                            data["status"],
+                            data.get("calendly_name", None),  # Optional field (Value or None)
+                            data["created_at"]
+                        ))
+                    except pymysql.err.IntegrityError as e:
+                        if e.args[0] != DUPLICATE_ENTRY:
+                            raise
+                        # A retried sign-up whose first insert went through is
+                        # not an error; anyone else's row is
+                        conn.rollback()
+                        cursor.execute("SELECT email FROM users WHERE username = %s", (data["username"],))
+                        existing = cursor.fetchone()
+                        if existing and existing["email"].lower() == data["email"].lower():
+                            return response(200, {"message": "User already exists", "username": data["username"], "existing": True})
+                        return response(409, {"error": "Username already exists"})
                     conn.commit()
+                    forget_role(data["username"])
                     return response(200, {"message": "User created", "username": data["username"]})
                 
                 elif action == "get_user_role":
@@ -78,6 +589,7 @@ def lambda_handler(event, context):
                     result = cursor.fetchone()
 
                     if result:
+                        remember_role(data["username"], result["role"])
                         result = serialize_result(result)
                         return response(200, result)
                     else:
@@ -98,7 +610,25 @@ def lambda_handler(event, context):
                         return response(200, result)
                     else:
                         return response(404, {"error": "User not found"})
-                
+
+                elif action == "get_user_role_status":
+                    # Both fields in one lookup, for the enriched sign-in (lambdaSignIn)
+                    if "username" not in data:
+                        return response(400, {"error": "Missing 'username'"})
+
+                    sql = "SELECT role, status FROM users WHERE username = %s"
+                    cursor.execute(sql, (
+                        data["username"],
+                    ))
+                    result = cursor.fetchone()
+
+                    if result:
+                        remember_role(data["username"], result["role"])
+                        result = serialize_result(result)
+                        return response(200, result)
+                    else:
+                        return response(404, {"error": "User not found"})
+
                 elif action == "get_client_cn_calendly":
                     if "client_username" not in data:
                         return response(400, {"error": "Missing 'client_username'"})
@@ -137,18 +667,32 @@ def lambda_handler(event, context):
                     else:
                         return response(404, {"error": "Calendly name not found for this care navigator"})
 
+                elif action == "get_available_slots":
+                    # Free slots from the navigator's working hours and active
+                    # appointments, cached per navigator (see slotAvailability.py)
+                    if "care_navigator_username" not in data:
+                        return response(400, {"error": "Missing 'care_navigator_username'"})
+
+                    try:
+                        result = available_slots(cursor, data["care_navigator_username"], data)
+                    except ValueError as e:
+                        return response(400, {"error": str(e)})
+                    return response(200, result)
+
                 elif action == "confirmed_client":
                     if "username" not in data:
                         return response(400, {"error": "Missing 'username'"})
                     
-                    sql = "UPDATE users SET status = 1 WHERE username = %s"
+                    # Public (see callerIdentity.PUBLIC_ACTIONS), so only an
+                    # unconfirmed user is moved on
+                    sql = "UPDATE users SET status = 1 WHERE username = %s AND status = 0"
                     affected_rows = cursor.execute(sql, (data["username"],))
                     conn.commit()
                     
                     if affected_rows > 0:
                         return response(200, {"message": "Client email verified successfully"})
                     else:
-                        return response(404, {"error": "User not found"})
+                        return response(404, {"error": "No unconfirmed user found"})
 
                 elif action == "active_user":
                     if "username" not in data:
@@ -183,30 +727,47 @@ def lambda_handler(event, context):
                         if field not in data:
                             return response(400, {"error": f"Missing required field '{field}'"})
                     
-                    # Extract questionnaire data
-                    questionnaire_data = data.get("questionnaire_data", None)
-                    
-                    sql = """
-                        INSERT INTO client_appointments (
-                            client_username, 
-                            appointment_date_time, 
-                            client_note, 
-                            questionnaire_data
-                        )
-                        VALUES (%s, %s, %s, %s)
-                    """
-                    
-                    cursor.execute(sql, (
-                        data["client_username"], 
-                        data["local_start_time"], 
-                        data.get("client_note", ""),
-                        questionnaire_data
-                    ))
-                    conn.commit()
+                    # Extract questionnaire data and drop the redundant question text
+                    try:
+                        questionnaire_data = compact_questionnaire(data.get("questionnaire_data", None))
+                    except ValueError:
+                        return response(400, {"error": "Invalid 'questionnaire_data'"})
+
+                    try:
+                        start = utc_datetime(data["local_start_time"])
+                    except (AttributeError, TypeError, ValueError):
+                        return response(400, {"error": "Invalid 'local_start_time'"})
+
+                    length = timedelta(minutes=APPOINTMENT_MINUTES)
+                    booking = {
+                        "client": data["client_username"],
+                        "start": start,
+                        "after": start - length,
+                        "before": start + length,
+                        "note": data.get("client_note", ""),
+                        "questionnaire": questionnaire_data
+                    }
 
+                    # Conflict check and insert are one statement; lock
+                    # conflicts with a concurrent booking are retried
+                    for attempt in range(BOOKING_ATTEMPTS):
+                        try:
+                            inserted = cursor.execute(BOOK_APPOINTMENT_SQL, booking)
+                            conn.commit()
+                            break
+                        except pymysql.err.OperationalError as e:
+                            conn.rollback()
+                            if e.args[0] not in LOCK_CONFLICT_ERRORS or attempt == BOOKING_ATTEMPTS - 1:
+                                raise
+
+                    if not inserted:
+                        return response(409, {"error": "The client or their care navigator already has an appointment at this time"})
+
+                    appointment_id = cursor.lastrowid
+                    appointments_changed(cursor, appointment_id)
                     return response(200, {
                         "message": "Appointment created successfully", 
-                        "appointment_id": cursor.lastrowid
+                        "appointment_id": appointment_id
                     })
                 
                 elif action == "get_active_appointment":
@@ -245,23 +806,17 @@ def lambda_handler(event, context):
                     if "client_username" not in data:
                         return response(400, {"error": "Missing 'client_username'"})
                     
-                    sql = """
-                            UPDATE client_appointments 
-                            SET status = 'cancelled'
-                            WHERE appointment_id = (
-                                SELECT appointment_id FROM (
-                                    SELECT appointment_id 
-                                    FROM client_appointments 
-                                    WHERE client_username = %s AND status = 'active'
-                                    ORDER BY appointment_id DESC 
-                                    LIMIT 1
-                                ) AS subquery
-                            )
-                        """
-                    affected_rows = cursor.execute(sql, (data["client_username"],))
+                    cursor.execute(LATEST_ACTIVE_APPOINTMENT_SQL, (data["client_username"],))
+                    appointment = cursor.fetchone()
+                    if not appointment:
+                        return response(404, {"error": "No active appointment found for this client"})
+
+                    sql = "UPDATE client_appointments SET status = 'cancelled' WHERE appointment_id = %s AND status = 'active'"
+                    affected_rows = cursor.execute(sql, (appointment["appointment_id"],))
                     conn.commit()
-                    
+
                     if affected_rows > 0:
+                        appointments_changed(cursor, appointment["appointment_id"])
                         return response(200, {"message": "Appointment cancelled successfully"})
                     else:
                         return response(404, {"error": "No active appointment found for this client"})
@@ -270,23 +825,17 @@ def lambda_handler(event, context):
                     if "client_username" not in data:
                         return response(400, {"error": "Missing 'client_username'"})
 
-                    sql = """
-                        UPDATE client_appointments 
-                        SET status = 'completed'
-                        WHERE appointment_id = (
-                            SELECT appointment_id FROM (
-                                SELECT appointment_id 
-                                FROM client_appointments 
-                                WHERE client_username = %s AND status = 'active'
-                                ORDER BY appointment_id DESC 
-                                LIMIT 1
-                            ) AS subquery
-                        )
-                    """
-                    affected_rows = cursor.execute(sql, (data["client_username"],))
+                    cursor.execute(LATEST_ACTIVE_APPOINTMENT_SQL, (data["client_username"],))
+                    appointment = cursor.fetchone()
+                    if not appointment:
+                        return response(404, {"error": "No active appointment found for this client"})
+
+                    sql = "UPDATE client_appointments SET status = 'completed' WHERE appointment_id = %s AND status = 'active'"
+                    affected_rows = cursor.execute(sql, (appointment["appointment_id"],))
                     conn.commit()
-                    
+
                     if affected_rows > 0:
+                        appointments_changed(cursor, appointment["appointment_id"])
                         return response(200, {"message": "Appointment marked as completed successfully"})
                     else:
                         return response(404, {"error": "No active appointment found for this client"})
@@ -352,6 +901,7 @@ def lambda_handler(event, context):
                         data["username"]
                     ))
                     conn.commit()
+                    invalidate_client(data["username"])
                     return response(200, {"message": "Client details updated successfully", "username": data["username"]})
                     
                 elif action == "update_cn_details":
@@ -411,76 +961,162 @@ def lambda_handler(event, context):
                     if "care_navigator_username" not in data:
                         return response(400, {"error": "Missing 'care_navigator_username'"})
                     
-                    sql = """
-                        SELECT client_username 
-                        FROM client_details 
-                        WHERE care_navigator_username = %s
-                        ORDER BY client_username
-                    """
-                    cursor.execute(sql, (data["care_navigator_username"],))
-                    results = cursor.fetchall()
-                    
-                    if results:
-                        client_list = [row["client_username"] for row in results]
-                        return response(200, {
-                            "care_navigator_username": data["care_navigator_username"],
-                            "clients": client_list,
-                            "total_clients": len(client_list)
-                        })
-                    else:
-                        return response(200, {
-                            "care_navigator_username": data["care_navigator_username"],
-                            "clients": [],
-                            "total_clients": 0
-                        })
+                    # Served from the cached client lists (navigatorClients.py)
+                    client_list = clients_of(cursor, data["care_navigator_username"])
+                    return response(200, {
+                        "care_navigator_username": data["care_navigator_username"],
+                        "clients": client_list,
+                        "total_clients": len(client_list)
+                    })
 
                 # For readiness                
                 elif action == "get_navigator_clients":
                     if "care_navigator_username" not in data:
                         return response(400, {"error": "Missing 'care_navigator_username'"})
                     
-                    sql = "SELECT DISTINCT client_username FROM client_details WHERE care_navigator_username = %s"
-                    cursor.execute(sql, (data["care_navigator_username"],))
-                    results = cursor.fetchall()
-                    
-                    if results:
-                        clients = [{"client_username": row["client_username"]} for row in results]
-                        return response(200, {"data": clients})
-                    else:
-                        return response(200, {"data": []})
+                    clients = [{"client_username": client} for client in clients_of(cursor, data["care_navigator_username"])]
+                    return response(200, {"data": clients})
+
+                # Bulk fan-out, e.g. broadcasting to the clients of many navigators
+                elif action == "get_navigators_clients":
+                    navigators = data.get("care_navigator_usernames")
+                    if (not isinstance(navigators, list) or not navigators
+                            or not all(isinstance(navigator, str) for navigator in navigators)):
+                        return response(400, {"error": "'care_navigator_usernames' must be a non-empty list of usernames"})
+                    if len(navigators) > MAX_BULK_NAVIGATORS:
+                        return response(400, {"error": f"At most {MAX_BULK_NAVIGATORS} care navigators can be requested at once"})
+
+                    caseloads = clients_of_many(cursor, navigators)
+                    return response(200, {
+                        "data": caseloads,
+                        "total_clients": sum(len(clients) for clients in caseloads.values())
+                    })
 
                 elif action == "get_client_readiness_details":
                     if "client_username" not in data:
                         return response(400, {"error": "Missing 'client_username'"})
-                    
-                    sql = """
-                        SELECT questionnaire_data, client_note, appointment_date_time 
-                        FROM client_appointments 
-                        WHERE client_username = %s AND status = 'active'
-                        ORDER BY created_timestamp DESC 
-                        LIMIT 1
-                    """
+
+                    # Optional partial retrieval of specific questionnaire answers
+                    questionnaire_keys = data.get("questionnaire_keys")
+                    if questionnaire_keys is not None:
+                        if not isinstance(questionnaire_keys, list) or not questionnaire_keys:
+                            return response(400, {"error": "'questionnaire_keys' must be a non-empty list"})
+                        try:
+                            columns = questionnaire_columns(questionnaire_keys)
+                        except ValueError as e:
+                            return response(400, {"error": str(e)})
+
+                        sql = f"""
+                            SELECT {", ".join(columns)}, client_note, appointment_date_time
+                            FROM client_appointments
+                            WHERE client_username = %s AND status = 'active'
+                            ORDER BY created_timestamp DESC
+                            LIMIT 1
+                        """
+                    else:
+                        columns = None
+                        sql = """
+                            SELECT questionnaire_data, client_note, appointment_date_time 
+                            FROM client_appointments 
+                            WHERE client_username = %s AND status = 'active'
+                            ORDER BY created_timestamp DESC 
+                            LIMIT 1
+                        """
                     cursor.execute(sql, (data["client_username"],))
                     result = cursor.fetchone()
                     
                     if result:
-                        # Handle the datetime conversion properly - use dictionary keys
-                        appointment_datetime = None
-                        if result["appointment_date_time"]:
-                            if hasattr(result["appointment_date_time"], 'isoformat'):
-                                appointment_datetime = result["appointment_date_time"].isoformat()
-                            else:
-                                appointment_datetime = str(result["appointment_date_time"])
-                        
-                        readiness_data = {
-                            "questionnaire_data": result["questionnaire_data"],
-                            "client_note": result["client_note"],
-                            "appointment_date_time": appointment_datetime
-                        }
-                        result = serialize_result(readiness_data)
-                        return response(200, result)
+                        return response(200, readiness_entry(result, questionnaire_keys, columns))
                     else:
                         return response(404, {"error": "No active appointment found for this client"})
+
+                # Readiness of a whole caseload in one request
+                elif action == "get_clients_readiness_details":
+                    clients = data.get("client_usernames")
+                    if (not isinstance(clients, list) or not clients
+                            or not all(isinstance(client, str) for client in clients)):
+                        return response(400, {"error": "'client_usernames' must be a non-empty list of usernames"})
+                    if len(clients) > MAX_BULK_CLIENTS:
+                        return response(400, {"error": f"At most {MAX_BULK_CLIENTS} clients can be requested at once"})
+                    clients = list(dict.fromkeys(clients))
+
+                    questionnaire_keys = data.get("questionnaire_keys")
+                    if questionnaire_keys is not None:
+                        if not isinstance(questionnaire_keys, list) or not questionnaire_keys:
+                            return response(400, {"error": "'questionnaire_keys' must be a non-empty list"})
+                        try:
+                            columns = questionnaire_columns(questionnaire_keys)
+                        except ValueError as e:
+                            return response(400, {"error": str(e)})
+                        selected = ", ".join(columns)
+                    else:
+                        columns = None
+                        selected = "questionnaire_data"
+
+                    # Each client's latest active appointment, ranked in one pass
+                    # over idx_ca_client_status_time
+                    placeholders = ", ".join(["%s"] * len(clients))
+                    sql = f"""
+                        SELECT client_username, {selected}, client_note, appointment_date_time
+                        FROM (
+                            SELECT client_username, {selected}, client_note, appointment_date_time,
+                                ROW_NUMBER() OVER (PARTITION BY client_username ORDER BY created_timestamp DESC) AS recency
+                            FROM client_appointments
+                            WHERE client_username IN ({placeholders}) AND status = 'active'
+                        ) latest
+                        WHERE recency = 1
+                        ORDER BY client_username
+                    """
+                    with conn.cursor(pymysql.cursors.SSDictCursor) as stream:
+                        stream = BudgetedCursor(stream, conn, deadline)
+                        if tracing_active():
+                            stream = TracedCursor(stream)
+                        stream.execute(sql, clients)
+                        with span("encode"):
+                            encoded = stream_readiness(stream, clients, questionnaire_keys, columns)
+                    return encoded_response(200, encoded)
+
+                # Navigator filter on readiness answers. Only each client's
+                # latest active appointment counts, as in
+                # get_clients_readiness_details, so a client is listed once.
+                # The navigator is the client's current one (client_details),
+                # not the one an older booking was made with, so the list
+                # matches the navigator's caseload.
+                elif action == "get_clients_by_readiness":
+                    if "care_navigator_username" not in data:
+                        return response(400, {"error": "Missing 'care_navigator_username'"})
+
+                    answers = data.get("answers")
+                    if not isinstance(answers, dict) or not answers:
+                        return response(400, {"error": "'answers' must be a non-empty object"})
+                    try:
+                        columns = questionnaire_columns(list(answers))
+                    except ValueError as e:
+                        return response(400, {"error": str(e)})
+
+                    selected = ", ".join(f"ca.{column}" for column in columns)
+                    conditions = " AND ".join(f"latest.{column} = %s" for column in columns)
+                    sql = f"""
+                        SELECT latest.client_username, latest.appointment_date_time
+                        FROM (
+                            SELECT ca.client_username, ca.appointment_date_time, {selected},
+                                ROW_NUMBER() OVER (PARTITION BY ca.client_username ORDER BY ca.created_timestamp DESC) AS recency
+                            FROM client_details cd
+                            INNER JOIN client_appointments ca ON ca.client_username = cd.client_username
+                            WHERE cd.care_navigator_username = %s
+                            AND ca.status = 'active'
+                        ) latest
+                        WHERE recency = 1
+                        AND {conditions}
+                        ORDER BY latest.appointment_date_time ASC
+                    """
+                    params = [data["care_navigator_username"]]
+                    params.extend(1 if answers[key] else 0 for key in answers)
+                    cursor.execute(sql, params)
+                    results = cursor.fetchall()
+
+                    clients = [serialize_result(row) for row in results]
+                    return response(200, {"data": clients, "total_clients": len(clients)})
                     
                 elif action == "get_client_appointment_history":
                     if "client_username" not in data:
@@ -509,6 +1145,10 @@ def lambda_handler(event, context):
                     if "care_navigator_username" not in data:
                         return response(400, {"error": "Missing 'care_navigator_username'"})
                     
+                    # Every appointment of the navigator's current clients,
+                    # including those booked with a previous navigator.
+                    # get_appointment_stats counts by the navigator each
+                    # appointment was booked with instead (see appointmentStats.py)
                     sql = """
                         SELECT ca.appointment_id, ca.client_username, ca.appointment_date_time, 
                             ca.status, ca.created_timestamp, ca.client_note
@@ -528,6 +1168,17 @@ def lambda_handler(event, context):
                         return response(200, {"data": appointments})
                     else:
                         return response(404, {"error": "No appointment history found for this care navigator"})
+
+                # Counts per month and status, instead of counting the full history in the app
+                elif action == "get_appointment_stats":
+                    if "care_navigator_username" not in data:
+                        return response(400, {"error": "Missing 'care_navigator_username'"})
+
+                    try:
+                        stats = appointment_stats(cursor, data["care_navigator_username"], data)
+                    except ValueError as e:
+                        return response(400, {"error": str(e)})
+                    return response(200, stats)
                 
                 elif action == "assign_care_navigator":
                     # Requires client_username to be passed
@@ -586,6 +1237,7 @@ def lambda_handler(event, context):
                         
                         if affected_rows > 0:
                             conn.commit()
+                            navigator_assigned(client_username, assigned_navigator)
                             return response(200, {
                                 "message": "Care navigator assigned successfully",
                                 "client_username": client_username,
@@ -595,24 +1247,92 @@ def lambda_handler(event, context):
                         else:
                             return response(500, {"error": "Failed to update client assignment"})
                         
+                    except QueryTimeout:
+                        raise
                     except Exception as e:
                         conn.rollback()
                         return response(500, {"error": f"Database error: {str(e)}"})
 
+                # Scheduled or admin job, see caseloadRebalance.py. Plans only
+                # unless "dry_run" is false. Only accepted from invocations
+                # that carry a ClientContext naming the caller, which API
+                # Gateway requests cannot, whatever DB_AUTH_MODE is.
+                elif action == "rebalance_caseloads":
+                    if not internal_call(context):
+                        return response(403, {"error": "Rebalancing is not available to app users"})
+
+                    dry_run = data.get("dry_run", True)
+                    chunk_size = data.get("chunk_size", CHUNK_SIZE)
+                    if not isinstance(dry_run, bool):
+                        return response(400, {"error": "'dry_run' must be true or false"})
+                    if not isinstance(chunk_size, int) or not 1 <= chunk_size <= MAX_CHUNK_SIZE:
+                        return response(400, {"error": f"'chunk_size' must be a whole number from 1 to {MAX_CHUNK_SIZE}"})
+
+                    try:
+                        result, moves = rebalance(conn, cursor, dry_run, chunk_size)
+                    except ValueError as e:
+                        return response(404, {"error": str(e)})
+                    except RebalanceInterrupted as e:
+                        # The chunks committed before the failure stay applied
+                        for client, _, navigator in e.applied:
+                            navigator_assigned(client, navigator)
+                        if not isinstance(e.__cause__, QueryTimeout) or isinstance(e.__cause__, CommitTimeout):
+                            raise e.__cause__
+                        return response(503, {
+                            "error": "Rebalancing stopped partway. Please try again.",
+                            "code": "QueryTimeout",
+                            "retryable": True,
+                            "applied_moves": len(e.applied)
+                        })
+                    if not dry_run:
+                        for client, _, navigator in moves:
+                            navigator_assigned(client, navigator)
+                    return response(200, result)
+
                 else:
                     return response(400, {"error": f"Invalid action: '{action}'"})
 
 
+    except CommitTimeout as e:
+        print(f"Commit timeout: {str(e)}")
+        return timeout_response(commit_unknown=True)
+    except QueryTimeout as e:
+        print(f"Query timeout: {str(e)}")
+        return timeout_response()
     except Exception as e:
         print(f"Error: {str(e)}")
         return response(500, {"error": str(e)})
 
+def timeout_response(commit_unknown=False):
+    # Distinct from other failures: the timed-out statement was rolled back
+    # and the actions that reach here have no earlier commit, so a retry
+    # starts over cleanly. After a CommitTimeout the write may or may not
+    # have been applied, so the caller has to check before retrying.
+    if commit_unknown:
+        return response(503, {
+            "error": "The request took too long and may not have been saved. Please check before trying again.",
+            "code": "CommitTimeout",
+            "commit_state": "unknown",
+            "retryable": False
+        })
+    return response(503, {
+        "error": "The request took too long. Please try again.",
+        "code": "QueryTimeout",
+        "retryable": True
+    })
+
 def response(status_code, body):
+    with span("encode"):
+        encoded = json.dumps(body)
+    return encoded_response(status_code, encoded)
+
+def encoded_response(status_code, encoded):
+    # For bodies already encoded as JSON
     return {
         "statusCode": status_code,
         "headers": {
             "Access-Control-Allow-Origin": "*",
             "Content-Type": "application/json"
         },
-        "body": json.dumps(body)
+        "body": encoded
     }
@@ -0,0 +1,50 @@
+-- Compact, structured storage for client_appointments.questionnaire_data
+--
+-- create_appointment now stores only the answers ({"answers": [...]}) instead
+-- of repeating the question text in every row. The column becomes a native
+-- JSON column (binary storage, validated on insert) and the readiness answers
+-- are exposed as generated columns so navigators can filter on them through
+-- an index instead of pulling every blob.
+
+-- 1. Strip the duplicated question text from existing rows
+UPDATE client_appointments
+SET questionnaire_data = JSON_REMOVE(questionnaire_data, '$.questions')
+WHERE questionnaire_data IS NOT NULL
+AND JSON_VALID(questionnaire_data)
+AND JSON_CONTAINS_PATH(questionnaire_data, 'one', '$.questions');
+
+-- Rows that never held valid JSON cannot be converted, clear them first
+UPDATE client_appointments
+SET questionnaire_data = NULL
+WHERE questionnaire_data IS NOT NULL
+AND NOT JSON_VALID(questionnaire_data);
+
+-- 2. Native JSON column
+ALTER TABLE client_appointments
+    MODIFY questionnaire_data JSON NULL;
+
+-- 3. Generated columns for the key answers (1 = yes, 0 = no, NULL = unanswered)
+--    Order matches the questions in screens/ReadinessQuestionnaire.js
+ALTER TABLE client_appointments
+    ADD COLUMN q_new_symptoms TINYINT(1) GENERATED ALWAYS AS (
+        CASE questionnaire_data->>'$.answers[0]' WHEN 'true' THEN 1 WHEN 'false' THEN 0 END
+    ) VIRTUAL,
+    ADD COLUMN q_care_plan_challenges TINYINT(1) GENERATED ALWAYS AS (
+        CASE questionnaire_data->>'$.answers[1]' WHEN 'true' THEN 1 WHEN 'false' THEN 0 END
+    ) VIRTUAL,
+    ADD COLUMN q_needs_assistance TINYINT(1) GENERATED ALWAYS AS (
+        CASE questionnaire_data->>'$.answers[2]' WHEN 'true' THEN 1 WHEN 'false' THEN 0 END
+    ) VIRTUAL,
+    ADD COLUMN q_lifestyle_changes TINYINT(1) GENERATED ALWAYS AS (
+        CASE questionnaire_data->>'$.answers[3]' WHEN 'true' THEN 1 WHEN 'false' THEN 0 END
+    ) VIRTUAL,
+    ADD COLUMN q_tried_resources TINYINT(1) GENERATED ALWAYS AS (
+        CASE questionnaire_data->>'$.answers[4]' WHEN 'true' THEN 1 WHEN 'false' THEN 0 END
+    ) VIRTUAL;
+
+-- 4. Secondary indexes used by get_clients_by_readiness
+CREATE INDEX idx_ca_new_symptoms ON client_appointments (q_new_symptoms, status, client_username);
+CREATE INDEX idx_ca_care_plan_challenges ON client_appointments (q_care_plan_challenges, status, client_username);
+CREATE INDEX idx_ca_needs_assistance ON client_appointments (q_needs_assistance, status, client_username);
+CREATE INDEX idx_ca_lifestyle_changes ON client_appointments (q_lifestyle_changes, status, client_username);
+CREATE INDEX idx_ca_tried_resources ON client_appointments (q_tried_resources, status, client_username);
@@ -0,0 +1,21 @@
+-- Weekly working hours of care navigators, for get_available_slots
+--
+-- One row per working period: weekday 0 = Monday .. 6 = Sunday, times in
+-- Sri Lanka local time (+05:30). A navigator may have several periods a day
+-- (e.g. 09:00-12:00 and 13:00-17:00). Navigators without rows are treated as
+-- working Monday to Friday, 09:00-17:00 (slotAvailability.DEFAULT_WORKING_HOURS).
+
+CREATE TABLE cn_working_hours (
+    cn_username VARCHAR(255) NOT NULL,
+    weekday TINYINT NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    PRIMARY KEY (cn_username, weekday, start_time),
+    CONSTRAINT chk_cn_working_hours_weekday CHECK (weekday BETWEEN 0 AND 6),
+    CONSTRAINT chk_cn_working_hours_period CHECK (start_time < end_time)
+);
+
+-- Active appointments of a navigator's clients are looked up through
+-- client_details.care_navigator_username
+CREATE INDEX idx_cd_care_navigator ON client_details (care_navigator_username, client_username);
+CREATE INDEX idx_ca_client_status_time ON client_appointments (client_username, status, appointment_date_time);
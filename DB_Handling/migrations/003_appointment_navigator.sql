@@ -0,0 +1,18 @@
+-- Care navigator on each appointment, for overlap checks in create_appointment
+--
+-- create_appointment copies the client's navigator onto the row it inserts,
+-- and rejects a booking that overlaps an active appointment of the same
+-- navigator (or of the same client) with a range scan on
+-- idx_ca_navigator_time, in the same statement as the insert.
+-- get_available_slots reads a navigator's appointments through the same index.
+
+ALTER TABLE client_appointments
+    ADD COLUMN care_navigator_username VARCHAR(255) NULL AFTER client_username;
+
+-- Existing appointments belong to the client's current navigator
+UPDATE client_appointments ca
+INNER JOIN client_details cd ON ca.client_username = cd.client_username
+SET ca.care_navigator_username = cd.care_navigator_username
+WHERE ca.care_navigator_username IS NULL;
+
+CREATE INDEX idx_ca_navigator_time ON client_appointments (care_navigator_username, appointment_date_time);
@@ -0,0 +1,10 @@
+-- Status in the navigator index, for get_appointment_stats
+--
+-- get_appointment_stats counts a navigator's appointments per month and
+-- status over a date range. With status as the last column of
+-- idx_ca_navigator_time the count is answered from the index alone, and the
+-- overlap check in create_appointment filters on status without reading rows.
+
+ALTER TABLE client_appointments
+    DROP INDEX idx_ca_navigator_time,
+    ADD INDEX idx_ca_navigator_time (care_navigator_username, appointment_date_time, status);
@@ -0,0 +1,129 @@
+import threading
+import time
+
+# Care navigator -> clients, for messaging and notification fan-out
+# (get_care_navigator_clients, get_navigator_clients, get_navigators_clients).
+#
+# Each navigator's client list is read from client_details once and kept,
+# in the query's ORDER BY order, while the container is warm. Usernames are
+# matched case-insensitively, like the database does, so cache keys are lower
+# case. An assignment made here removes the client from their old list and
+# drops the new navigator's list, which is read again in order on the next
+# lookup (navigator_assigned()); update_client_details drops the list holding
+# that client (invalidate_client()). Lists expire after CASELOAD_CACHE_TTL so
+# assignments made through other containers show up.
+#
+# A load that was running while a list was changed or dropped may have read
+# the old rows, so it is returned but not stored (see _generation).
+#
+# Lookups for several navigators load every missing list with one query.
+
+CASELOAD_CACHE_TTL = 60         # seconds
+CASELOAD_CACHE_SIZE = 500       # navigators
+WARMUP_CASELOAD_LIMIT = 200     # most recently created navigators preloaded by warmup
+
+_caseloads = {}     # navigator (lower case) -> Caseload
+_navigator_of = {}  # client (lower case) -> navigator, for the clients of cached navigators
+_generation = 0     # bumped whenever a cached list is changed or dropped
+_lock = threading.Lock()
+
+class Caseload:
+    def __init__(self, clients):
+        self.clients = list(clients)
+        self.loaded_at = time.monotonic()
+
+    def fresh(self):
+        return time.monotonic() - self.loaded_at < CASELOAD_CACHE_TTL
+
+    def discard(self, client):
+        self.clients = [c for c in self.clients if c.lower() != client]
+
+def _drop(navigator):
+    # Caller holds _lock
+    entry = _caseloads.pop(navigator, None)
+    if entry is not None:
+        for client in entry.clients:
+            if _navigator_of.get(client.lower()) == navigator:
+                del _navigator_of[client.lower()]
+
+def _store(navigator, clients):
+    # Caller holds _lock
+    _drop(navigator)
+    if len(_caseloads) >= CASELOAD_CACHE_SIZE:
+        _drop(next(iter(_caseloads)))
+    _caseloads[navigator] = Caseload(clients)
+    for client in clients:
+        _navigator_of[client.lower()] = navigator
+
+def load_caseloads(cursor, navigators):
+    # navigators are lower case; returns navigator -> client usernames in order
+    generation = _generation
+    placeholders = ", ".join(["%s"] * len(navigators))
+    cursor.execute(
+        f"""
+        SELECT care_navigator_username, client_username
+        FROM client_details
+        WHERE care_navigator_username IN ({placeholders})
+        ORDER BY care_navigator_username, client_username
+        """,
+        list(navigators)
+    )
+    loaded = {navigator: [] for navigator in navigators}
+    for row in cursor.fetchall():
+        loaded.setdefault(row["care_navigator_username"].lower(), []).append(row["client_username"])
+    with _lock:
+        if generation == _generation:
+            for navigator, clients in loaded.items():
+                _store(navigator, clients)
+    return loaded
+
+def clients_of_many(cursor, navigators):
+    # navigator -> client usernames ordered by username, for every navigator asked for
+    result = {}
+    missing = []
+    for navigator in dict.fromkeys(navigators):
+        entry = _caseloads.get(navigator.lower())
+        if entry is not None and entry.fresh():
+            result[navigator] = list(entry.clients)
+        else:
+            missing.append(navigator)
+    if missing:
+        loaded = load_caseloads(cursor, list(dict.fromkeys(navigator.lower() for navigator in missing)))
+        for navigator in missing:
+            result[navigator] = list(loaded.get(navigator.lower(), ()))
+    return result
+
+def clients_of(cursor, navigator):
+    return clients_of_many(cursor, [navigator])[navigator]
+
+def navigator_assigned(client, navigator):
+    # After client_details.care_navigator_username was set and committed
+    global _generation
+    client = client.lower()
+    with _lock:
+        _generation += 1
+        previous = _navigator_of.pop(client, None)
+        if previous in _caseloads:
+            _caseloads[previous].discard(client)
+        _drop(navigator.lower())
+
+def invalidate_client(client):
+    # The client's row changed some other way; their navigator's list is
+    # read again on the next lookup
+    global _generation
+    with _lock:
+        _generation += 1
+        navigator = _navigator_of.get(client.lower())
+        if navigator is not None:
+            _drop(navigator)
+
+def prime_caseloads(cursor):
+    # For warmup: the lists of the most recently created active navigators
+    cursor.execute(
+        "SELECT username FROM users WHERE role = 1 AND status = 2 ORDER BY created_at DESC LIMIT %s",
+        (WARMUP_CASELOAD_LIMIT,)
+    )
+    navigators = [row["username"] for row in cursor.fetchall()]
+    if navigators:
+        load_caseloads(cursor, navigators)
+    return len(navigators)
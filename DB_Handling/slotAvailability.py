@@ -0,0 +1,171 @@
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+# Free appointment slots for get_available_slots.
+#
+# A navigator's free time is their weekly working hours (cn_working_hours,
+# see migrations/002_cn_working_hours.sql) minus their active appointments
+# (read through idx_ca_navigator_time, migrations/003_appointment_navigator.sql).
+# Both are loaded once per navigator into an interval index - the busy
+# intervals sorted and merged so they never overlap - and the free slots for
+# a whole date range come out of a single pass that walks the slot grid and
+# the busy intervals side by side.
+#
+# Index entries are cached per navigator. create_appointment,
+# cancel_appointment and complete_appointment invalidate the navigator's
+# entry in this container (appointments_changed in lambdaDBHandling), and
+# entries expire after SLOT_CACHE_TTL so bookings made through other
+# containers show up too.
+
+COLOMBO_TZ = timezone(timedelta(hours=5, minutes=30))   # working hours are local times
+APPOINTMENT_MINUTES = 30        # length of a booked appointment
+DEFAULT_SLOT_MINUTES = 30
+MIN_SLOT_MINUTES = 10
+MAX_SLOT_MINUTES = 240
+DEFAULT_RANGE_DAYS = 7
+MAX_RANGE_DAYS = 31
+SLOT_CACHE_TTL = 60             # seconds
+SLOT_CACHE_SIZE = 500           # navigators
+
+# Used for navigators without rows in cn_working_hours: Monday to Friday,
+# 09:00 - 17:00. Weekday -> [(start minute, end minute)], Monday = 0
+DEFAULT_WORKING_HOURS = {weekday: [(9 * 60, 17 * 60)] for weekday in range(5)}
+
+_index = {}     # navigator -> SlotIndex
+_index_lock = threading.Lock()
+
+class SlotIndex:
+    def __init__(self, hours, busy, covers_from):
+        self.hours = hours
+        self.busy = busy                # merged, sorted (start, end) UTC datetimes
+        self.covers_from = covers_from  # appointments before this were not loaded
+        self.loaded_at = time.monotonic()
+
+    def fresh_for(self, range_start):
+        return self.covers_from <= range_start and time.monotonic() - self.loaded_at < SLOT_CACHE_TTL
+
+    def free_slots(self, first_day, last_day, slot_minutes, now):
+        step = timedelta(minutes=slot_minutes)
+        slots = []
+        b = 0
+        day = first_day
+        while day <= last_day:
+            for start_minute, end_minute in self.hours.get(day.weekday(), ()):
+                midnight = datetime(day.year, day.month, day.day, tzinfo=COLOMBO_TZ)
+                slot = (midnight + timedelta(minutes=start_minute)).astimezone(timezone.utc)
+                window_end = (midnight + timedelta(minutes=end_minute)).astimezone(timezone.utc)
+                while slot + step <= window_end:
+                    slot_end = slot + step
+                    # Slots only move forward, so busy intervals that ended
+                    # before this one are never looked at again
+                    while b < len(self.busy) and self.busy[b][1] <= slot:
+                        b += 1
+                    if slot >= now and not (b < len(self.busy) and self.busy[b][0] < slot_end):
+                        slots.append({"start": slot.isoformat(), "end": slot_end.isoformat()})
+                    slot = slot_end
+            day += timedelta(days=1)
+        return slots
+
+def merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def minutes_of(value):
+    # TIME columns arrive as timedelta
+    return int(value.total_seconds() // 60)
+
+def load_index(cursor, navigator, range_start):
+    cursor.execute(
+        """
+        SELECT weekday, start_time, end_time
+        FROM cn_working_hours
+        WHERE cn_username = %s
+        ORDER BY weekday, start_time
+        """,
+        (navigator,)
+    )
+    hours = {}
+    for row in cursor.fetchall():
+        hours.setdefault(row["weekday"], []).append((minutes_of(row["start_time"]), minutes_of(row["end_time"])))
+
+    # Everything still ahead from the start of the range, so later requests
+    # for other dates are answered from the same entry
+    cursor.execute(
+        """
+        SELECT CONVERT_TZ(appointment_date_time, @@session.time_zone, '+00:00') AS starts_at
+        FROM client_appointments
+        WHERE care_navigator_username = %s
+        AND appointment_date_time > CONVERT_TZ(%s, '+00:00', @@session.time_zone)
+        AND status = 'active'
+        """,
+        (navigator, (range_start - timedelta(minutes=APPOINTMENT_MINUTES)).replace(tzinfo=None))
+    )
+    length = timedelta(minutes=APPOINTMENT_MINUTES)
+    busy = []
+    for row in cursor.fetchall():
+        starts_at = row["starts_at"].replace(tzinfo=timezone.utc)
+        busy.append((starts_at, starts_at + length))
+
+    return SlotIndex(hours or DEFAULT_WORKING_HOURS, merge_intervals(busy), range_start)
+
+def get_index(cursor, navigator, range_start):
+    entry = _index.get(navigator)
+    if entry is not None and entry.fresh_for(range_start):
+        return entry
+    entry = load_index(cursor, navigator, range_start)
+    with _index_lock:
+        if navigator not in _index and len(_index) >= SLOT_CACHE_SIZE:
+            del _index[next(iter(_index))]
+        _index[navigator] = entry
+    return entry
+
+def any_cached():
+    return bool(_index)
+
+def invalidate(navigator):
+    with _index_lock:
+        _index.pop(navigator, None)
+
+def parse_day(value, field):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{field}' must be a date (YYYY-MM-DD)")
+
+def available_slots(cursor, navigator, data, now=None):
+    # Raises ValueError for invalid parameters
+    now = now or datetime.now(timezone.utc)
+    today = now.astimezone(COLOMBO_TZ).date()
+
+    first_day = parse_day(data["from_date"], "from_date") if "from_date" in data else today
+    last_day = (parse_day(data["to_date"], "to_date") if "to_date" in data
+                else first_day + timedelta(days=DEFAULT_RANGE_DAYS - 1))
+    if last_day < first_day:
+        raise ValueError("'to_date' is before 'from_date'")
+    if (last_day - first_day).days >= MAX_RANGE_DAYS:
+        raise ValueError(f"At most {MAX_RANGE_DAYS} days can be requested at once")
+
+    slot_minutes = data.get("slot_minutes", DEFAULT_SLOT_MINUTES)
+    if not isinstance(slot_minutes, int) or not MIN_SLOT_MINUTES <= slot_minutes <= MAX_SLOT_MINUTES:
+        raise ValueError(f"'slot_minutes' must be a whole number from {MIN_SLOT_MINUTES} to {MAX_SLOT_MINUTES}")
+
+    range_start = max(
+        datetime(first_day.year, first_day.month, first_day.day, tzinfo=COLOMBO_TZ).astimezone(timezone.utc),
+        now
+    )
+    index = get_index(cursor, navigator, range_start)
+    slots = index.free_slots(first_day, last_day, slot_minutes, now)
+    return {
+        "care_navigator_username": navigator,
+        "from_date": first_day.isoformat(),
+        "to_date": last_day.isoformat(),
+        "slot_minutes": slot_minutes,
+        "slots": slots,
+        "total_slots": len(slots)
+    }
@@ -0,0 +1,85 @@
+# Structured logging for the auth Lambdas.
+#
+# Every record is a single JSON line. Secrets (passwords, sessions, tokens,
+# confirmation codes) are redacted before anything is serialized, and nothing
+# is serialized at all for records below the active level - so the full
+# event / Cognito response dumps only cost something when DEBUG is on.
+#
+#   LOG_LEVEL        DEBUG, INFO (default), WARNING or ERROR
+#   LOG_SAMPLE_RATE  fraction of invocations logged at DEBUG regardless of
+#                    LOG_LEVEL (default 0), to keep a trickle of full detail
+
+import json
+import os
+import threading
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40}
+LOG_LEVEL = LEVELS.get(os.environ.get('LOG_LEVEL', 'INFO').upper(), LEVELS['INFO'])
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '0'))
+
+# Compared against keys lower-cased with underscores removed
+SECRET_KEYS = {
+    'password', 'previouspassword', 'newpassword', 'proposedpassword', 'temppwd',
+    'session', 'accesstoken', 'refreshtoken', 'idtoken', 'tokens',
+    'code', 'confirmationcode', 'authorization', 'secrethash',
+}
+REDACTED = '***'
+
+def redact(value):
+    if isinstance(value, dict):
+        return {
+            k: REDACTED if str(k).lower().replace('_', '') in SECRET_KEYS else redact(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    return value
+
+class AuthLogger:
+    def __init__(self, function_name):
+        self.function_name = function_name
+        self.local = threading.local()
+
+    def level(self):
+        return getattr(self.local, 'level', LOG_LEVEL)
+
+    def enabled(self, level):
+        return LEVELS[level] >= self.level()
+
+    def start(self, event):
+        # Called once per invocation: picks the level (sampling) and logs the
+        # redacted event at DEBUG
+        sampled = False
+        if LOG_SAMPLE_RATE > 0:
+            import random
+            sampled = random.random() < LOG_SAMPLE_RATE
+        self.local.level = LEVELS['DEBUG'] if sampled else LOG_LEVEL
+        self.debug('Received event', event=lambda: event)
+
+    def log(self, level, message, fields):
+        if not self.enabled(level):
+            return
+        record = {'level': level, 'function': self.function_name, 'message': message}
+        for key, value in fields.items():
+            # Callables let callers defer building expensive fields
+            record[key] = redact(value() if callable(value) else value)
+        print(json.dumps(record, default=str))
+
+    def debug(self, message, **fields):
+        self.log('DEBUG', message, fields)
+
+    def info(self, message, **fields):
+        self.log('INFO', message, fields)
+
+    def warning(self, message, **fields):
+        self.log('WARNING', message, fields)
+
+    def error(self, message, **fields):
+        self.log('ERROR', message, fields)
+
+_loggers = {}
+
+def get_logger(function_name):
+    if function_name not in _loggers:
+        _loggers[function_name] = AuthLogger(function_name)
+    return _loggers[function_name]
@@ -0,0 +1,46 @@
+# Shared Cognito client for the auth Lambdas.
+# boto3 is only imported and the client only built the first time a handler
+# actually needs Cognito, then reused for the lifetime of the warm container.
+#
+# The botocore defaults (legacy retries, 60s timeouts, 10 pooled connections)
+# let a single slow Cognito call hold the Lambda for minutes, so the client is
+# tuned here once for every auth function. Each setting can be overridden
+# through the environment variable next to it. botocore itself makes a single
+# attempt: its standard mode would also retry throttling errors before the
+# per-operation pacing in cognitoThrottle ever saw them, so cognitoThrottle
+# owns every retry - throttles and transient errors alike.
+
+import os
+import threading
+from tracing import span
+
+CONNECT_TIMEOUT = float(os.environ.get('COGNITO_CONNECT_TIMEOUT', '2'))
+READ_TIMEOUT = float(os.environ.get('COGNITO_READ_TIMEOUT', '5'))
+MAX_ATTEMPTS = int(os.environ.get('COGNITO_MAX_ATTEMPTS', '3'))   # for transient errors, including the first call
+MAX_POOL_CONNECTIONS = int(os.environ.get('COGNITO_MAX_POOL_CONNECTIONS', '25'))
+
+_client = None
+_client_lock = threading.Lock()
+
+def client_config():
+    from botocore.config import Config
+    return Config(
+        connect_timeout=CONNECT_TIMEOUT,
+        read_timeout=READ_TIMEOUT,
+        retries={
+            'mode': 'standard',
+            'total_max_attempts': 1
+        },
+        tcp_keepalive=True,
+        max_pool_connections=MAX_POOL_CONNECTIONS
+    )
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                with span('cognito.client_init'):
+                    import boto3
+                    _client = boto3.client('cognito-idp', config=client_config())
+    return _client
@@ -0,0 +1,134 @@
+# Adaptive client-side throttling for Cognito calls, shared by the auth Lambdas.
+#
+# Every Cognito operation (initiate_auth, global_sign_out, ...) gets its own
+# AIMD token bucket: the allowed rate grows a little with every success and
+# is halved whenever Cognito throttles us. Throttled calls are retried with
+# full-jitter backoff as long as the Lambda's remaining time allows, so brief
+# spikes are absorbed. When the bucket is empty and the wait for a token would
+# be too long, the call is shed immediately with the same
+# TooManyRequestsException the handlers already turn into a 429.
+#
+# Only TooManyRequestsException counts as throttling. LimitExceededException
+# (e.g. from forgot_password) means one user ran out of attempts, so it goes
+# straight back to the handler and leaves the shared rate alone. Transient
+# errors (connection failures, 5xx) are retried here as well, within the same
+# deadline but without touching the rate - the Cognito client makes a single
+# attempt per call (see cognitoClient.py).
+#
+#   response = throttled_call('initiate_auth', context, ClientId=..., ...)
+
+import os
+import threading
+import time
+from cognitoClient import MAX_ATTEMPTS, get_client
+from tracing import span
+
+INITIAL_RATE = float(os.environ.get('COGNITO_THROTTLE_INITIAL_RATE', '25'))   # calls per second
+MIN_RATE = float(os.environ.get('COGNITO_THROTTLE_MIN_RATE', '1'))
+MAX_RATE = float(os.environ.get('COGNITO_THROTTLE_MAX_RATE', '100'))
+ADDITIVE_INCREASE = 0.1        # calls per second added per success
+MULTIPLICATIVE_DECREASE = 0.5  # rate factor applied per throttle
+MAX_TOKEN_WAIT = 0.5           # seconds a call may queue for a token before it is shed
+MAX_RETRIES = 3                # after throttling
+TRANSIENT_RETRIES = MAX_ATTEMPTS - 1
+RETRY_BASE_DELAY = 0.1         # seconds, doubled on every retry
+DEADLINE_MARGIN = 1.0          # seconds kept free before the Lambda timeout
+DEFAULT_BUDGET = 5.0           # seconds, when there is no Lambda context
+
+THROTTLE_ERRORS = ('TooManyRequestsException',)
+TRANSIENT_STATUS_CODES = (500, 502, 503, 504)
+
+class TokenBucket:
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, max_wait):
+        # Takes a token, returning how long to wait for it, or None to shed
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+            if wait > max_wait:
+                return None
+            self.tokens -= 1
+            return wait
+
+    def on_success(self):
+        with self.lock:
+            self.rate = min(MAX_RATE, self.rate + ADDITIVE_INCREASE)
+
+    def on_throttle(self):
+        with self.lock:
+            self.rate = max(MIN_RATE, self.rate * MULTIPLICATIVE_DECREASE)
+            self.tokens = min(self.tokens, self.rate)
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+def get_bucket(operation):
+    with _buckets_lock:
+        if operation not in _buckets:
+            _buckets[operation] = TokenBucket(INITIAL_RATE)
+        return _buckets[operation]
+
+def deadline_for(context):
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        return time.monotonic() + context.get_remaining_time_in_millis() / 1000 - DEADLINE_MARGIN
+    return time.monotonic() + DEFAULT_BUDGET
+
+def is_throttle(error):
+    return getattr(error, 'response', {}).get('Error', {}).get('Code') in THROTTLE_ERRORS
+
+def is_transient(error):
+    # Only reached on the error path, so botocore is imported here
+    from botocore.exceptions import ConnectionError, HTTPClientError
+    if isinstance(error, (ConnectionError, HTTPClientError)):
+        return True
+    status = getattr(error, 'response', {}).get('ResponseMetadata', {}).get('HTTPStatusCode')
+    return status in TRANSIENT_STATUS_CODES
+
+def shed(client, operation):
+    return client.exceptions.TooManyRequestsException(
+        {'Error': {'Code': 'TooManyRequestsException', 'Message': 'Request shed by client-side throttling'}},
+        operation
+    )
+
+def throttled_call(operation, context=None, **params):
+    with span('cognito.' + operation) as call_span:
+        client = get_client()
+        bucket = get_bucket(operation)
+        deadline = deadline_for(context)
+        attempt = 0
+
+        while True:
+            wait = bucket.reserve(min(MAX_TOKEN_WAIT, deadline - time.monotonic()))
+            if wait is None:
+                call_span.set(shed=True)
+                raise shed(client, operation)
+            if wait:
+                call_span.set(queued_ms=round(wait * 1000, 3))
+                time.sleep(wait)
+
+            try:
+                response = getattr(client, operation)(**params)
+                bucket.on_success()
+                return response
+            except Exception as e:
+                if is_throttle(e):
+                    bucket.on_throttle()
+                    retries = MAX_RETRIES
+                elif is_transient(e):
+                    retries = TRANSIENT_RETRIES
+                else:
+                    raise
+                import random
+                delay = random.uniform(0, RETRY_BASE_DELAY * 2 ** attempt)
+                if attempt >= retries or time.monotonic() + delay > deadline:
+                    raise
+                attempt += 1
+                call_span.set(retries=attempt)
+                time.sleep(delay)
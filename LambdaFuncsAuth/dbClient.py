@@ -0,0 +1,70 @@
+# Calls the DB handling Lambda (DB_Handling/lambdaDBHandling.py) from the auth
+# Lambdas, for flows that have to write to or read from the users table on
+# the server side instead of leaving a second round trip to the app.
+#
+# The target function is named by DB_HANDLER_FUNCTION. Like the Cognito
+# client, the Lambda client is built on first use and reused while warm.
+# Invocations are never retried: a retry after a read timeout would run the
+# DB action a second time. The read timeout is kept past DB_HANDLER_TIMEOUT,
+# the DB handler's own function timeout, so every call gets its answer.
+# Calls carry a ClientContext naming the caller, which the DB handler accepts
+# in place of a user's access token (see DB_Handling/callerIdentity.py), and
+# the current trace id, so the DB handler's spans join the caller's trace.
+
+import base64
+import json
+import os
+import threading
+from cognitoClient import CONNECT_TIMEOUT
+from tracing import span, trace_id
+
+DB_HANDLER_FUNCTION = os.environ.get('DB_HANDLER_FUNCTION')
+DB_HANDLER_TIMEOUT = float(os.environ.get('DB_HANDLER_TIMEOUT', '15'))  # seconds, the DB handler's function timeout
+CLIENT_CONTEXT = base64.b64encode(json.dumps({'custom': {'caller': 'LambdaFuncsAuth'}}).encode()).decode()
+
+_lambda_client = None
+_lambda_client_lock = threading.Lock()
+
+class DBCallError(Exception):
+    pass
+
+def db_configured():
+    return bool(DB_HANDLER_FUNCTION)
+
+def lambda_client_config():
+    from botocore.config import Config
+    return Config(
+        connect_timeout=CONNECT_TIMEOUT,
+        read_timeout=DB_HANDLER_TIMEOUT + 2,
+        retries={'mode': 'standard', 'total_max_attempts': 1}
+    )
+
+def get_lambda_client():
+    global _lambda_client
+    if _lambda_client is None:
+        with _lambda_client_lock:
+            if _lambda_client is None:
+                import boto3
+                _lambda_client = boto3.client('lambda', config=lambda_client_config())
+    return _lambda_client
+
+def call_db(action, data):
+    # Returns (statusCode, parsed body) of the DB handler's response
+    if not db_configured():
+        raise DBCallError('DB_HANDLER_FUNCTION is not configured')
+
+    with span('db.' + action) as call_span:
+        payload = {'action': action, 'data': data}
+        if trace_id():
+            payload['traceId'] = trace_id()
+        response = get_lambda_client().invoke(
+            FunctionName=DB_HANDLER_FUNCTION,
+            InvocationType='RequestResponse',
+            ClientContext=CLIENT_CONTEXT,
+            Payload=json.dumps(payload)
+        )
+        result = json.loads(response['Payload'].read())
+        if response.get('FunctionError') or 'statusCode' not in result:
+            raise DBCallError(result.get('errorMessage', 'DB handler failed'))
+        call_span.set(status=result['statusCode'])
+        return result['statusCode'], json.loads(result['body'])
@@ -1,15 +1,161 @@
 import json
-import boto3
 import os
-
-# Initialize the Cognito client
-client = boto3.client('cognito-idp')
+from datetime import datetime, timedelta, timezone
+from authLogging import get_logger
+from cognitoClient import get_client
+from cognitoThrottle import throttled_call
+from dbClient import call_db, db_configured
+from tracing import bind, traced_handler
+from warmup import is_warmup, warm_up
 
 USER_POOL_ID = os.environ.get('COGNITO_USER_POOL_ID')
 
+# Bulk provisioning: admin_create_user calls run on a small thread pool so a
+# whole agency is onboarded in one request without tripping Cognito's
+# user-creation rate limit (see cognitoThrottle for the retries).
+BULK_MAX_WORKERS = int(os.environ.get('BULK_CREATE_WORKERS', '5'))
+BULK_MAX_USERS = 500
+
+# users table values for a care navigator waiting on their temporary password
+CN_ROLE = 1
+CN_STATUS_TEMP_PASSWORD = 3
+COLOMBO_TZ = timezone(timedelta(hours=5, minutes=30))
+
+log = get_logger('lambdaAdminCreatesCN')
+
+def cognito_attributes(email):
+    return [
+        {
+            'Name': 'email',
+            'Value': email
+        },
+        {
+            'Name': 'email_verified',
+            'Value': 'true'  # Setting email as verified since this is admin creation
+        }
+    ]
+
+def create_navigator(client, user, context):
+    # Creates one user (already checked by invalid_item) and returns its
+    # per-item result, never raises.
+    # Throttling is retried by the shared controller within the time budget.
+    username = user['username']
+    email = user['email']
+    result = {'username': username, 'email': email, 'success': False}
+
+    try:
+        response = throttled_call('admin_create_user', context,
+            UserPoolId=USER_POOL_ID,
+            Username=username,
+            UserAttributes=cognito_attributes(email),
+            DesiredDeliveryMediums=['EMAIL']  # Sending temporary password via email
+        )
+        return dict(result, success=True, status=response['User']['UserStatus'])
+
+    except client.exceptions.TooManyRequestsException:
+        return dict(result, code='TooManyRequestsException', message='Throttled by Cognito, please retry this user')
+    except client.exceptions.LimitExceededException as e:
+        return dict(result, code='LimitExceededException', message=str(e))
+    except client.exceptions.UsernameExistsException:
+        return dict(result, code='UsernameExistsException', message='A user with this username already exists')
+    except client.exceptions.InvalidParameterException as e:
+        return dict(result, code='InvalidParameterException', message=str(e))
+    except Exception as e:
+        log.error("An error occurred", username=username, error=str(e))
+        return dict(result, code='UnknownError', message='An unexpected error occurred')
+
+def invalid_item(user):
+    # Per-item result for a users entry that can't be sent to Cognito, or None
+    if not isinstance(user, dict):
+        return {'username': None, 'email': None, 'success': False, 'code': 'InvalidParameterException',
+                'message': 'Each user must be an object with a username and an email'}
+    username = user.get('username')
+    email = user.get('email')
+    if not isinstance(username, str) or not username.strip() or not isinstance(email, str) or not email.strip():
+        return {'username': username, 'email': email, 'success': False, 'code': 'InvalidParameterException',
+                'message': 'Both username and email are required, as strings'}
+    return None
+
+def bulk_create(event, context):
+    # Only the bulk path needs a thread pool, keep it out of the cold start
+    from concurrent.futures import ThreadPoolExecutor
+
+    users = event.get('users')
+
+    if not isinstance(users, list) or not users or len(users) > BULK_MAX_USERS:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({
+                'success': False,
+                'message': f'users must be a list of 1 to {BULK_MAX_USERS} users',
+                'code': 'InvalidParameterException'
+            })
+        }
+
+    client = get_client()
+
+    # Invalid entries get their error in place and are never sent to Cognito
+    results = [invalid_item(user) for user in users]
+    with ThreadPoolExecutor(max_workers=BULK_MAX_WORKERS) as pool:
+        futures = {
+            i: pool.submit(bind(create_navigator), client, user, context)
+            for i, user in enumerate(users) if results[i] is None
+        }
+        for i, future in futures.items():
+            results[i] = future.result()
+
+    created = [result for result in results if result['success']]
+    log.info("Bulk create finished", requested=len(users), created=len(created))
+
+    # One multi-row insert for every user Cognito accepted
+    database = {'inserted': 0}
+    if created and db_configured():
+        created_at = datetime.now(COLOMBO_TZ).strftime('%Y-%m-%dT%H:%M:%S')
+        try:
+            status_code, body = call_db('create_user', {
+                'users': [
+                    {
+                        'username': result['username'].strip().lower(),
+                        'email': result['email'],
+                        'role': CN_ROLE,
+                        'status': CN_STATUS_TEMP_PASSWORD,
+                        'created_at': created_at
+                    }
+                    for result in created
+                ]
+            })
+            if status_code == 200:
+                database['inserted'] = body.get('count', len(created))
+            else:
+                database['error'] = body.get('error', 'Insert failed')
+        except Exception as e:
+            log.error("Bulk DB insert failed", error=str(e))
+            database['error'] = str(e)
+    elif created:
+        database['skipped'] = 'DB_HANDLER_FUNCTION is not configured'
+
+    all_succeeded = len(created) == len(users) and 'error' not in database
+    return {
+        'statusCode': 200 if all_succeeded else 207,
+        'body': json.dumps({
+            'success': all_succeeded,
+            'message': f'{len(created)} of {len(users)} users created. Temporary passwords sent via email.',
+            'results': results,
+            'database': database
+        })
+    }
+
+@traced_handler('lambdaAdminCreatesCN')
 def lambda_handler(event, context):
+    if is_warmup(event, context):
+        return warm_up()
+
     # Parse the incoming JSON body
-    print("Received event: " + json.dumps(event))
+    log.start(event)
+
+    # A list of users provisions them all in one call
+    if 'users' in event:
+        return bulk_create(event, context)
 
     ## API GW
     username = event.get('username')
@@ -28,27 +174,17 @@ def lambda_handler(event, context):
             })
         }
 
+    client = get_client()
+
     try:
-        # Prepare user attributes
-        attributes = [
-            {
-                'Name': 'email',
-                'Value': email
-            },
-            {
-                'Name': 'email_verified',
-                'Value': 'true'  # Setting email as verified since this is admin creation
-            }
-        ]
-        
         # Create the user in Cognito
-        response = client.admin_create_user(
+        response = throttled_call('admin_create_user', context,
             UserPoolId=USER_POOL_ID,
             Username=username,
-            UserAttributes=attributes,
+            UserAttributes=cognito_attributes(email),
             DesiredDeliveryMediums=['EMAIL']  # Sending temporary password via email
         )
-        print("Response:", response)
+        log.debug("Response", response=response)
         
         user = response['User']
         
@@ -86,8 +222,19 @@ def lambda_handler(event, context):
             })
         }
     
+    except client.exceptions.TooManyRequestsException:
+        log.warning("User creation failed: Too many requests")
+        return {
+            'statusCode': 429,
+            'body': json.dumps({
+                'success': False,
+                'message': 'Too many requests, please try again later',
+                'code': 'TooManyRequestsException'
+            })
+        }
+
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
+        log.error("An error occurred", error=str(e))
         return {
             'statusCode': 500,
             'body': json.dumps({
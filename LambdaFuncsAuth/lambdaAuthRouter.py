@@ -0,0 +1,79 @@
+import json
+import lambdaAdminCreatesCN
+import lambdaConfirmForgotPWD
+import lambdaInitiateForgotPWD
+import lambdaNewTempPWDResquest
+import lambdaPasswordReset
+import lambdaSignIn
+import lambdaSignOut
+import lambdaSignUp
+import lambdaTempPWDReset
+import lambdaTokenRefresh
+from tracing import traced_handler
+from warmup import is_warmup, warm_up
+
+# Single entry point for the whole auth surface.
+# Every operation runs in the same warm container and shares one Cognito
+# client (cognitoClient.get_client) and one JWKS / refresh cache, so rarely
+# used flows no longer hit their own cold starts. The individual lambda*.py
+# entry points keep working unchanged for existing API Gateway routes.
+
+# Operation names match the last segment of the existing API Gateway paths
+ROUTES = {
+    'signIn': lambdaSignIn.lambda_handler,
+    'signUp': lambdaSignUp.lambda_handler,
+    'signOut': lambdaSignOut.lambda_handler,
+    'refreshToken': lambdaTokenRefresh.lambda_handler,
+    'passwordReset': lambdaPasswordReset.lambda_handler,
+    'tempPWDReset': lambdaTempPWDReset.lambda_handler,
+    'initiateForgotPWD': lambdaInitiateForgotPWD.lambda_handler,
+    'confirmForgotPWD': lambdaConfirmForgotPWD.lambda_handler,
+    'newTempPWDRequest': lambdaNewTempPWDResquest.lambda_handler,
+    'adminCreatesCN': lambdaAdminCreatesCN.lambda_handler,
+}
+
+# Admin-only operations are left to direct invokes, which are authorized by
+# IAM; requests through API Gateway can never reach them
+DIRECT_INVOKE_ONLY = {'adminCreatesCN'}
+
+def is_proxy_request(event):
+    return ('requestContext' in event or 'httpMethod' in event or 'routeKey' in event
+            or isinstance(event.get('body'), str))
+
+def resolve_operation(event, payload):
+    # Behind API Gateway the request path decides
+    # (e.g. "/dev/mobile/refreshToken" -> "refreshToken") and anything the
+    # client put in the body is ignored; direct invokes name the operation
+    if not is_proxy_request(event):
+        return event.get('operation') or payload.get('operation')
+    path = event.get('path') or event.get('rawPath') or event.get('resource') or ''
+    operation = path.rstrip('/').split('/')[-1]
+    return None if operation in DIRECT_INVOKE_ONLY else operation
+
+@traced_handler('lambdaAuthRouter')
+def lambda_handler(event, context):
+    if is_warmup(event, context):
+        return warm_up()
+
+    # Proxy integrations wrap the payload in a JSON string body
+    payload = event
+    if isinstance(event.get('body'), str):
+        try:
+            payload = json.loads(event['body'])
+        except ValueError:
+            payload = {}
+
+    operation = resolve_operation(event, payload)
+    handler = ROUTES.get(operation)
+
+    if handler is None:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({
+                'success': False,
+                'message': f"Unknown auth operation: '{operation}'",
+                'code': 'InvalidParameterException'
+            })
+        }
+
+    return handler(payload, context)
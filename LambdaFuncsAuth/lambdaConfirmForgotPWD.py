@@ -1,15 +1,22 @@
 import json
-import boto3
 import os
-
-# Initialize the Cognito client
-client = boto3.client('cognito-idp')
+from authLogging import get_logger
+from cognitoClient import get_client
+from cognitoThrottle import throttled_call
+from tracing import traced_handler
+from warmup import is_warmup, warm_up
 
 CLIENT_ID = os.environ.get('COGNITO_CLIENT_ID')
 
+log = get_logger('lambdaConfirmForgotPWD')
+
+@traced_handler('lambdaConfirmForgotPWD')
 def lambda_handler(event, context):
+    if is_warmup(event, context):
+        return warm_up()
+
     # Parse the incoming event
-    print("Received event: " + json.dumps(event))
+    log.start(event)
     
     # Extract parameters from the event
     username = event.get('username')
@@ -26,17 +33,19 @@ def lambda_handler(event, context):
             })
         }
     
+    client = get_client()
+
     try:
         # Confirm the forgot password flow with the verification code and new password
-        response = client.confirm_forgot_password(
+        response = throttled_call('confirm_forgot_password', context,
             ClientId=CLIENT_ID,
             Username=username,
             ConfirmationCode=confirmation_code,
             Password=new_password
         )
-        print(f"Confirm forgot response: {response}")
+        log.debug("Confirm forgot response", response=response)
         
-        print(f"Password reset confirmed for user: {username}")
+        log.info("Password reset confirmed", username=username)
         
         return {
             'statusCode': 200,
@@ -47,7 +56,7 @@ def lambda_handler(event, context):
         }
         
     except client.exceptions.CodeMismatchException:
-        print("Invalid verification code")
+        log.info("Invalid verification code", username=username)
         return {
             'statusCode': 400,
             'body': json.dumps({
@@ -57,7 +66,7 @@ def lambda_handler(event, context):
             })
         }
     except client.exceptions.ExpiredCodeException:
-        print("Expired verification code")
+        log.info("Expired verification code", username=username)
         return {
             'statusCode': 410,
             'body': json.dumps({
@@ -67,7 +76,7 @@ def lambda_handler(event, context):
             })
         }
     except client.exceptions.LimitExceededException:
-        print("Rate limit exceeded")
+        log.warning("Rate limit exceeded", username=username)
         return {
             'statusCode': 429,
             'body': json.dumps({
@@ -76,8 +85,18 @@ def lambda_handler(event, context):
                 'code': 'LimitExceededException'
             })
         }
+    except client.exceptions.TooManyRequestsException:
+        log.warning("Confirm forgot password failed: Too many requests")
+        return {
+            'statusCode': 429,
+            'body': json.dumps({
+                'success': False,
+                'message': 'Too many requests, please try again later',
+                'code': 'TooManyRequestsException'
+            })
+        }
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
+        log.error("An error occurred", error=str(e))
         return {
             'statusCode': 500,
             'body': json.dumps({
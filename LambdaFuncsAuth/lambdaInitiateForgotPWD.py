@@ -1,16 +1,56 @@
 import json
-import boto3
 import os
-
-# Initialize the Cognito client
-client = boto3.client('cognito-idp')
+import time
+from authLogging import get_logger
+from cognitoClient import get_client
+from cognitoThrottle import throttled_call
+from tracing import traced_handler
+from warmup import is_warmup, warm_up
 
 CLIENT_ID = os.environ.get('COGNITO_CLIENT_ID')
 USER_POOL_ID = os.environ.get('COGNITO_USER_POOL_ID')
 
+# Warm instances remember whether a user exists and their UserStatus, so
+# retried requests (and username enumeration floods) skip admin_get_user.
+# Unknown and unconfirmed users are cached for a shorter time since they are
+# the states most likely to change soon.
+USER_STATUS_TTL = int(os.environ.get('USER_STATUS_CACHE_TTL', '300'))
+NEGATIVE_STATUS_TTL = int(os.environ.get('USER_NOT_FOUND_CACHE_TTL', '60'))
+USER_STATUS_CACHE_SIZE = 10000
+
+_user_status_cache = {}   # username -> (expires_at, UserStatus or None if not found)
+
+log = get_logger('lambdaInitiateForgotPWD')
+
+def cached_user_status(username):
+    # Returns (hit, status); a None status means the user does not exist
+    entry = _user_status_cache.get(username)
+    if entry is None:
+        return False, None
+    expires_at, status = entry
+    if expires_at < time.time():
+        del _user_status_cache[username]
+        return False, None
+    return True, status
+
+def remember_user_status(username, status):
+    # Bounded so a flood of random usernames cannot grow memory without limit;
+    # the oldest entry goes first
+    if username not in _user_status_cache and len(_user_status_cache) >= USER_STATUS_CACHE_SIZE:
+        del _user_status_cache[next(iter(_user_status_cache))]
+    ttl = NEGATIVE_STATUS_TTL if status in (None, 'UNCONFIRMED') else USER_STATUS_TTL
+    _user_status_cache[username] = (time.time() + ttl, status)
+
+def forget_user_status(username):
+    _user_status_cache.pop(username, None)
+
+@traced_handler('lambdaInitiateForgotPWD')
 def lambda_handler(event, context):
+    if is_warmup(event, context):
+        return warm_up()
+
     # Parse the incoming event
-    print("Received event: " + json.dumps(event))
+    log.start(event)
     
     # Extract username from the event
     username = event.get('username')
@@ -25,30 +65,26 @@ def lambda_handler(event, context):
             })
         }
     
+    client = get_client()
+
     try:
-        # Check if the user exists in the User Pool
-        try:
-            user_response = client.admin_get_user(
-                UserPoolId=USER_POOL_ID,
-                Username=username
-            )
-            print(f"User found: {username}")
-            
-            # Check if user is confirmed
-            user_status = user_response.get('UserStatus')
-            if user_status == 'UNCONFIRMED':
-                return {
-                    'statusCode': 400,
-                    'body': json.dumps({
-                        'success': False,
-                        'message': 'User account is not confirmed. Please verify your email first.',
-                        'code': 'UserNotConfirmedException'
-                    })
-                }
-            
+        # Check if the user exists in the User Pool, unless a warm instance already knows
+        found_in_cache, user_status = cached_user_status(username)
+        if not found_in_cache:
+            try:
+                user_response = throttled_call('admin_get_user', context,
+                    UserPoolId=USER_POOL_ID,
+                    Username=username
+                )
+                log.debug("User found", username=username)
+                user_status = user_response.get('UserStatus')
+            except client.exceptions.UserNotFoundException:
+                user_status = None
+            remember_user_status(username, user_status)
+
         # If user doesn't exist
-        except client.exceptions.UserNotFoundException:
-            print(f"User not found: {username}")
+        if user_status is None:
+            log.info("User not found", username=username, cached=found_in_cache)
             return {
                 'statusCode': 404,
                 'body': json.dumps({
@@ -57,15 +93,26 @@ def lambda_handler(event, context):
                     'code': 'UserNotFoundException'
                 })
             }
+
+        # Check if user is confirmed
+        if user_status == 'UNCONFIRMED':
+            return {
+                'statusCode': 400,
+                'body': json.dumps({
+                    'success': False,
+                    'message': 'User account is not confirmed. Please verify your email first.',
+                    'code': 'UserNotConfirmedException'
+                })
+            }
         
         # If user exists and is confirmed, proceeding with forgot password flow
-        response = client.forgot_password(
+        response = throttled_call('forgot_password', context,
             ClientId=CLIENT_ID,
             Username=username
         )
-        print(f"Forgot password response: {response}")
+        log.debug("Forgot password response", response=response)
         
-        print(f"Forgot password initiated for user: {username}")
+        log.info("Forgot password initiated", username=username)
         
         return {
             'statusCode': 200,
@@ -79,8 +126,20 @@ def lambda_handler(event, context):
             })
         }
         
+    except client.exceptions.UserNotFoundException:
+        # User was deleted after their status was cached
+        forget_user_status(username)
+        log.info("User not found", username=username)
+        return {
+            'statusCode': 404,
+            'body': json.dumps({
+                'success': False,
+                'message': 'User not found. Please check your username and try again.',
+                'code': 'UserNotFoundException'
+            })
+        }
     except client.exceptions.InvalidParameterException as e:
-        print(f"Invalid parameter: {str(e)}")
+        log.info("Invalid parameter", error=str(e))
         return {
             'statusCode': 400,
             'body': json.dumps({
@@ -90,7 +149,7 @@ def lambda_handler(event, context):
             })
         }
     except client.exceptions.TooManyRequestsException:
-        print("Signout failed: Too many requests.")
+        log.warning("Forgot password failed: Too many requests")
         return {
             'statusCode': 429,
             'body': json.dumps({
@@ -100,7 +159,7 @@ def lambda_handler(event, context):
             })
         }
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
+        log.error("An error occurred", error=str(e))
         return {
             'statusCode': 500,
             'body': json.dumps({
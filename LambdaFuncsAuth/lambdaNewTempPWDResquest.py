@@ -1,15 +1,22 @@
 import json
-import boto3
 import os
-
-# Initialize the Cognito client
-client = boto3.client('cognito-idp')
+from authLogging import get_logger
+from cognitoClient import get_client
+from cognitoThrottle import throttled_call
+from tracing import traced_handler
+from warmup import is_warmup, warm_up
 
 USER_POOL_ID = os.environ.get('COGNITO_USER_POOL_ID')
 
+log = get_logger('lambdaNewTempPWDResquest')
+
+@traced_handler('lambdaNewTempPWDResquest')
 def lambda_handler(event, context):
+    if is_warmup(event, context):
+        return warm_up()
+
     # Parse the incoming JSON body
-    print("Received event: " + json.dumps(event))
+    log.start(event)
 
     # Extract parameters
     username = event.get('username')
@@ -25,17 +32,19 @@ def lambda_handler(event, context):
             })
         }
 
+    client = get_client()
+
     try:
         # Reset the user's password
-        response = client.admin_set_user_password(
+        response = throttled_call('admin_set_user_password', context,
             UserPoolId=USER_POOL_ID,
             Username=username,
             Password=tempPWD,
             Permanent=False  # Forces password change on next login
         )
-        print("Response:", response)
+        log.debug("Response", response=response)
         
-        print("Password reset requested successfully for user:", username)
+        log.info("Password reset requested successfully", username=username)
         
         return {
             'statusCode': 200,
@@ -47,7 +56,7 @@ def lambda_handler(event, context):
         }
         
     except client.exceptions.UserNotFoundException:
-        print(f"User not found: {username}")
+        log.info("User not found", username=username)
         return {
             'statusCode': 404,
             'body': json.dumps({
@@ -58,7 +67,7 @@ def lambda_handler(event, context):
         }
         
     except client.exceptions.InvalidParameterException as e:
-        print(f"Invalid parameter: {str(e)}")
+        log.info("Invalid parameter", error=str(e))
         return {
             'statusCode': 401,
             'body': json.dumps({
@@ -69,7 +78,7 @@ def lambda_handler(event, context):
         }
         
     except client.exceptions.LimitExceededException as e:
-        print(f"Limit exceeded: {str(e)}")
+        log.warning("Limit exceeded", error=str(e))
         return {
             'statusCode': 429,
             'body': json.dumps({
@@ -79,8 +88,19 @@ def lambda_handler(event, context):
             })
         }
         
+    except client.exceptions.TooManyRequestsException:
+        log.warning("Temporary password reset failed: Too many requests")
+        return {
+            'statusCode': 429,
+            'body': json.dumps({
+                'success': False,
+                'message': 'Too many requests, please try again later',
+                'code': 'TooManyRequestsException'
+            })
+        }
+
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
+        log.error("An error occurred", error=str(e))
         return {
             'statusCode': 500,
             'body': json.dumps({
@@ -1,12 +1,20 @@
 import json
-import boto3
+from authLogging import get_logger
+from cognitoClient import get_client
+from cognitoThrottle import throttled_call
+from tokenValidation import validate_access_token, TokenValidationError
+from tracing import traced_handler
+from warmup import is_warmup, warm_up
 
-# Initialize the Cognito client
-client = boto3.client('cognito-idp')
+log = get_logger('lambdaPasswordReset')
 
+@traced_handler('lambdaPasswordReset')
 def lambda_handler(event, context):
+    if is_warmup(event, context):
+        return warm_up()
+
     # Parse the incoming event
-    print("Received event: " + json.dumps(event))
+    log.start(event)
     
     # Extract parameters from the event
     previous_password = event.get('previous_password')
@@ -23,16 +31,32 @@ def lambda_handler(event, context):
             })
         }
     
+    # Reject malformed, expired or foreign tokens locally, before using Cognito quota
+    try:
+        validate_access_token(access_token)
+    except TokenValidationError as e:
+        log.info("Rejected access token locally", error=str(e))
+        return {
+            'statusCode': 401,
+            'body': json.dumps({
+                'success': False,
+                'message': str(e),
+                'code': 'NotAuthorizedException'
+            })
+        }
+
+    client = get_client()
+
     try:
         # Change the password for the authenticated user
-        response = client.change_password(
+        response = throttled_call('change_password', context,
             PreviousPassword=previous_password,
             ProposedPassword=new_password,
             AccessToken=access_token
         )
         
-        print("Response:", response)
-        print("Password changed successfully")
+        log.debug("Response", response=response)
+        log.info("Password changed successfully")
         
         return {
             'statusCode': 200,
@@ -44,7 +68,7 @@ def lambda_handler(event, context):
         
     except client.exceptions.InvalidPasswordException as e:
         # Password doesn't match the policy.
-        print(f"Invalid password: {str(e)}")
+        log.info("Invalid password", error=str(e))
         return {
             'statusCode': 400,
             'body': json.dumps({
@@ -54,7 +78,7 @@ def lambda_handler(event, context):
             })
         }
     except client.exceptions.NotAuthorizedException as e:
-        print("Invalid Access Token, Access Token has been revoked, or Incorrect previous password")
+        log.info("Invalid Access Token, Access Token has been revoked, or Incorrect previous password")
         return {
             'statusCode': 401,
             'body': json.dumps({
@@ -63,8 +87,18 @@ def lambda_handler(event, context):
                 'code': 'NotAuthorizedException'
             })
         }
+    except client.exceptions.TooManyRequestsException:
+        log.warning("Password change failed: Too many requests")
+        return {
+            'statusCode': 429,
+            'body': json.dumps({
+                'success': False,
+                'message': 'Too many requests, please try again later',
+                'code': 'TooManyRequestsException'
+            })
+        }
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
+        log.error("An error occurred", error=str(e))
         return {
             'statusCode': 500,
             'body': json.dumps({
@@ -1,15 +1,59 @@
 import json
-import boto3
 import os
-
-# Initialize the Cognito client
-client = boto3.client('cognito-idp')
+import threading
+from authLogging import get_logger
+from cognitoClient import get_client
+from cognitoThrottle import throttled_call
+from dbClient import call_db, db_configured
+from tracing import bind, traced_handler
+from warmup import is_warmup, warm_up
 
 CLIENT_ID = os.environ.get('COGNITO_CLIENT_ID')
 
+# Enriched sign-in: with {"includeProfile": true} the user's role and status
+# are read from the DB Lambda once Cognito has accepted the password, and
+# returned as "user" with the tokens, so the app can route straight to the
+# right screen. Failed sign-ins never reach the DB Lambda. If the lookup
+# fails or takes longer than PROFILE_FETCH_TIMEOUT, the sign-in succeeds
+# without them.
+PROFILE_FETCH_TIMEOUT = float(os.environ.get('SIGN_IN_PROFILE_TIMEOUT', '2'))
+PROFILE_FETCH_WORKERS = 4
+
+_profile_pool = None
+_profile_pool_lock = threading.Lock()
+
+log = get_logger('lambdaSignIn')
+
+def fetch_profile(username):
+    status_code, body = call_db('get_user_role_status', {'username': username})
+    if status_code != 200:
+        raise LookupError(body.get('error', f'DB handler returned {status_code}'))
+    return {'role': body.get('role'), 'status': body.get('status')}
+
+def start_profile_fetch(username):
+    # The pool's threads are reused while the container is warm
+    global _profile_pool
+    if _profile_pool is None:
+        with _profile_pool_lock:
+            if _profile_pool is None:
+                from concurrent.futures import ThreadPoolExecutor
+                _profile_pool = ThreadPoolExecutor(max_workers=PROFILE_FETCH_WORKERS)
+    return _profile_pool.submit(bind(fetch_profile), username)
+
+def profile_result(future):
+    try:
+        return future.result(timeout=PROFILE_FETCH_TIMEOUT)
+    except Exception as e:
+        log.warning("Profile lookup failed, signing in without it", error=str(e) or type(e).__name__)
+        return None
+
+@traced_handler('lambdaSignIn')
 def lambda_handler(event, context):
+    if is_warmup(event, context):
+        return warm_up()
+
     # Parse the incoming JSON body
-    print("Received event: " + json.dumps(event))
+    log.start(event)
 
     ## API GW
     username = event.get('username')
@@ -26,9 +70,11 @@ def lambda_handler(event, context):
             })
         }
 
+    client = get_client()
+
     try:
         # Attempt to authenticate the user using Cognito
-        response = client.initiate_auth(
+        response = throttled_call('initiate_auth', context,
             ClientId=CLIENT_ID,
             AuthFlow='USER_PASSWORD_AUTH',
             AuthParameters={
@@ -36,12 +82,11 @@ def lambda_handler(event, context):
                 'PASSWORD': password
             }
         )
-        print("Response:", response)
+        log.debug("Response", response=response)
     
         # Check if NEW_PASSWORD_REQUIRED challenge is returned
         if 'ChallengeName' in response and response['ChallengeName'] == 'NEW_PASSWORD_REQUIRED':
-            print("Temp login ChallengeName:", response['ChallengeName'])
-            print("Session:", response['Session'])
+            log.info("Temporary password login", challenge=response['ChallengeName'], username=username)
             return {
                 'statusCode': 202,  # Using 202 as a distinct status code
                 'body': json.dumps({
@@ -58,25 +103,31 @@ def lambda_handler(event, context):
         refresh_token = response['AuthenticationResult']['RefreshToken']
         expires_in = response['AuthenticationResult']['ExpiresIn']
 
-        print("Login successful!", access_token)
+        log.info("Login successful", username=username)
+
+        body = {
+            'success': True,
+            'message': 'Authentication successful',
+            'tokens': {
+                'idToken': id_token,
+                'accessToken': access_token,
+                'refreshToken': refresh_token,
+                'expiresIn': expires_in
+            }
+        }
+        if event.get('includeProfile') and db_configured():
+            profile = profile_result(start_profile_fetch(username.strip()))
+            if profile is not None:
+                body['user'] = profile
 
         # Return the successful response with the tokens
         return {
             'statusCode': 200,
-            'body': json.dumps({
-                'success': True,
-                'message': 'Authentication successful',
-                'tokens': {
-                    'idToken': id_token,
-                    'accessToken': access_token,
-                    'refreshToken': refresh_token,
-                    'expiresIn': expires_in
-                }
-            })
+            'body': json.dumps(body)
         }
 
     except client.exceptions.NotAuthorizedException:
-        print("Login failed: Incorrect username or password.")
+        log.info("Login failed: Incorrect username or password", username=username)
         return {
             'statusCode': 401,
             'body': json.dumps({
@@ -86,7 +137,7 @@ def lambda_handler(event, context):
             })
         }
     except client.exceptions.UserNotConfirmedException:
-        print("Login failed: User not confirmed.")
+        log.info("Login failed: User not confirmed", username=username)
         return {
             'statusCode': 403,
             'body': json.dumps({
@@ -96,7 +147,7 @@ def lambda_handler(event, context):
             })
         }
     except client.exceptions.UserNotFoundException:
-        print("Login failed: User does not exist.")
+        log.info("Login failed: User does not exist", username=username)
         return {
             'statusCode': 404,
             'body': json.dumps({
@@ -105,8 +156,18 @@ def lambda_handler(event, context):
                 'code': 'UserNotFoundException'
             })
         }
+    except client.exceptions.TooManyRequestsException:
+        log.warning("Login failed: Too many requests")
+        return {
+            'statusCode': 429,
+            'body': json.dumps({
+                'success': False,
+                'message': 'Too many requests, please try again later',
+                'code': 'TooManyRequestsException'
+            })
+        }
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
+        log.error("An error occurred", error=str(e))
         return {
             'statusCode': 500,
             'body': json.dumps({
@@ -1,15 +1,26 @@
 import json
-import boto3
+from authLogging import get_logger
+from cognitoClient import get_client
+from cognitoThrottle import throttled_call
+from refreshCache import evict
+from tokenValidation import validate_access_token, TokenValidationError
+from tracing import traced_handler
+from warmup import is_warmup, warm_up
 
-# Initialize the Cognito client
-client = boto3.client('cognito-idp')
+log = get_logger('lambdaSignOut')
 
+@traced_handler('lambdaSignOut')
 def lambda_handler(event, context):
+    if is_warmup(event, context):
+        return warm_up()
+
     # Parse the incoming JSON body
-    print("Received event: " + json.dumps(event))
+    log.start(event)
 
     ## API GW
     access_token = event.get('accessToken')
+    # Optional; its cached refresh result is dropped once it is revoked
+    refresh_token = event.get('refreshToken')
 
     if not access_token:
         return {
@@ -21,12 +32,30 @@ def lambda_handler(event, context):
             })
         }
 
+    # Reject malformed, expired or foreign tokens locally, before using Cognito quota
+    try:
+        validate_access_token(access_token)
+    except TokenValidationError as e:
+        log.info("Signout failed: Rejected access token locally", error=str(e))
+        return {
+            'statusCode': 401,
+            'body': json.dumps({
+                'success': False,
+                'message': 'Access token is invalid or expired',
+                'code': 'NotAuthorizedException'
+            })
+        }
+
+    client = get_client()
+
     try:
         # Attempt to sign out the user using their access token
-        response = client.global_sign_out(
+        response = throttled_call('global_sign_out', context,
             AccessToken=access_token
         )
-        print("User signed out successfully.", response)
+        log.info("User signed out successfully")
+        if isinstance(refresh_token, str) and refresh_token:
+            evict(refresh_token)
 
         # Return the successful response
         return {
@@ -38,7 +67,7 @@ def lambda_handler(event, context):
         }
 
     except client.exceptions.NotAuthorizedException:
-        print("Signout failed: Access token is invalid or expired.")
+        log.info("Signout failed: Access token is invalid or expired")
         return {
             'statusCode': 401,
             'body': json.dumps({
@@ -48,7 +77,7 @@ def lambda_handler(event, context):
             })
         }
     except client.exceptions.ResourceNotFoundException:
-        print("Signout failed: User pool or user does not exist.")
+        log.info("Signout failed: User pool or user does not exist")
         return {
             'statusCode': 404,
             'body': json.dumps({
@@ -58,7 +87,7 @@ def lambda_handler(event, context):
             })
         }
     except client.exceptions.InternalErrorException:
-        print("Signout failed: An internal error occurred.")
+        log.error("Signout failed: An internal error occurred")
         return {
             'statusCode': 500,
             'body': json.dumps({
@@ -68,7 +97,7 @@ def lambda_handler(event, context):
             })
         }
     except client.exceptions.TooManyRequestsException:
-        print("Signout failed: Too many requests.")
+        log.warning("Signout failed: Too many requests")
         return {
             'statusCode': 429,
             'body': json.dumps({
@@ -78,7 +107,7 @@ def lambda_handler(event, context):
             })
         }
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
+        log.error("An error occurred", error=str(e))
         return {
             'statusCode': 500,
             'body': json.dumps({
@@ -1,16 +1,61 @@
 import json
-import boto3
 import os
-
-# Initialize the Cognito client
-client = boto3.client('cognito-idp')
+from datetime import datetime, timedelta, timezone
+from authLogging import get_logger
+from cognitoClient import get_client
+from cognitoThrottle import throttled_call
+from dbClient import call_db, db_configured
+from tracing import traced_handler
+from warmup import is_warmup, warm_up
 
 CLIENT_ID = os.environ.get('COGNITO_CLIENT_ID')
 USER_POOL_ID = os.environ.get('COGNITO_USER_POOL_ID')
 
+# Sign-up pipeline: when DB_HANDLER_FUNCTION is set, the users row is
+# inserted here right after Cognito accepts the sign-up, instead of by a
+# second call from the app. If the insert fails the Cognito user is deleted
+# again, so a failed registration leaves nothing behind and can simply be
+# retried with the same username. A users row that already exists with the
+# same email counts as created, so a repeated insert never triggers that.
+CLIENT_ROLE = 0
+CLIENT_STATUS_UNCONFIRMED = 0
+COLOMBO_TZ = timezone(timedelta(hours=5, minutes=30))
+
+log = get_logger('lambdaSignUp')
+
+def create_profile(username, email):
+    # Raises when the users row could not be inserted
+    status_code, body = call_db('create_user', {
+        'username': username.strip().lower(),
+        'email': email,
+        'role': CLIENT_ROLE,
+        'status': CLIENT_STATUS_UNCONFIRMED,
+        'calendly_name': None,
+        'created_at': datetime.now(COLOMBO_TZ).strftime('%Y-%m-%dT%H:%M:%S')
+    })
+    if status_code != 200:
+        raise RuntimeError(body.get('error', f'DB handler returned {status_code}'))
+
+def remove_cognito_user(username, context):
+    # Compensation for a failed profile insert; returns whether it worked
+    try:
+        throttled_call('admin_delete_user', context,
+            UserPoolId=USER_POOL_ID,
+            Username=username
+        )
+        return True
+    except Exception as e:
+        log.error("Could not remove Cognito user after failed sign-up, user is orphaned",
+                  username=username, error=str(e))
+        return False
+
+@traced_handler('lambdaSignUp')
 def lambda_handler(event, context):
+    if is_warmup(event, context):
+        return warm_up()
+
     # Parse the incoming JSON body
-    print("Received event: " + json.dumps(event))
+    log.start(event)
 
     ## API GW
     username = event.get('username')
@@ -27,9 +72,11 @@ def lambda_handler(event, context):
             })
         }
 
+    client = get_client()
+
     try:
         # Attempt to sign up the user using Cognito
-        response = client.sign_up(
+        response = throttled_call('sign_up', context,
             ClientId=CLIENT_ID,
             Username=username,
             Password=password,
@@ -37,10 +84,32 @@ def lambda_handler(event, context):
                 {
                     'Name': 'email',
                     'Value': email
+                },
+                {
+                    'Name': 'preferred_username',
+                    'Value': username
                 }
             ]
         )
 
+        profile_created = False
+        if db_configured():
+            try:
+                create_profile(username, email)
+                profile_created = True
+            except Exception as e:
+                log.error("Signup failed: Profile insert failed", username=username, error=str(e))
+                rolled_back = remove_cognito_user(username, context)
+                return {
+                    'statusCode': 500,
+                    'body': json.dumps({
+                        'success': False,
+                        'message': 'Registration could not be completed, please try again',
+                        'code': 'ProfileCreationFailed',
+                        'rolledBack': rolled_back
+                    })
+                }
+
         # Return the successful response
         return {
             'statusCode': 200,
@@ -48,12 +117,13 @@ def lambda_handler(event, context):
                 'success': True,
                 'message': 'User registration successful',
                 'userSub': response['UserSub'],
-                'userConfirmed': response['UserConfirmed']
+                'userConfirmed': response['UserConfirmed'],
+                'profileCreated': profile_created
             })
         }
 
     except client.exceptions.UsernameExistsException:
-        print(f"Signup failed: Username {username} already exists.")
+        log.info("Signup failed: Username already exists", username=username)
         return {
             'statusCode': 409,
             'body': json.dumps({
@@ -63,7 +133,7 @@ def lambda_handler(event, context):
             })
         }
     except client.exceptions.InvalidParameterException as e:
-        print(f"Signup failed: Invalid parameter. {str(e)}")
+        log.info("Signup failed: Invalid parameter", error=str(e))
         return {
             'statusCode': 400,
             'body': json.dumps({
@@ -73,7 +143,7 @@ def lambda_handler(event, context):
             })
         }
     except client.exceptions.InvalidPasswordException as e:
-        print(f"Signup failed: Invalid password. {str(e)}")
+        log.info("Signup failed: Invalid password", error=str(e))
         return {
             'statusCode': 400,
             'body': json.dumps({
@@ -82,8 +152,18 @@ def lambda_handler(event, context):
                 'code': 'InvalidPasswordException'
             })
         }
+    except client.exceptions.TooManyRequestsException:
+        log.warning("Signup failed: Too many requests")
+        return {
+            'statusCode': 429,
+            'body': json.dumps({
+                'success': False,
+                'message': 'Too many requests, please try again later',
+                'code': 'TooManyRequestsException'
+            })
+        }
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
+        log.error("An error occurred", error=str(e))
         return {
             'statusCode': 500,
             'body': json.dumps({
@@ -1,15 +1,22 @@
 import json
-import boto3
 import os
-
-# Initialize the Cognito client
-client = boto3.client('cognito-idp')
+from authLogging import get_logger
+from cognitoClient import get_client
+from cognitoThrottle import throttled_call
+from tracing import traced_handler
+from warmup import is_warmup, warm_up
 
 CLIENT_ID = os.environ.get('COGNITO_CLIENT_ID')
 
+log = get_logger('lambdaTempPWDReset')
+
+@traced_handler('lambdaTempPWDReset')
 def lambda_handler(event, context):
+    if is_warmup(event, context):
+        return warm_up()
+
     # Parse the incoming JSON body
-    print("Received event: " + json.dumps(event))
+    log.start(event)
 
     # Extract parameters
     username = event.get('username')
@@ -26,9 +33,11 @@ def lambda_handler(event, context):
             })
         }
 
+    client = get_client()
+
     try:
         # Respond to the NEW_PASSWORD_REQUIRED challenge
-        response = client.respond_to_auth_challenge(
+        response = throttled_call('respond_to_auth_challenge', context,
             ClientId=CLIENT_ID,
             ChallengeName='NEW_PASSWORD_REQUIRED',
             Session=session,
@@ -38,7 +47,7 @@ def lambda_handler(event, context):
                 'userAttributes.preferred_username': username
             }
         )
-        print("Respond to auth challenge response: " + json.dumps(response))
+        log.debug("Respond to auth challenge response", response=response)
         
         # Extract the tokens from the response
         id_token = response['AuthenticationResult']['IdToken']
@@ -46,7 +55,7 @@ def lambda_handler(event, context):
         refresh_token = response['AuthenticationResult']['RefreshToken']
         expires_in = response['AuthenticationResult']['ExpiresIn']
         
-        print("Password changed successfully and user authenticated!")
+        log.info("Password changed successfully and user authenticated", username=username)
         
         return {
             'statusCode': 200,
@@ -63,7 +72,7 @@ def lambda_handler(event, context):
         }
         
     except client.exceptions.InvalidPasswordException as e:
-        print(f"Invalid password: {str(e)}")
+        log.info("Invalid password", error=str(e))
         return {
             'statusCode': 400,
             'body': json.dumps({
@@ -73,7 +82,7 @@ def lambda_handler(event, context):
             })
         }
     except client.exceptions.NotAuthorizedException as e:
-        print("Invalid temporary password or session expired")
+        log.info("Invalid temporary password or session expired", username=username)
         return {
             'statusCode': 401,
             'body': json.dumps({
@@ -82,8 +91,18 @@ def lambda_handler(event, context):
                 'code': 'NotAuthorizedException'
             })
         }
+    except client.exceptions.TooManyRequestsException:
+        log.warning("Password change failed: Too many requests")
+        return {
+            'statusCode': 429,
+            'body': json.dumps({
+                'success': False,
+                'message': 'Too many requests, please try again later',
+                'code': 'TooManyRequestsException'
+            })
+        }
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
+        log.error("An error occurred", error=str(e))
         return {
             'statusCode': 500,
             'body': json.dumps({
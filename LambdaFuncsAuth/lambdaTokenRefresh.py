@@ -1,15 +1,23 @@
 import json
-import boto3
 import os
-
-# Initialize the Cognito client
-client = boto3.client('cognito-idp')
+from authLogging import get_logger
+from cognitoClient import get_client
+from cognitoThrottle import throttled_call
+from refreshCache import get_or_refresh
+from tracing import traced_handler
+from warmup import is_warmup, warm_up
 
 CLIENT_ID = os.environ.get('COGNITO_CLIENT_ID')
 
+log = get_logger('lambdaTokenRefresh')
+
+@traced_handler('lambdaTokenRefresh')
 def lambda_handler(event, context):
+    if is_warmup(event, context):
+        return warm_up()
+
     # Parse the incoming JSON body
-    print("Received event: " + json.dumps(event))
+    log.start(event)
 
     ## API GW
     refresh_token = event.get('refreshToken')
@@ -24,24 +32,35 @@ def lambda_handler(event, context):
             })
         }
 
+    client = get_client()
+
     try:
-        # Attempt to refresh the access token using the refresh token
-        response = client.initiate_auth(
-            ClientId=CLIENT_ID,
-            AuthFlow='REFRESH_TOKEN_AUTH',
-            AuthParameters={
-                'REFRESH_TOKEN': refresh_token
+        def refresh():
+            # Attempt to refresh the access token using the refresh token
+            response = throttled_call('initiate_auth', context,
+                ClientId=CLIENT_ID,
+                AuthFlow='REFRESH_TOKEN_AUTH',
+                AuthParameters={
+                    'REFRESH_TOKEN': refresh_token
+                }
+            )
+            log.debug("Response", response=response)
+
+            # Extract the new tokens from the response
+            auth_result = response['AuthenticationResult']
+            return {
+                'accessToken': auth_result['AccessToken'],
+                'idToken': auth_result.get('IdToken', ''),
+                'expiresIn': auth_result.get('ExpiresIn', 3600)  # Default to 1 hour if not provided
             }
-        )
-        print("Response:", response)
-        
-        # Extract the new tokens from the response
-        auth_result = response['AuthenticationResult']
-        new_access_token = auth_result['AccessToken']
-        new_id_token = auth_result.get('IdToken', '')
-        expires_in = auth_result.get('ExpiresIn', 3600)  # Default to 1 hour if not provided
-        
-        print("Token refreshed successfully.")
+
+        # Concurrent or repeated refreshes of the same token share one Cognito call
+        tokens, coalesced = get_or_refresh(refresh_token, refresh)
+
+        if coalesced:
+            log.info("Token refresh served from recent refresh result")
+        else:
+            log.info("Token refreshed successfully")
 
         # Return the successful response with new tokens
         return {
@@ -49,16 +68,12 @@ def lambda_handler(event, context):
             'body': json.dumps({
                 'success': True,
                 'message': 'Token refreshed successfully',
-                'tokens': {
-                    'accessToken': new_access_token,
-                    'idToken': new_id_token,
-                    'expiresIn': expires_in
-                }
+                'tokens': tokens
             })
         }
 
     except client.exceptions.NotAuthorizedException:
-        print("Token refresh failed: Refresh token is invalid or expired.")
+        log.info("Token refresh failed: Refresh token is invalid or expired")
         return {
             'statusCode': 401,
             'body': json.dumps({
@@ -68,7 +83,7 @@ def lambda_handler(event, context):
             })
         }
     except client.exceptions.ResourceNotFoundException:
-        print("Token refresh failed: User pool or user does not exist.")
+        log.info("Token refresh failed: User pool or user does not exist")
         return {
             'statusCode': 404,
             'body': json.dumps({
@@ -78,7 +93,7 @@ def lambda_handler(event, context):
             })
         }
     except client.exceptions.InvalidParameterException:
-        print("Token refresh failed: Invalid parameter provided.")
+        log.info("Token refresh failed: Invalid parameter provided")
         return {
             'statusCode': 400,
             'body': json.dumps({
@@ -88,7 +103,7 @@ def lambda_handler(event, context):
             })
         }
     except client.exceptions.InternalErrorException:
-        print("Token refresh failed: An internal error occurred.")
+        log.error("Token refresh failed: An internal error occurred")
         return {
             'statusCode': 500,
             'body': json.dumps({
@@ -98,7 +113,7 @@ def lambda_handler(event, context):
             })
         }
     except client.exceptions.TooManyRequestsException:
-        print("Token refresh failed: Too many requests.")
+        log.warning("Token refresh failed: Too many requests")
         return {
             'statusCode': 429,
             'body': json.dumps({
@@ -108,7 +123,7 @@ def lambda_handler(event, context):
             })
         }
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
+        log.error("An error occurred", error=str(e))
         return {
             'statusCode': 500,
             'body': json.dumps({
@@ -0,0 +1,176 @@
+# Short-lived cache of token refresh results, keyed by a hash of the refresh
+# token.
+#
+# When the app resumes, several screens refresh the same expired token at
+# once. The first caller does the Cognito REFRESH_TOKEN_AUTH call; callers
+# arriving while it is in flight wait for it, and callers arriving within
+# TOKEN_REFRESH_CACHE_TTL seconds get the same freshly issued tokens.
+#
+# Results live in process memory. Setting TOKEN_REFRESH_CACHE_DB to a file
+# path (e.g. /tmp/token-refresh.db) also shares them through a local SQLite
+# store between processes on the same host. The store is only read and
+# written outside _lock, so a slow disk never holds up other tokens.
+#
+# Signing out revokes the refresh token, so lambdaSignOut drops its result
+# with evict(); a refresh still in flight for it is then not cached either.
+
+import hashlib
+import json
+import os
+import threading
+import time
+from authLogging import get_logger
+
+CACHE_TTL = float(os.environ.get('TOKEN_REFRESH_CACHE_TTL', '30'))
+SHARED_STORE_PATH = os.environ.get('TOKEN_REFRESH_CACHE_DB')
+INFLIGHT_WAIT_TIMEOUT = 10
+
+log = get_logger('refreshCache')
+
+_results = {}     # key -> (cached_at, tokens)
+_inflight = {}    # key -> {'done': Event, 'error': Exception or None, 'evicted': bool}
+_lock = threading.Lock()
+
+def cache_key(refresh_token):
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+def fresh_copy(cached_at, tokens):
+    # Hand out the remaining lifetime, not the lifetime at issue time
+    if time.time() - cached_at > CACHE_TTL:
+        return None
+    age = int(time.time() - cached_at)
+    return dict(tokens, expiresIn=max(tokens.get('expiresIn', 0) - age, 0))
+
+def shared_store():
+    import sqlite3
+    conn = sqlite3.connect(SHARED_STORE_PATH, timeout=1)
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS refresh_results '
+        '(cache_key TEXT PRIMARY KEY, cached_at REAL, tokens TEXT)'
+    )
+    os.chmod(SHARED_STORE_PATH, 0o600)
+    return conn
+
+def cached(key):
+    # Caller holds _lock
+    entry = _results.get(key)
+    if entry:
+        tokens = fresh_copy(*entry)
+        if tokens:
+            return tokens
+        del _results[key]
+    return None
+
+def remember(key, cached_at, tokens):
+    # Caller holds _lock
+    _results[key] = (cached_at, tokens)
+
+    # Drop expired entries so the cache stays small on long-lived containers
+    now = time.time()
+    for old_key in [k for k, (at, _) in _results.items() if now - at > CACHE_TTL]:
+        del _results[old_key]
+
+def read_shared(key):
+    try:
+        conn = shared_store()
+        try:
+            row = conn.execute(
+                'SELECT cached_at, tokens FROM refresh_results WHERE cache_key = ?', (key,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row:
+            return row[0], json.loads(row[1])
+    except Exception as e:
+        log.warning("Shared refresh cache unavailable", error=str(e))
+    return None
+
+def write_shared(key, cached_at, tokens):
+    try:
+        conn = shared_store()
+        try:
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO refresh_results VALUES (?, ?, ?)',
+                    (key, cached_at, json.dumps(tokens))
+                )
+                conn.execute('DELETE FROM refresh_results WHERE cached_at < ?', (cached_at - CACHE_TTL,))
+        finally:
+            conn.close()
+    except Exception as e:
+        log.warning("Shared refresh cache unavailable", error=str(e))
+
+def delete_shared(key):
+    try:
+        conn = shared_store()
+        try:
+            with conn:
+                conn.execute('DELETE FROM refresh_results WHERE cache_key = ?', (key,))
+        finally:
+            conn.close()
+    except Exception as e:
+        log.warning("Shared refresh cache unavailable", error=str(e))
+
+def evict(refresh_token):
+    # After sign-out: the token is revoked, so its cached result must not be handed out
+    key = cache_key(refresh_token)
+    with _lock:
+        _results.pop(key, None)
+        inflight = _inflight.get(key)
+        if inflight is not None:
+            inflight['evicted'] = True
+    if SHARED_STORE_PATH:
+        delete_shared(key)
+
+def get_or_refresh(refresh_token, refresh):
+    # refresh() does the actual Cognito call and returns the tokens dict.
+    # Returns (tokens, coalesced), where coalesced is True when no call was made.
+    key = cache_key(refresh_token)
+
+    with _lock:
+        tokens = cached(key)
+        if tokens:
+            return tokens, True
+        inflight = _inflight.get(key)
+        leader = inflight is None
+        if leader:
+            inflight = {'done': threading.Event(), 'error': None, 'evicted': False}
+            _inflight[key] = inflight
+
+    if not leader:
+        # Someone is already refreshing this token - share their outcome
+        if inflight['done'].wait(INFLIGHT_WAIT_TIMEOUT):
+            if inflight['error'] is not None:
+                raise inflight['error']
+            with _lock:
+                tokens = cached(key)
+            if tokens:
+                return tokens, True
+        return refresh(), False
+
+    try:
+        # Another process on this host may have refreshed it already
+        shared = read_shared(key) if SHARED_STORE_PATH else None
+        tokens = fresh_copy(*shared) if shared else None
+        if tokens:
+            with _lock:
+                if not inflight['evicted']:
+                    remember(key, *shared)
+            return tokens, True
+
+        tokens = refresh()
+        cached_at = time.time()
+        with _lock:
+            keep = not inflight['evicted']
+            if keep:
+                remember(key, cached_at, tokens)
+        if keep and SHARED_STORE_PATH:
+            write_shared(key, cached_at, tokens)
+        return tokens, False
+    except Exception as e:
+        inflight['error'] = e
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+        inflight['done'].set()
@@ -0,0 +1,152 @@
+# Local pre-validation of Cognito access tokens.
+#
+# Malformed, expired or foreign tokens are rejected in-process so they never
+# reach Cognito. The user pool's JWKS is fetched once, cached, refreshed
+# periodically and re-fetched early when a token is signed with an unknown key
+# (key rotation). RS256 signatures are checked with plain integer math, so no
+# crypto package has to be bundled with the Lambdas.
+#
+# Validation fails open: when the pool is not configured or the JWKS cannot be
+# fetched, validate_access_token() returns None and the caller simply lets
+# Cognito decide, exactly as before.
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from authLogging import get_logger
+from tracing import span
+
+USER_POOL_ID = os.environ.get('COGNITO_USER_POOL_ID')
+CLIENT_ID = os.environ.get('COGNITO_CLIENT_ID')
+JWKS_TTL = int(os.environ.get('COGNITO_JWKS_TTL', '3600'))
+JWKS_MIN_REFRESH_INTERVAL = 60   # Unknown kids or failed fetches retry at most this often
+JWKS_FETCH_TIMEOUT = 2
+
+# ASN.1 DigestInfo prefix for SHA-256 (RFC 8017, section 9.2)
+SHA256_DIGEST_INFO = bytes.fromhex('3031300d060960864801650304020105000420')
+
+log = get_logger('tokenValidation')
+
+_jwks = {'keys': None, 'fetched_at': 0, 'failed_at': 0}
+_jwks_lock = threading.Lock()
+
+class TokenValidationError(Exception):
+    pass
+
+def pool_region(user_pool_id):
+    # Pool ids look like "ap-south-1_AbCdEf"
+    return user_pool_id.split('_')[0]
+
+def issuer_url(user_pool_id):
+    return f"https://cognito-idp.{pool_region(user_pool_id)}.amazonaws.com/{user_pool_id}"
+
+def b64url_decode(segment):
+    return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+
+def b64url_to_int(segment):
+    return int.from_bytes(b64url_decode(segment), 'big')
+
+def fetch_jwks(user_pool_id):
+    # urllib.request pulls in http/ssl/email, so it is only imported when needed
+    import urllib.request
+    url = issuer_url(user_pool_id) + '/.well-known/jwks.json'
+    with span('jwks.fetch'), urllib.request.urlopen(url, timeout=JWKS_FETCH_TIMEOUT) as resp:
+        keys = json.loads(resp.read())['keys']
+    return {
+        key['kid']: (b64url_to_int(key['n']), b64url_to_int(key['e']))
+        for key in keys if key.get('kty') == 'RSA'
+    }
+
+def get_signing_key(kid, user_pool_id):
+    # Returns (n, e) for the kid, None if the pool does not have it, and
+    # raises when no JWKS has been fetched successfully yet
+    now = time.time()
+    keys = _jwks['keys']
+    age = now - _jwks['fetched_at']
+    refresh_due = keys is None or age > JWKS_TTL or (kid not in keys and age > JWKS_MIN_REFRESH_INTERVAL)
+
+    if refresh_due and now - _jwks['failed_at'] > JWKS_MIN_REFRESH_INTERVAL:
+        with _jwks_lock:
+            # Another thread may have refreshed (or failed to) while we waited
+            if _jwks['keys'] is keys and now - _jwks['failed_at'] > JWKS_MIN_REFRESH_INTERVAL:
+                try:
+                    _jwks['keys'] = fetch_jwks(user_pool_id)
+                    _jwks['fetched_at'] = time.time()
+                except Exception as e:
+                    # Keep serving the previous keys, if any, and back off
+                    log.warning("JWKS refresh failed", error=str(e))
+                    _jwks['failed_at'] = time.time()
+            keys = _jwks['keys']
+
+    if keys is None:
+        raise RuntimeError('JWKS has not been fetched')
+    return keys.get(kid)
+
+def prefetch_jwks(user_pool_id=None):
+    # For warmup: loads the JWKS now rather than on the first token check
+    user_pool_id = user_pool_id or USER_POOL_ID
+    if not user_pool_id:
+        return 'disabled'
+    if _jwks['keys'] is None or time.time() - _jwks['fetched_at'] > JWKS_TTL:
+        get_signing_key(None, user_pool_id)
+    return len(_jwks['keys'])
+
+def rsa_sha256_verify(message, signature, n, e):
+    # RSASSA-PKCS1-v1_5 verification with SHA-256
+    key_length = (n.bit_length() + 7) // 8
+    if len(signature) != key_length:
+        return False
+    decrypted = pow(int.from_bytes(signature, 'big'), e, n).to_bytes(key_length, 'big')
+    digest = SHA256_DIGEST_INFO + hashlib.sha256(message).digest()
+    padding = b'\xff' * (key_length - len(digest) - 3)
+    return hmac.compare_digest(decrypted, b'\x00\x01' + padding + b'\x00' + digest)
+
+def decode_token(token):
+    try:
+        header_segment, payload_segment, signature_segment = token.split('.')
+        header = json.loads(b64url_decode(header_segment))
+        claims = json.loads(b64url_decode(payload_segment))
+        signature = b64url_decode(signature_segment)
+    except (ValueError, AttributeError, TypeError):
+        raise TokenValidationError('Invalid Access Token')
+    if not isinstance(header, dict) or not isinstance(claims, dict):
+        raise TokenValidationError('Invalid Access Token')
+    return header, claims, signature, f"{header_segment}.{payload_segment}".encode()
+
+def validate_access_token(token, user_pool_id=None, client_id=None):
+    # Returns the verified claims, None when validation had to be skipped,
+    # and raises TokenValidationError for tokens Cognito would reject
+    user_pool_id = user_pool_id or USER_POOL_ID
+    client_id = client_id or CLIENT_ID
+
+    header, claims, signature, signing_input = decode_token(token)
+
+    # Expiry is checked first - it needs no key and is the most common failure
+    exp = claims.get('exp')
+    if not isinstance(exp, (int, float)) or exp <= time.time():
+        raise TokenValidationError('Access Token has expired')
+
+    if claims.get('token_use') != 'access':
+        raise TokenValidationError('Invalid Access Token')
+    if client_id and claims.get('client_id') != client_id:
+        raise TokenValidationError('Invalid Access Token')
+
+    if not user_pool_id:
+        return None
+    if claims.get('iss') != issuer_url(user_pool_id) or header.get('alg') != 'RS256':
+        raise TokenValidationError('Invalid Access Token')
+
+    try:
+        key = get_signing_key(header.get('kid'), user_pool_id)
+    except Exception as e:
+        log.warning("JWKS unavailable, skipping local token validation", error=str(e))
+        return None
+
+    if key is None or not rsa_sha256_verify(signing_input, signature, *key):
+        raise TokenValidationError('Invalid Access Token')
+
+    return claims
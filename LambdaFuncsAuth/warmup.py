@@ -0,0 +1,85 @@
+# Warmup handling for the auth Lambdas.
+#
+# Scheduled warmers and provisioned-concurrency pings send {"warmup": true}
+# or {"ping": true}, or an EventBridge-style {"source": "aws.events"}. Every
+# handler answers them before reading any request fields, by building what a
+# real request would otherwise build on first use - the Cognito client, the
+# DB handler's Lambda client and the user pool's JWKS - and returns straight
+# away. The DB handler warms its own connection and caches the same way
+# (see DB_Handling/lambdaDBHandling.py).
+#
+# API Gateway passes the request body on as the event, so those fields alone
+# could come from anyone. A warmup is only taken from a direct invoke whose
+# ClientContext names a caller, e.g. {"custom": {"caller": "warmer"}}, which
+# API Gateway cannot set. A plain EventBridge schedule rule cannot send one,
+# so schedule the warmer as a Lambda that invokes the handlers. The response
+# only says which steps passed; the details go to the log.
+#
+#   if is_warmup(event, context):
+#       return warm_up()
+
+import json
+import time
+from authLogging import get_logger
+
+WARMUP_SOURCES = ('aws.events', 'serverless-plugin-warmup')
+
+log = get_logger('warmup')
+
+def invoked_directly(context):
+    client_context = getattr(context, 'client_context', None)
+    custom = getattr(client_context, 'custom', None) or {}
+    return bool(custom.get('caller'))
+
+def is_warmup(event, context):
+    if not isinstance(event, dict) or not invoked_directly(context):
+        return False
+    return bool(event.get('warmup') or event.get('ping')) or event.get('source') in WARMUP_SOURCES
+
+# Each step is only imported when a warmup runs, so handlers keep their lazy
+# cold start for real requests
+
+def warm_cognito_client():
+    from cognitoClient import get_client
+    get_client()
+
+def warm_db_client():
+    from dbClient import db_configured, get_lambda_client
+    if not db_configured():
+        return 'disabled'
+    get_lambda_client()
+
+def warm_jwks():
+    from tokenValidation import prefetch_jwks
+    return prefetch_jwks()
+
+WARMUP_STEPS = [
+    ('cognito_client', warm_cognito_client),
+    ('db_client', warm_db_client),
+    ('jwks', warm_jwks),
+]
+
+def warm_up():
+    started = time.perf_counter()
+    steps = {}
+    for name, step in WARMUP_STEPS:
+        step_started = time.perf_counter()
+        try:
+            detail = step()
+            steps[name] = True
+            log.info("Warmup step done", step=name, detail=detail,
+                     ms=round((time.perf_counter() - step_started) * 1000, 1))
+        except Exception as e:
+            log.warning("Warmup step failed", step=name, error=str(e))
+            steps[name] = False
+
+    warm = all(steps.values())
+    return {
+        'statusCode': 200 if warm else 503,
+        'body': json.dumps({
+            'success': warm,
+            'message': 'Warm' if warm else 'Warmup incomplete',
+            'steps': steps,
+            'durationMs': round((time.perf_counter() - started) * 1000, 1)
+        })
+    }
@@ -0,0 +1,182 @@
+# Request tracing shared by the auth Lambdas and lambdaDBHandling.
+#
+# A handler wrapped with traced_handler opens a trace per invocation, and
+# code inside it times the parts worth knowing about with span():
+#
+#   with span('db.connect'):
+#       conn = pymysql.connect(...)
+#
+# Spans nest. When the invocation ends the whole tree is written as a single
+# JSON line - printed (so it lands in CloudWatch) or appended to TRACE_FILE -
+# and LambdaTools/traceReport.py turns those lines into per-action
+# flame-style summaries.
+#
+# The trace id comes from the request ("traceId" in the payload, or an
+# X-Trace-Id header), falling back to the Lambda request id. dbClient.py
+# forwards it, so an auth Lambda's call into the DB handler shows up under
+# the same id. A trace id is only enough to force a trace when it comes from
+# another Lambda (an invocation with a ClientContext naming its caller, as
+# dbClient.py sends); from the app it is used only if the request is sampled.
+#
+#   TRACE_SAMPLE_RATE  fraction of invocations traced (default 0, off);
+#                      untraced invocations pay one context lookup per span
+#   TRACE_FILE         append trace lines to this file instead of printing
+#
+# This is the only copy. Each Lambda directory is deployed as its own
+# package, and LambdaTools/packageLambdas.py adds this file to both the
+# LambdaFuncsAuth and DB_Handling bundles when they are built.
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', '0'))
+TRACE_FILE = os.environ.get('TRACE_FILE')
+
+_current = contextvars.ContextVar('tracing_span', default=None)
+_file_lock = threading.Lock()
+
+class Span:
+    # Context manager timing one step; the current span is the parent of the
+    # next one opened
+    def __init__(self, name, trace_id, attrs):
+        self.name = name
+        self.trace_id = trace_id
+        self.attrs = attrs
+        self.error = None
+        self.children = []
+        self.start = None
+        self.duration = None
+        self.token = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        _current.reset(self.token)
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self, origin):
+        node = {
+            'name': self.name,
+            'start_ms': round((self.start - origin) * 1000, 3),
+            'duration_ms': round((self.duration or 0) * 1000, 3)
+        }
+        if self.attrs:
+            node['attrs'] = self.attrs
+        if self.error:
+            node['error'] = self.error
+        if self.children:
+            node['children'] = [child.to_dict(origin) for child in self.children]
+        return node
+
+class Trace(Span):
+    # Root span of an invocation, written out when it closes
+    def __exit__(self, exc_type, exc, tb):
+        super().__exit__(exc_type, exc, tb)
+        record = {'type': 'trace', 'trace_id': self.trace_id, 'timestamp': round(time.time() - self.duration, 3)}
+        record.update(self.to_dict(self.start))
+        emit(record)
+
+class NoSpan:
+    # Returned by span() when nothing is being traced
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+    def set(self, **attrs):
+        pass
+
+NO_SPAN = NoSpan()
+
+def active():
+    return _current.get() is not None
+
+def current():
+    return _current.get() or NO_SPAN
+
+def trace_id():
+    open_span = _current.get()
+    return open_span.trace_id if open_span is not None else None
+
+def span(name, **attrs):
+    parent = _current.get()
+    if parent is None:
+        return NO_SPAN
+    child = Span(name, parent.trace_id, attrs)
+    parent.children.append(child)
+    return child
+
+def start_trace(name, trace_id=None, **attrs):
+    return Trace(name, trace_id or os.urandom(16).hex(), attrs)
+
+def bind(fn):
+    # For work handed to another thread: runs fn inside the caller's trace.
+    # A copied context can only be entered by one thread at a time, so bind
+    # once per submitted task.
+    return functools.partial(contextvars.copy_context().run, fn)
+
+def emit(record):
+    line = json.dumps(record, default=str)
+    if TRACE_FILE:
+        with _file_lock, open(TRACE_FILE, 'a') as f:
+            f.write(line + '\n')
+    else:
+        print(line)
+
+def request_trace_id(event):
+    if not isinstance(event, dict):
+        return None
+    if event.get('traceId'):
+        return str(event['traceId'])
+    for name, value in (event.get('headers') or {}).items():
+        if name.lower() == 'x-trace-id' and value:
+            return value
+    return None
+
+def forwarded(context):
+    # Invoked by one of our Lambdas; API Gateway cannot set a ClientContext
+    client_context = getattr(context, 'client_context', None)
+    custom = getattr(client_context, 'custom', None) or {}
+    return bool(custom.get('caller'))
+
+def sampled():
+    if TRACE_SAMPLE_RATE <= 0:
+        return False
+    import random
+    return random.random() < TRACE_SAMPLE_RATE
+
+def traced_handler(function_name):
+    # Decorator for lambda_handler. Inside another trace (e.g. behind
+    # lambdaAuthRouter) the handler becomes a span of that trace instead.
+    def decorate(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            if active():
+                with span(function_name):
+                    return handler(event, context)
+
+            incoming = request_trace_id(event)
+            if (incoming is None or not forwarded(context)) and not sampled():
+                return handler(event, context)
+
+            request_id = getattr(context, 'aws_request_id', None)
+            with start_trace(function_name, incoming or request_id) as root:
+                result = handler(event, context)
+                if isinstance(result, dict) and 'statusCode' in result:
+                    root.set(status=result['statusCode'])
+                return result
+        return wrapper
+    return decorate
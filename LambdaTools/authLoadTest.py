@@ -0,0 +1,268 @@
+import argparse
+import asyncio
+import json
+import random
+import ssl
+import time
+from urllib.parse import urlparse
+
+from latencyStats import OperationStats
+
+# Concurrent load generator for the auth endpoints.
+#
+# Each virtual user is an asyncio task holding one keep-alive HTTP/1.1
+# connection and one account. It signs in, then keeps picking weighted
+# operations (token refresh, password change, sign-out) until the run ends,
+# signing in again after every sign-out - the shape of the morning login peak.
+# Throughput and HDR-style latency histograms are reported per operation.
+#
+# By default it targets LambdaTools/localServer.py running the Cognito
+# stand-in with matching seeded users:
+#
+#   python LambdaTools/localServer.py --fake-cognito --seed-users 200 --cognito-latency-ms 40
+#   python LambdaTools/authLoadTest.py --concurrency 200 --duration 60 --ramp-up 10
+#
+# Against a deployed stage, point --base-url at it, map any paths that differ
+# and provide test accounts (one per virtual user; passwordReset changes their
+# password and changes it back):
+#
+#   python LambdaTools/authLoadTest.py --base-url https://.../dev \
+#       --route refreshToken=/mobile/refreshToken --user-prefix load_user_ --password 'Load@12345'
+
+DEFAULT_BASE_URL = 'http://127.0.0.1:8080'
+DEFAULT_USER_PREFIX = 'load_user_'
+DEFAULT_PASSWORD = 'Load@12345'
+ALTERNATE_PASSWORD_SUFFIX = '#2'
+
+# Operation -> path, appended to --base-url
+ROUTES = {
+    'signIn': '/signIn',
+    'refreshToken': '/refreshToken',
+    'passwordReset': '/passwordReset',
+    'signOut': '/signOut',
+}
+
+# Weights of what a signed-in user does next
+DEFAULT_MIX = 'refreshToken=60,passwordReset=5,signOut=35'
+
+class HttpError(Exception):
+    pass
+
+class KeepAliveConnection:
+    # Minimal HTTP/1.1 client over one asyncio stream, reconnecting when the
+    # server closes the connection
+
+    def __init__(self, url, timeout):
+        self.url = url
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        secure = self.url.scheme == 'https'
+        port = self.url.port or (443 if secure else 80)
+        self.reader, self.writer = await asyncio.open_connection(
+            self.url.hostname, port,
+            ssl=ssl.create_default_context() if secure else None
+        )
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def post_json(self, path, payload):
+        # Returns (status, parsed body)
+        if self.writer is None:
+            await self.connect()
+        body = json.dumps(payload).encode()
+        head = (
+            f"POST {path} HTTP/1.1\r\n"
+            f"Host: {self.url.netloc}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode()
+        try:
+            self.writer.write(head + body)
+            await self.writer.drain()
+            return await asyncio.wait_for(self.read_response(), self.timeout)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, HttpError):
+            # Drop the broken connection so the next request reconnects
+            self.close()
+            raise
+
+    async def read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise HttpError('Connection closed by server')
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode().partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = b''
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                body += chunk[:-2]
+        else:
+            body = await self.reader.readexactly(int(headers.get('content-length', 0)))
+
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            payload = {}
+        # API Gateway proxies the handler's body, localServer the whole result
+        if isinstance(payload.get('body'), str):
+            payload = json.loads(payload['body'])
+        return status, payload
+
+class VirtualUser:
+    def __init__(self, index, args, stats, routes, mix):
+        self.username = f'{args.user_prefix}{index % args.user_count}'
+        self.password = args.password
+        self.shares_account = args.user_count < args.concurrency
+        self.stats = stats
+        self.routes = routes
+        self.mix = mix
+        self.base_path = args.base_url.path.rstrip('/')
+        self.connection = KeepAliveConnection(args.base_url, args.timeout)
+        self.tokens = None
+
+    async def call(self, operation, payload):
+        sent = time.perf_counter()
+        try:
+            status, body = await self.connection.post_json(self.base_path + self.routes[operation], payload)
+        except Exception as e:
+            self.stats.record(operation, time.perf_counter() - sent, error=str(e) or type(e).__name__)
+            return None, {}
+        self.stats.record(operation, time.perf_counter() - sent, status_code=status)
+        return status, body
+
+    async def sign_in(self):
+        status, body = await self.call('signIn', {'username': self.username, 'password': self.password})
+        self.tokens = body.get('tokens') if status == 200 else None
+
+    async def refresh(self):
+        status, body = await self.call('refreshToken', {'refreshToken': self.tokens['refreshToken']})
+        if status == 200:
+            self.tokens.update(accessToken=body['tokens']['accessToken'])
+        elif status == 401:
+            self.tokens = None
+
+    async def password_reset(self):
+        # Change to the alternate password and straight back, so the account
+        # is left as it was found
+        original = self.password
+        changed = original + ALTERNATE_PASSWORD_SUFFIX
+        for previous, new in ((original, changed), (changed, original)):
+            status, _ = await self.call('passwordReset', {
+                'previous_password': previous,
+                'new_password': new,
+                'access_token': self.tokens['accessToken']
+            })
+            if status != 200:
+                return
+
+    async def sign_out(self):
+        await self.call('signOut', {'accessToken': self.tokens['accessToken']})
+        self.tokens = None
+
+    async def run(self, deadline, start_delay):
+        await asyncio.sleep(start_delay)
+        operations, weights = zip(*self.mix)
+        try:
+            while time.perf_counter() < deadline:
+                if not self.tokens:
+                    await self.sign_in()
+                    if not self.tokens:
+                        # Failed sign-ins would otherwise spin; back off briefly
+                        await asyncio.sleep(0.1)
+                    continue
+                operation = random.choices(operations, weights=weights)[0]
+                if operation == 'refreshToken':
+                    await self.refresh()
+                elif operation == 'passwordReset' and not self.shares_account:
+                    await self.password_reset()
+                elif operation == 'signOut':
+                    await self.sign_out()
+        finally:
+            self.connection.close()
+
+def parse_mix(text):
+    mix = []
+    for item in text.split(','):
+        operation, _, weight = item.partition('=')
+        if operation not in ('refreshToken', 'passwordReset', 'signOut'):
+            raise ValueError(f"Unknown operation in --mix: {operation}")
+        mix.append((operation, float(weight)))
+    return mix
+
+async def run_load(args, routes, mix):
+    stats = OperationStats()
+    start = time.perf_counter()
+    deadline = start + args.duration
+    users = [VirtualUser(index, args, stats, routes, mix) for index in range(args.concurrency)]
+    await asyncio.gather(*[
+        # Spread start times evenly over the ramp-up period
+        user.run(deadline, args.ramp_up * index / args.concurrency)
+        for index, user in enumerate(users)
+    ])
+    return stats, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Drive sign-in / refresh / password change / sign-out load')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help=f'Default {DEFAULT_BASE_URL} (localServer.py)')
+    parser.add_argument('--route', action='append', default=[], metavar='OPERATION=PATH',
+                        help='Override the path of an operation, e.g. refreshToken=/mobile/refreshToken')
+    parser.add_argument('--concurrency', type=int, default=50, help='Virtual users, each with its own connection')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+    parser.add_argument('--ramp-up', type=float, default=0, help='Seconds over which virtual users are started')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Weights after sign-in (default {DEFAULT_MIX})')
+    parser.add_argument('--user-prefix', default=DEFAULT_USER_PREFIX, help='Accounts are <prefix>0 .. <prefix>N-1')
+    parser.add_argument('--user-count', type=int, help='Accounts available (default: one per virtual user)')
+    parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password shared by the test accounts')
+    parser.add_argument('--timeout', type=float, default=30, help='Seconds to wait for a response')
+    parser.add_argument('--json', help='Also write the per-operation summary to this file')
+    args = parser.parse_args()
+
+    args.base_url = urlparse(args.base_url)
+    if args.base_url.scheme not in ('http', 'https'):
+        parser.error('--base-url must be an http(s) URL')
+    args.user_count = args.user_count or args.concurrency
+
+    routes = dict(ROUTES)
+    for override in args.route:
+        operation, _, path = override.partition('=')
+        if operation not in routes or not path.startswith('/'):
+            parser.error(f'Bad --route {override}')
+        routes[operation] = path
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.user_count < args.concurrency:
+        # Concurrent password changes on one account would break each other's sign-ins
+        print("Fewer accounts than virtual users: passwordReset is skipped")
+
+    stats, elapsed = asyncio.run(run_load(args, routes, mix))
+    rows = stats.print_report(elapsed)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'elapsed_s': elapsed, 'concurrency': args.concurrency, 'operations': rows}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
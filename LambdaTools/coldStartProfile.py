@@ -0,0 +1,173 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Cold-start profiler for the Python Lambdas.
+#
+# Every function is imported in a fresh interpreter (the Lambda "Init" phase),
+# several times, and the median is compared against coldStartTargets.json
+# (init_ms = module import, client_ms = building the Cognito client on the
+# first request).
+# One extra run with `python -X importtime` is saved per function so the
+# heaviest imports can be inspected.
+#
+#   python LambdaTools/coldStartProfile.py                  # all functions
+#   python LambdaTools/coldStartProfile.py lambdaSignIn     # just one
+#   python LambdaTools/coldStartProfile.py --update-targets # re-baseline
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGETS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'coldStartTargets.json')
+
+AUTH_DIR = os.path.join(REPO_ROOT, 'LambdaFuncsAuth')
+DB_DIR = os.path.join(REPO_ROOT, 'DB_Handling')
+SHARED_DIR = os.path.join(REPO_ROOT, 'LambdaShared')   # bundled into every package, see packageLambdas.py
+
+# Environment the functions expect at import time (values are never used to connect)
+LAMBDA_ENV = {
+    'DB_HOST': 'localhost',
+    'DB_USER': 'profile',
+    'DB_PASSWORD': 'profile',
+    'DB_NAME': 'profile',
+    'COGNITO_CLIENT_ID': 'profile-client-id',
+    'COGNITO_USER_POOL_ID': 'ap-south-1_profile',
+    'AWS_DEFAULT_REGION': 'ap-south-1',
+    'AWS_ACCESS_KEY_ID': 'profile',
+    'AWS_SECRET_ACCESS_KEY': 'profile',
+}
+
+# Imports the module, then (for auth functions) builds the Cognito client the
+# way the first request would. Prints both timings in milliseconds as JSON.
+INIT_SNIPPET = """
+import json, sys, time
+sys.path[:0] = [{directory!r}, {shared!r}]
+start = time.perf_counter()
+module = __import__({module!r})
+init_ms = (time.perf_counter() - start) * 1000
+client_ms = None
+if hasattr(module, 'get_client'):
+    start = time.perf_counter()
+    module.get_client()
+    client_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{'init_ms': init_ms, 'client_ms': client_ms}}))
+"""
+
+def discover_functions():
+    functions = {}
+    for filename in sorted(os.listdir(AUTH_DIR)):
+        if filename.startswith('lambda') and filename.endswith('.py'):
+            functions[filename[:-3]] = AUTH_DIR
+    functions['lambdaDBHandling'] = DB_DIR
+    return functions
+
+def run_snippet(directory, module, extra_args=()):
+    env = dict(os.environ)
+    env.update(LAMBDA_ENV)
+    env.pop('PYTHONPATH', None)
+    return subprocess.run(
+        [sys.executable, *extra_args, '-c', INIT_SNIPPET.format(directory=directory, shared=SHARED_DIR, module=module)],
+        cwd=directory,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+def heaviest_imports(importtime_output, limit=5):
+    # Lines look like: "import time:      1234 |      5678 |   package.name"
+    # Only top-level imports (no indentation) are kept, with cumulative time in ms
+    imports = []
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.startswith('  '):
+            continue
+        imports.append((int(cumulative) / 1000, name.strip()))
+    imports.sort(reverse=True)
+    return imports[:limit]
+
+def profile_function(name, directory, runs, report_dir):
+    init_times = []
+    client_times = []
+    for _ in range(runs):
+        result = json.loads(run_snippet(directory, name).stdout)
+        init_times.append(result['init_ms'])
+        if result['client_ms'] is not None:
+            client_times.append(result['client_ms'])
+
+    importtime = run_snippet(directory, name, ('-X', 'importtime')).stderr
+    if report_dir:
+        with open(os.path.join(report_dir, f'{name}.importtime.txt'), 'w') as f:
+            f.write(importtime)
+
+    return {
+        'init_ms': round(statistics.median(init_times), 2),
+        'client_ms': round(statistics.median(client_times), 2) if client_times else None,
+        'heaviest_imports': heaviest_imports(importtime)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile cold-start init time of the Python Lambdas')
+    parser.add_argument('functions', nargs='*', help='Function names to profile (default: all)')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per function')
+    parser.add_argument('--report-dir', help='Directory for the raw -X importtime reports')
+    parser.add_argument('--targets', default=TARGETS_FILE, help='JSON file with per-function targets in ms')
+    parser.add_argument('--update-targets', action='store_true',
+                        help='Write 2x the measured medians (at least 10ms) back as the new targets')
+    args = parser.parse_args()
+
+    functions = discover_functions()
+    selected = args.functions or list(functions)
+    unknown = [name for name in selected if name not in functions]
+    if unknown:
+        parser.error(f"Unknown functions: {', '.join(unknown)}")
+
+    if args.report_dir:
+        os.makedirs(args.report_dir, exist_ok=True)
+
+    targets = {}
+    if os.path.exists(args.targets):
+        with open(args.targets) as f:
+            targets = json.load(f)
+
+    regressions = []
+    results = {}
+    for name in selected:
+        result = profile_function(name, functions[name], args.runs, args.report_dir)
+        results[name] = result
+
+        # Every metric with a target is checked (init_ms, and client_ms for auth functions)
+        function_targets = targets.get(name, {})
+        failed = [
+            metric for metric, target in function_targets.items()
+            if result.get(metric) is not None and result[metric] > target
+        ]
+        status = 'no target' if not function_targets else ('REGRESSION' if failed else 'ok')
+        if failed:
+            regressions.append(f"{name} ({', '.join(failed)})")
+
+        client = f"{result['client_ms']:.1f}ms" if result['client_ms'] is not None else '-'
+        print(f"{name:28} init {result['init_ms']:8.1f}ms  first client {client:>9}  [{status}]")
+        for cumulative_ms, module in result['heaviest_imports']:
+            print(f"    {cumulative_ms:8.1f}ms  {module}")
+
+    if args.update_targets:
+        for name, result in results.items():
+            for metric in ('init_ms', 'client_ms'):
+                if result[metric] is not None:
+                    targets.setdefault(name, {})[metric] = round(max(result[metric] * 2, 10))
+        with open(args.targets, 'w') as f:
+            json.dump(targets, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Targets written to {args.targets}")
+        return
+
+    if regressions:
+        print(f"\nCold-start regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
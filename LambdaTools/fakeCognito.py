@@ -0,0 +1,439 @@
+# In-memory stand-in for the cognito-idp client used by the auth Lambdas.
+#
+# Implements the operations LambdaFuncsAuth calls, with the same response
+# shapes and the same modeled exceptions (ClientError subclasses exposed on
+# client.exceptions), so handlers run unchanged with no AWS account or
+# network:
+#
+#   import cognitoClient
+#   cognito = FakeCognito()
+#   cognito.add_user('kela_02', 'Kels@123')
+#   cognitoClient._client = cognito
+#
+# Access and id tokens are real RS256 JWTs signed with a throwaway key, so
+# tokenValidation can check them end to end once signing_keys() is loaded
+# into its JWKS cache. Errors such as throttling can be injected per
+# operation with fail_next(), and a fixed latency can be added to every call
+# to mimic the real service under load.
+
+import base64
+import hashlib
+import json
+import random
+import re
+import secrets
+import threading
+import time
+import uuid
+from botocore.exceptions import ClientError, ParamValidationError
+
+TOKEN_LIFETIME = 3600
+CODE_LIFETIME = 3600
+DEFAULT_CLIENT_ID = 'local-client'
+DEFAULT_USER_POOL_ID = 'local-1_LocalPool'
+SIGNING_KEY_ID = 'local'
+SIGNING_KEY_BITS = 1024   # plenty for a throwaway test key, and generated in ~0.1s
+
+# ASN.1 DigestInfo prefix for SHA-256 (RFC 8017, section 9.2)
+SHA256_DIGEST_INFO = bytes.fromhex('3031300d060960864801650304020105000420')
+
+EXCEPTION_NAMES = [
+    'CodeMismatchException', 'ExpiredCodeException', 'InternalErrorException',
+    'InvalidParameterException', 'InvalidPasswordException', 'LimitExceededException',
+    'NotAuthorizedException', 'ResourceNotFoundException', 'TooManyRequestsException',
+    'UserNotConfirmedException', 'UserNotFoundException', 'UsernameExistsException',
+]
+
+class FakeCognitoExceptions:
+    pass
+
+for _name in EXCEPTION_NAMES:
+    setattr(FakeCognitoExceptions, _name, type(_name, (ClientError,), {}))
+
+def b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+def is_probable_prime(n, rounds=20):
+    for p in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29):
+        if n % p == 0:
+            return n == p
+    d, r = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+    for _ in range(rounds):
+        x = pow(random.randrange(2, n - 1), d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(r - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+def random_prime(bits):
+    while True:
+        candidate = random.getrandbits(bits) | (1 << bits - 1) | 1
+        if is_probable_prime(candidate):
+            return candidate
+
+def generate_rsa_key(bits):
+    # Returns (n, e, d, p, q). Test-only key material, never use for anything real.
+    e = 65537
+    while True:
+        p, q = random_prime(bits // 2), random_prime(bits // 2)
+        phi = (p - 1) * (q - 1)
+        if p != q and phi % e:
+            return p * q, e, pow(e, -1, phi), p, q
+
+_signing_key = None
+_signing_key_lock = threading.Lock()
+
+def signing_key():
+    # One key per process, shared by every FakeCognito instance
+    global _signing_key
+    with _signing_key_lock:
+        if _signing_key is None:
+            _signing_key = generate_rsa_key(SIGNING_KEY_BITS)
+    return _signing_key
+
+def rsa_sha256_sign(message, n, d, p, q):
+    # RSASSA-PKCS1-v1_5 with SHA-256. The CRT form is ~4x faster than pow(m, d, n),
+    # which matters when the stand-in serves load tests.
+    key_length = (n.bit_length() + 7) // 8
+    digest = SHA256_DIGEST_INFO + hashlib.sha256(message).digest()
+    encoded = b'\x00\x01' + b'\xff' * (key_length - len(digest) - 3) + b'\x00' + digest
+    m = int.from_bytes(encoded, 'big')
+    s_p = pow(m, d % (p - 1), p)
+    s_q = pow(m, d % (q - 1), q)
+    h = (pow(q, -1, p) * (s_p - s_q)) % p
+    return (s_q + h * q).to_bytes(key_length, 'big')
+
+def password_problem(password):
+    # Mirrors the default pool policy: 8+ characters with upper, lower, digit and symbol
+    if len(password) < 8:
+        return 'Password not long enough'
+    if not re.search(r'[A-Z]', password):
+        return 'Password must have uppercase characters'
+    if not re.search(r'[a-z]', password):
+        return 'Password must have lowercase characters'
+    if not re.search(r'[0-9]', password):
+        return 'Password must have numeric characters'
+    if not re.search(r'[^A-Za-z0-9]', password):
+        return 'Password must have symbol characters'
+    return None
+
+class FakeCognito:
+    exceptions = FakeCognitoExceptions
+
+    def __init__(self, client_id=DEFAULT_CLIENT_ID, user_pool_id=DEFAULT_USER_POOL_ID, latency=0):
+        self.client_id = client_id
+        self.user_pool_id = user_pool_id
+        self.latency = latency
+        self.users = {}            # username -> user record
+        self.access_tokens = {}    # token -> username
+        self.refresh_tokens = {}   # token -> username
+        self.sessions = {}         # session -> username, for NEW_PASSWORD_REQUIRED
+        self.codes = {}            # username -> (confirmation code, expires_at)
+        self.calls = []            # operation names, in call order
+        self.failures = {}         # operation -> [(code, message), ...]
+        self.lock = threading.RLock()
+
+    # ---- test setup helpers ----
+
+    def add_user(self, username, password, status='CONFIRMED', email=None):
+        with self.lock:
+            self.users[username] = {
+                'password': password,
+                'status': status,
+                'email': email or f'{username}@example.com',
+                'sub': str(uuid.uuid4())
+            }
+        return self.users[username]
+
+    def fail_next(self, operation, code, message='Injected failure', times=1):
+        # The next `times` calls to operation raise the given modeled exception
+        with self.lock:
+            self.failures.setdefault(operation, []).extend([(code, message)] * times)
+
+    def expire_code(self, username):
+        code, _ = self.codes[username]
+        self.codes[username] = (code, time.time() - 1)
+
+    def call_count(self, operation):
+        return self.calls.count(operation)
+
+    def issuer(self):
+        region = self.user_pool_id.split('_')[0]
+        return f"https://cognito-idp.{region}.amazonaws.com/{self.user_pool_id}"
+
+    def signing_keys(self):
+        # In the {kid: (n, e)} form tokenValidation keeps its JWKS in
+        n, e = signing_key()[:2]
+        return {SIGNING_KEY_ID: (n, e)}
+
+    # ---- internals ----
+
+    def error(self, code, message, operation):
+        return getattr(self.exceptions, code)({'Error': {'Code': code, 'Message': message}}, operation)
+
+    def begin(self, operation, params, *required):
+        # Records the call, applies latency and injected failures, and
+        # validates required parameters the way botocore does client-side
+        missing = [name for name in required if params.get(name) is None]
+        if missing:
+            raise ParamValidationError(report=f'Missing required parameter in input: "{missing[0]}"')
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.calls.append(operation)
+            queued = self.failures.get(operation)
+            if queued:
+                code, message = queued.pop(0)
+                raise self.error(code, message, operation)
+
+    def check_client(self, params, operation):
+        if params.get('ClientId') != self.client_id:
+            raise self.error('ResourceNotFoundException', 'User pool client does not exist.', operation)
+
+    def check_pool(self, params, operation):
+        if params.get('UserPoolId') != self.user_pool_id:
+            raise self.error('ResourceNotFoundException', 'User pool does not exist.', operation)
+
+    def check_password(self, password, operation):
+        problem = password_problem(password)
+        if problem:
+            raise self.error('InvalidPasswordException', f'Password did not conform with policy: {problem}', operation)
+
+    def get_user(self, username, operation):
+        user = self.users.get(username)
+        if user is None:
+            raise self.error('UserNotFoundException', 'User does not exist.', operation)
+        return user
+
+    def token_user(self, access_token, operation):
+        username = self.access_tokens.get(access_token)
+        if username is None:
+            raise self.error('NotAuthorizedException', 'Access Token has been revoked', operation)
+        return username
+
+    def jwt(self, claims):
+        n, _, d, p, q = signing_key()
+        header = {'kid': SIGNING_KEY_ID, 'alg': 'RS256'}
+        signing_input = b64url(json.dumps(header).encode()) + '.' + b64url(json.dumps(claims).encode())
+        return signing_input + '.' + b64url(rsa_sha256_sign(signing_input.encode(), n, d, p, q))
+
+    def issue_tokens(self, username, with_refresh=True):
+        user = self.users[username]
+        now = int(time.time())
+        common = {
+            'sub': user['sub'], 'iss': self.issuer(), 'iat': now,
+            'exp': now + TOKEN_LIFETIME, 'jti': str(uuid.uuid4())
+        }
+        access_token = self.jwt(dict(common, token_use='access', client_id=self.client_id, username=username))
+        id_token = self.jwt(dict(common, token_use='id', aud=self.client_id, email=user['email'],
+                                 **{'cognito:username': username}))
+        self.access_tokens[access_token] = username
+        result = {
+            'AccessToken': access_token,
+            'ExpiresIn': TOKEN_LIFETIME,
+            'TokenType': 'Bearer',
+            'IdToken': id_token
+        }
+        if with_refresh:
+            refresh_token = b64url(secrets.token_bytes(48))
+            self.refresh_tokens[refresh_token] = username
+            result['RefreshToken'] = refresh_token
+        return result
+
+    def revoke_all(self, username):
+        for tokens in (self.access_tokens, self.refresh_tokens):
+            for token in [t for t, owner in tokens.items() if owner == username]:
+                del tokens[token]
+
+    def user_attributes(self, username):
+        user = self.users[username]
+        return [
+            {'Name': 'sub', 'Value': user['sub']},
+            {'Name': 'email', 'Value': user['email']},
+            {'Name': 'email_verified', 'Value': 'true'}
+        ]
+
+    # ---- cognito-idp operations ----
+
+    def initiate_auth(self, **params):
+        operation = 'InitiateAuth'
+        self.begin('initiate_auth', params, 'ClientId', 'AuthFlow')
+        self.check_client(params, operation)
+        auth = params.get('AuthParameters') or {}
+
+        with self.lock:
+            if params['AuthFlow'] == 'USER_PASSWORD_AUTH':
+                user = self.get_user(auth.get('USERNAME'), operation)
+                if user['password'] != auth.get('PASSWORD'):
+                    raise self.error('NotAuthorizedException', 'Incorrect username or password.', operation)
+                if user['status'] == 'UNCONFIRMED':
+                    raise self.error('UserNotConfirmedException', 'User is not confirmed.', operation)
+                if user['status'] == 'FORCE_CHANGE_PASSWORD':
+                    session = b64url(secrets.token_bytes(48))
+                    self.sessions[session] = auth['USERNAME']
+                    return {
+                        'ChallengeName': 'NEW_PASSWORD_REQUIRED',
+                        'Session': session,
+                        'ChallengeParameters': {'USER_ID_FOR_SRP': auth['USERNAME'], 'requiredAttributes': '[]'}
+                    }
+                return {'ChallengeParameters': {}, 'AuthenticationResult': self.issue_tokens(auth['USERNAME'])}
+
+            if params['AuthFlow'] == 'REFRESH_TOKEN_AUTH':
+                username = self.refresh_tokens.get(auth.get('REFRESH_TOKEN'))
+                if username is None:
+                    raise self.error('NotAuthorizedException', 'Invalid Refresh Token', operation)
+                return {'ChallengeParameters': {}, 'AuthenticationResult': self.issue_tokens(username, with_refresh=False)}
+
+        raise self.error('InvalidParameterException', f"Unsupported AuthFlow {params['AuthFlow']}", operation)
+
+    def respond_to_auth_challenge(self, **params):
+        operation = 'RespondToAuthChallenge'
+        self.begin('respond_to_auth_challenge', params, 'ClientId', 'ChallengeName')
+        self.check_client(params, operation)
+        responses = params.get('ChallengeResponses') or {}
+
+        with self.lock:
+            username = self.sessions.get(params.get('Session'))
+            if username is None or username != responses.get('USERNAME'):
+                raise self.error('NotAuthorizedException', 'Invalid session for the user.', operation)
+            self.check_password(responses.get('NEW_PASSWORD') or '', operation)
+            del self.sessions[params['Session']]
+            self.users[username].update(password=responses['NEW_PASSWORD'], status='CONFIRMED')
+            return {'ChallengeParameters': {}, 'AuthenticationResult': self.issue_tokens(username)}
+
+    def sign_up(self, **params):
+        operation = 'SignUp'
+        self.begin('sign_up', params, 'ClientId', 'Username', 'Password')
+        self.check_client(params, operation)
+        attributes = {a['Name']: a['Value'] for a in params.get('UserAttributes') or []}
+
+        with self.lock:
+            if params['Username'] in self.users:
+                raise self.error('UsernameExistsException', 'User already exists', operation)
+            if not re.fullmatch(r'[^@\s]+@[^@\s]+\.[^@\s]+', attributes.get('email', '')):
+                raise self.error('InvalidParameterException', 'Invalid email address format.', operation)
+            self.check_password(params['Password'], operation)
+            user = self.add_user(params['Username'], params['Password'], 'UNCONFIRMED', attributes['email'])
+            user['attributes'] = attributes
+            return {
+                'UserConfirmed': False,
+                'CodeDeliveryDetails': {'Destination': attributes['email'], 'DeliveryMedium': 'EMAIL', 'AttributeName': 'email'},
+                'UserSub': user['sub']
+            }
+
+    def global_sign_out(self, **params):
+        operation = 'GlobalSignOut'
+        self.begin('global_sign_out', params, 'AccessToken')
+        with self.lock:
+            self.revoke_all(self.token_user(params['AccessToken'], operation))
+        return {}
+
+    def change_password(self, **params):
+        operation = 'ChangePassword'
+        self.begin('change_password', params, 'PreviousPassword', 'ProposedPassword', 'AccessToken')
+        with self.lock:
+            user = self.users[self.token_user(params['AccessToken'], operation)]
+            if user['password'] != params['PreviousPassword']:
+                raise self.error('NotAuthorizedException', 'Incorrect username or password.', operation)
+            self.check_password(params['ProposedPassword'], operation)
+            user['password'] = params['ProposedPassword']
+        return {}
+
+    def admin_get_user(self, **params):
+        operation = 'AdminGetUser'
+        self.begin('admin_get_user', params, 'UserPoolId', 'Username')
+        self.check_pool(params, operation)
+        with self.lock:
+            user = self.get_user(params['Username'], operation)
+            return {
+                'Username': params['Username'],
+                'UserAttributes': self.user_attributes(params['Username']),
+                'UserStatus': user['status'],
+                'Enabled': True
+            }
+
+    def forgot_password(self, **params):
+        operation = 'ForgotPassword'
+        self.begin('forgot_password', params, 'ClientId', 'Username')
+        self.check_client(params, operation)
+        with self.lock:
+            user = self.get_user(params['Username'], operation)
+            self.codes[params['Username']] = (f'{secrets.randbelow(10 ** 6):06d}', time.time() + CODE_LIFETIME)
+            local, domain = user['email'].split('@')
+            return {
+                'CodeDeliveryDetails': {
+                    'Destination': f'{local[0]}***@{domain[0]}***',
+                    'DeliveryMedium': 'EMAIL',
+                    'AttributeName': 'email'
+                }
+            }
+
+    def confirm_forgot_password(self, **params):
+        operation = 'ConfirmForgotPassword'
+        self.begin('confirm_forgot_password', params, 'ClientId', 'Username', 'ConfirmationCode', 'Password')
+        self.check_client(params, operation)
+        with self.lock:
+            user = self.get_user(params['Username'], operation)
+            code, expires_at = self.codes.get(params['Username'], (None, 0))
+            if code is None or code != params['ConfirmationCode']:
+                raise self.error('CodeMismatchException', 'Invalid verification code provided, please try again.', operation)
+            if expires_at < time.time():
+                raise self.error('ExpiredCodeException', 'Invalid code provided, please request a code again.', operation)
+            self.check_password(params['Password'], operation)
+            del self.codes[params['Username']]
+            user.update(password=params['Password'], status='CONFIRMED')
+        return {}
+
+    def admin_set_user_password(self, **params):
+        operation = 'AdminSetUserPassword'
+        self.begin('admin_set_user_password', params, 'UserPoolId', 'Username', 'Password')
+        self.check_pool(params, operation)
+        with self.lock:
+            user = self.get_user(params['Username'], operation)
+            self.check_password(params['Password'], operation)
+            user.update(
+                password=params['Password'],
+                status='CONFIRMED' if params.get('Permanent') else 'FORCE_CHANGE_PASSWORD'
+            )
+        return {}
+
+    def admin_create_user(self, **params):
+        operation = 'AdminCreateUser'
+        self.begin('admin_create_user', params, 'UserPoolId', 'Username')
+        self.check_pool(params, operation)
+        attributes = {a['Name']: a['Value'] for a in params.get('UserAttributes') or []}
+
+        with self.lock:
+            if params['Username'] in self.users:
+                raise self.error('UsernameExistsException', 'User account already exists', operation)
+            if 'email' in attributes and '@' not in attributes['email']:
+                raise self.error('InvalidParameterException', 'Invalid email address format.', operation)
+            temp_password = params.get('TemporaryPassword') or 'Tmp#' + secrets.token_hex(4) + 'Aa1'
+            self.add_user(params['Username'], temp_password, 'FORCE_CHANGE_PASSWORD', attributes.get('email'))
+            return {
+                'User': {
+                    'Username': params['Username'],
+                    'Attributes': self.user_attributes(params['Username']),
+                    'UserStatus': 'FORCE_CHANGE_PASSWORD',
+                    'Enabled': True
+                }
+            }
+
+    def admin_delete_user(self, **params):
+        operation = 'AdminDeleteUser'
+        self.begin('admin_delete_user', params, 'UserPoolId', 'Username')
+        self.check_pool(params, operation)
+        with self.lock:
+            self.get_user(params['Username'], operation)
+            self.revoke_all(params['Username'])
+            del self.users[params['Username']]
+            self.codes.pop(params['Username'], None)
+        return {}
@@ -0,0 +1,144 @@
+import math
+import threading
+
+# Latency recording shared by the load tools.
+#
+# Latencies go into HDR-style buckets: every power-of-two range of
+# microseconds is split into SUB_BUCKETS linear slots, so memory stays
+# constant no matter how many samples are recorded and every percentile is
+# accurate to within ~1/SUB_BUCKETS (about 3%).
+
+SUB_BUCKETS = 32
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.max_us = 0
+
+    @staticmethod
+    def bucket_for(latency_us):
+        if latency_us < SUB_BUCKETS:
+            return (0, int(latency_us))
+        exponent = int(math.log2(latency_us / SUB_BUCKETS))
+        return (exponent, int(latency_us) >> exponent)
+
+    @staticmethod
+    def bucket_upper_us(bucket):
+        exponent, slot = bucket
+        return (slot + 1) << exponent
+
+    def record(self, latency_s):
+        latency_us = max(int(latency_s * 1_000_000), 0)
+        bucket = self.bucket_for(latency_us)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+        self.max_us = max(self.max_us, latency_us)
+
+    def merge(self, other):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += other.total
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile_ms(self, percentile):
+        if not self.total:
+            return 0.0
+        threshold = math.ceil(self.total * percentile / 100)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= threshold:
+                return min(self.bucket_upper_us(bucket), self.max_us) / 1000
+        return self.max_us / 1000
+
+    def distribution(self, bounds_ms=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)):
+        # Coarse view for printing: (bound, count) per band, counting the
+        # samples above the previous bound and at or below this one (not
+        # cumulative); the last band, bound inf, holds everything slower
+        rows = []
+        remaining = dict(self.counts)
+        for bound in list(bounds_ms) + [math.inf]:
+            count = 0
+            for bucket in list(remaining):
+                if self.bucket_upper_us(bucket) <= bound * 1000 or bound == math.inf:
+                    count += remaining.pop(bucket)
+            rows.append((bound, count))
+        return rows
+
+class OperationStats:
+    # Per-operation counters, safe to update from many worker threads
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.operations = {}
+
+    def record(self, operation, latency_s, status_code=None, error=None):
+        with self.lock:
+            stats = self.operations.setdefault(operation, {
+                'histogram': LatencyHistogram(),
+                'requests': 0,
+                'client_errors': 0,
+                'errors': 0,
+                'status_codes': {}
+            })
+            stats['requests'] += 1
+            stats['histogram'].record(latency_s)
+            if status_code is not None:
+                stats['status_codes'][status_code] = stats['status_codes'].get(status_code, 0) + 1
+            if error is not None or (status_code is not None and status_code >= 500):
+                stats['errors'] += 1
+            elif status_code is not None and status_code >= 400:
+                stats['client_errors'] += 1
+
+    def summary(self, elapsed_s):
+        rows = {}
+        combined = LatencyHistogram()
+        for operation, stats in sorted(self.operations.items()):
+            histogram = stats['histogram']
+            combined.merge(histogram)
+            rows[operation] = {
+                'requests': stats['requests'],
+                'throughput_rps': round(stats['requests'] / elapsed_s, 2) if elapsed_s else 0,
+                'error_rate': round(stats['errors'] / stats['requests'], 4),
+                'client_error_rate': round(stats['client_errors'] / stats['requests'], 4),
+                'status_codes': stats['status_codes'],
+                'p50_ms': histogram.percentile_ms(50),
+                'p90_ms': histogram.percentile_ms(90),
+                'p99_ms': histogram.percentile_ms(99),
+                'max_ms': histogram.max_us / 1000,
+            }
+        return rows, combined
+
+    def print_report(self, elapsed_s, show_histograms=True):
+        rows, combined = self.summary(elapsed_s)
+        total = sum(row['requests'] for row in rows.values())
+        print(f"\n{total} requests in {elapsed_s:.1f}s ({total / elapsed_s if elapsed_s else 0:.1f} req/s)")
+        print(f"{'operation':32} {'reqs':>7} {'req/s':>8} {'err%':>6} {'4xx%':>6} "
+              f"{'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+        for operation, row in rows.items():
+            print(f"{operation:32} {row['requests']:7} {row['throughput_rps']:8.1f} "
+                  f"{row['error_rate'] * 100:6.2f} {row['client_error_rate'] * 100:6.2f} "
+                  f"{row['p50_ms']:8.2f} {row['p90_ms']:8.2f} {row['p99_ms']:8.2f} {row['max_ms']:8.2f}")
+
+        if show_histograms:
+            for operation, stats in sorted(self.operations.items()):
+                print(f"\n{operation} latency (ms)")
+                print_distribution(stats['histogram'])
+        return rows
+
+def print_distribution(histogram, width=40):
+    rows = histogram.distribution()
+    largest = max((count for _, count in rows), default=0) or 1
+    previous = None
+    for bound, count in rows:
+        lower, previous = previous, bound
+        if not count:
+            continue
+        if lower is None:
+            label = f"<= {bound:g}"
+        elif bound == math.inf:
+            label = f"> {lower:g}"
+        else:
+            label = f"{lower:g}-{bound:g}"
+        print(f"  {label:>10} {count:7}  {'#' * max(1, int(width * count / largest))}")
@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local HTTP wrapper around the Python Lambdas.
+#
+# Mirrors the API Gateway setup the app uses: the JSON request body is passed
+# to lambda_handler as the event, and the handler's return value is sent back
+# as the JSON response body with its statusCode as the HTTP status.
+#
+#   python LambdaTools/localServer.py --port 8080
+#   curl -X POST localhost:8080/dbHandling -d '{"action": "get_user_role", "data": {"username": "kela_02"}}'
+#
+# With --fake-cognito the auth routes run against the in-memory Cognito
+# stand-in (LambdaTools/fakeCognito.py) instead of AWS, seeded with
+# --seed-users accounts named load_user_<n>, for offline load tests:
+#
+#   python LambdaTools/localServer.py --fake-cognito --seed-users 200 --cognito-latency-ms 40
+#   curl -X POST localhost:8080/signIn -d '{"username": "load_user_0", "password": "Load@12345"}'
+#
+# Every request is served by this one process, which behaves like a single
+# warm Lambda container: cognitoThrottle's per-container rate applies to the
+# whole load. Raise COGNITO_THROTTLE_INITIAL_RATE / COGNITO_THROTTLE_MAX_RATE
+# to model a fleet of containers.
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEED_USER_PREFIX = 'load_user_'
+SEED_USER_PASSWORD = 'Load@12345'
+
+# Path -> (directory, module) of the Lambda serving it.
+# Auth paths match the last segment of the API Gateway paths the app calls.
+ROUTES = {
+    '/dbHandling': ('DB_Handling', 'lambdaDBHandling'),
+    '/signIn': ('LambdaFuncsAuth', 'lambdaSignIn'),
+    '/signUp': ('LambdaFuncsAuth', 'lambdaSignUp'),
+    '/signOut': ('LambdaFuncsAuth', 'lambdaSignOut'),
+    '/refreshToken': ('LambdaFuncsAuth', 'lambdaTokenRefresh'),
+    '/passwordReset': ('LambdaFuncsAuth', 'lambdaPasswordReset'),
+    '/tempPWDReset': ('LambdaFuncsAuth', 'lambdaTempPWDReset'),
+    '/initiateForgotPWD': ('LambdaFuncsAuth', 'lambdaInitiateForgotPWD'),
+    '/confirmForgotPWD': ('LambdaFuncsAuth', 'lambdaConfirmForgotPWD'),
+    '/newTempPWDRequest': ('LambdaFuncsAuth', 'lambdaNewTempPWDResquest'),
+    '/adminCreatesCN': ('LambdaFuncsAuth', 'lambdaAdminCreatesCN'),
+}
+
+_handlers = {}
+_import_lock = threading.Lock()
+
+def get_handler(path):
+    with _import_lock:
+        if path not in _handlers:
+            directory, module = ROUTES[path]
+            # Shared modules are bundled in at build time (packageLambdas.py)
+            for directory in (os.path.join(REPO_ROOT, 'LambdaShared'), os.path.join(REPO_ROOT, directory)):
+                if directory not in sys.path:
+                    sys.path.insert(0, directory)
+            _handlers[path] = __import__(module).lambda_handler
+        return _handlers[path]
+
+def install_fake_cognito(seed_users=0, latency_ms=0):
+    # Must run before any auth handler is imported: they read the client and
+    # pool ids from the environment at import time
+    import fakeCognito
+    os.environ['COGNITO_CLIENT_ID'] = fakeCognito.DEFAULT_CLIENT_ID
+    os.environ['COGNITO_USER_POOL_ID'] = fakeCognito.DEFAULT_USER_POOL_ID
+    sys.path[:0] = [os.path.join(REPO_ROOT, 'LambdaFuncsAuth'), os.path.join(REPO_ROOT, 'LambdaShared')]
+    import cognitoClient
+    import tokenValidation
+
+    cognito = fakeCognito.FakeCognito(latency=latency_ms / 1000)
+    for index in range(seed_users):
+        cognito.add_user(f'{SEED_USER_PREFIX}{index}', SEED_USER_PASSWORD)
+    cognitoClient._client = cognito
+    # Access tokens are verified against the stand-in's key instead of a fetched JWKS
+    tokenValidation._jwks.update(keys=cognito.signing_keys(), fetched_at=float('inf'))
+    return cognito
+
+class LambdaRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive, so load tools can reuse connections
+    # Headers and body go out in separate writes; with Nagle on, every
+    # keep-alive response would wait ~40ms for the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        path = self.path.split('?')[0]
+        if path not in ROUTES:
+            return self.send_json(404, {'message': f'No route for {path}'})
+
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            event = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self.send_json(400, {'message': 'Request body must be JSON'})
+
+        try:
+            result = get_handler(path)(event, None)
+        except Exception as e:
+            # Same shape API Gateway returns when the function itself fails
+            print(f"Handler for {path} failed: {str(e)}")
+            return self.send_json(502, {'message': 'Internal server error'})
+        self.send_json(result.get('statusCode', 200), result)
+
+    def send_json(self, status_code, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate the timings under load
+        pass
+
+class LambdaServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 makes a burst of new load-test
+    # connections wait out SYN retries
+    request_queue_size = 256
+
+def make_server(host='127.0.0.1', port=8080):
+    return LambdaServer((host, port), LambdaRequestHandler)
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the Python Lambdas over local HTTP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--fake-cognito', action='store_true', help='Serve the auth routes from the in-memory Cognito stand-in')
+    parser.add_argument('--seed-users', type=int, default=0,
+                        help=f'Users {SEED_USER_PREFIX}0..N-1 with password {SEED_USER_PASSWORD} (with --fake-cognito)')
+    parser.add_argument('--cognito-latency-ms', type=float, default=0, help='Latency added to every stand-in call')
+    args = parser.parse_args()
+
+    if args.fake_cognito:
+        install_fake_cognito(args.seed_users, args.cognito_latency_ms)
+        print(f"Using the Cognito stand-in with {args.seed_users} seeded users")
+
+    server = make_server(args.host, args.port)
+    print(f"Serving {', '.join(sorted(ROUTES))} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
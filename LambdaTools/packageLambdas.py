@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+import zipfile
+
+# Builds the deployment bundle of each Python Lambda package.
+#
+# Modules used by more than one package live once in LambdaShared/ and are
+# copied into every bundle here, so LambdaFuncsAuth/ and DB_Handling/ never
+# carry their own copies. Third-party dependencies (pymysql, boto3) are not
+# bundled and come from the runtime or a layer as before.
+#
+#   python LambdaTools/packageLambdas.py                 # every package, into build/lambdas
+#   python LambdaTools/packageLambdas.py DB_Handling     # just one
+#   python LambdaTools/packageLambdas.py --out /tmp/out
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SHARED_DIR = os.path.join(REPO_ROOT, 'LambdaShared')
+DEFAULT_OUT_DIR = os.path.join(REPO_ROOT, 'build', 'lambdas')
+
+# Package directory -> shared modules it imports
+PACKAGES = {
+    'LambdaFuncsAuth': ['tracing.py'],
+    'DB_Handling': ['tracing.py'],
+}
+
+def package_files(package):
+    # (path on disk, name in the bundle) for every module of the package
+    directory = os.path.join(REPO_ROOT, package)
+    files = [
+        (os.path.join(directory, filename), filename)
+        for filename in sorted(os.listdir(directory))
+        if filename.endswith('.py')
+    ]
+    own = {name for _, name in files}
+    for filename in PACKAGES[package]:
+        if filename in own:
+            raise ValueError(f"{package}/{filename} shadows LambdaShared/{filename}; remove the copy")
+        files.append((os.path.join(SHARED_DIR, filename), filename))
+    return files
+
+def build(package, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f'{package}.zip')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as bundle:
+        for source, name in package_files(package):
+            bundle.write(source, name)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description='Build deployment bundles of the Python Lambdas')
+    parser.add_argument('packages', nargs='*', help=f"default: {', '.join(PACKAGES)}")
+    parser.add_argument('--out', default=DEFAULT_OUT_DIR, help='directory for the .zip files')
+    args = parser.parse_args()
+
+    unknown = [package for package in args.packages if package not in PACKAGES]
+    if unknown:
+        parser.error(f"unknown package(s): {', '.join(unknown)}")
+
+    for package in args.packages or PACKAGES:
+        print(build(package, args.out))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from latencyStats import OperationStats
+
+# Traffic replay load tester for lambdaDBHandling.
+#
+# Replays a stream of {"action", "data"} events against lambda_handler, either
+# in-process or over HTTP (e.g. LambdaTools/localServer.py), from a pool of
+# worker threads. Workers are started gradually over --ramp-up seconds and the
+# stream is replayed in a loop until --duration runs out (or once, without
+# --duration). Throughput, error rates and latency histograms are reported per
+# action, so the saturation point can be found by stepping --concurrency up.
+#
+#   python LambdaTools/replayLoadTest.py --events recorded.jsonl --concurrency 20 --duration 60
+#   python LambdaTools/replayLoadTest.py --synthetic --clients a,b --navigators cn1 --url http://127.0.0.1:8080/dbHandling
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Read-heavy mix matching what the app screens call most often
+SYNTHETIC_MIX = [
+    (30, 'get_user_role', lambda clients, navigators: {'username': random.choice(clients)}),
+    (20, 'get_user_status', lambda clients, navigators: {'username': random.choice(clients)}),
+    (15, 'get_active_appointment', lambda clients, navigators: {'client_username': random.choice(clients)}),
+    (10, 'get_client_details', lambda clients, navigators: {'username': random.choice(clients)}),
+    (10, 'get_care_navigator_clients', lambda clients, navigators: {'care_navigator_username': random.choice(navigators)}),
+    (10, 'get_client_readiness_details', lambda clients, navigators: {'client_username': random.choice(clients)}),
+    (5, 'get_navigator_appointment_history', lambda clients, navigators: {'care_navigator_username': random.choice(navigators)}),
+]
+
+def load_events(path):
+    events = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            event = json.loads(line)
+            # Accept API Gateway style records too
+            if 'body' in event:
+                event = json.loads(event['body']) if isinstance(event['body'], str) else event['body']
+            events.append({'action': event['action'], 'data': event.get('data', {})})
+    return events
+
+def synthetic_events(count, clients, navigators):
+    weights = [weight for weight, _, _ in SYNTHETIC_MIX]
+    events = []
+    for _ in range(count):
+        _, action, make_data = random.choices(SYNTHETIC_MIX, weights=weights)[0]
+        events.append({'action': action, 'data': make_data(clients, navigators)})
+    return events
+
+class InProcessTarget:
+    def __init__(self):
+        sys.path[:0] = [os.path.join(REPO_ROOT, 'DB_Handling'), os.path.join(REPO_ROOT, 'LambdaShared')]
+        # Replayed events carry no access tokens
+        os.environ.setdefault('DB_AUTH_MODE', 'off')
+        import lambdaDBHandling
+        self.handler = lambdaDBHandling.lambda_handler
+
+    def send(self, event):
+        return self.handler(event, None)['statusCode']
+
+class HttpTarget:
+    # One keep-alive connection per worker thread
+
+    def __init__(self, url):
+        self.url = urlparse(url)
+        self.local = threading.local()
+
+    def connection(self):
+        if getattr(self.local, 'conn', None) is None:
+            conn_class = http.client.HTTPSConnection if self.url.scheme == 'https' else http.client.HTTPConnection
+            self.local.conn = conn_class(self.url.netloc, timeout=30)
+        return self.local.conn
+
+    def send(self, event):
+        body = json.dumps(event)
+        try:
+            conn = self.connection()
+            conn.request('POST', self.url.path or '/', body, {'Content-Type': 'application/json'})
+            result = conn.getresponse()
+            result.read()
+            return result.status
+        except (http.client.HTTPException, OSError):
+            # Drop the broken connection so the next request reconnects
+            self.local.conn = None
+            raise
+
+def run_load(target, events, concurrency, duration, ramp_up):
+    stats = OperationStats()
+    stream = itertools.cycle(events) if duration else iter(events)
+    stream_lock = threading.Lock()
+    start = time.perf_counter()
+    deadline = start + duration if duration else None
+
+    def next_event():
+        with stream_lock:
+            return next(stream, None)
+
+    def worker(index):
+        # Spread worker start times evenly over the ramp-up period
+        if ramp_up:
+            time.sleep(ramp_up * index / concurrency)
+        while deadline is None or time.perf_counter() < deadline:
+            event = next_event()
+            if event is None:
+                return
+            sent = time.perf_counter()
+            try:
+                status_code = target.send(event)
+                stats.record(event['action'], time.perf_counter() - sent, status_code=status_code)
+            except Exception as e:
+                stats.record(event['action'], time.perf_counter() - sent, error=str(e))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker, index) for index in range(concurrency)]:
+            future.result()
+
+    return stats, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay {action, data} events against lambdaDBHandling')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--events', help='JSON lines file of recorded events')
+    source.add_argument('--synthetic', action='store_true', help='Generate a read-heavy synthetic mix')
+    parser.add_argument('--synthetic-count', type=int, default=1000, help='Synthetic events to generate')
+    parser.add_argument('--clients', default='', help='Comma separated client usernames for --synthetic')
+    parser.add_argument('--navigators', default='', help='Comma separated navigator usernames for --synthetic')
+    parser.add_argument('--url', help='Replay over HTTP to this URL instead of calling lambda_handler in-process')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--duration', type=float, default=0, help='Seconds to keep replaying (0 = replay once)')
+    parser.add_argument('--ramp-up', type=float, default=0, help='Seconds over which workers are started')
+    parser.add_argument('--json', help='Also write the per-action summary to this file')
+    args = parser.parse_args()
+
+    if args.events:
+        events = load_events(args.events)
+    else:
+        clients = [c for c in args.clients.split(',') if c]
+        navigators = [n for n in args.navigators.split(',') if n]
+        if not clients or not navigators:
+            parser.error('--synthetic needs --clients and --navigators')
+        events = synthetic_events(args.synthetic_count, clients, navigators)
+    if not events:
+        parser.error('No events to replay')
+
+    target = HttpTarget(args.url) if args.url else InProcessTarget()
+    stats, elapsed = run_load(target, events, args.concurrency, args.duration, args.ramp_up)
+    rows = stats.print_report(elapsed)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'elapsed_s': elapsed, 'concurrency': args.concurrency, 'actions': rows}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
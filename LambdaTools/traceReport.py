@@ -0,0 +1,187 @@
+import argparse
+import json
+import sys
+
+from latencyStats import LatencyHistogram
+
+# Flame-style summaries of the trace lines written by tracing.py
+# (LambdaShared/, bundled into LambdaFuncsAuth and DB_Handling).
+#
+# Traces are grouped per handler and DB action. For each group every span
+# path (handler > db.connect, handler > sql SELECT users, ...) is merged
+# across traces and shown as a tree with its share of the handler's total
+# time, its self time, and its share within the slowest traces only - so the
+# part that grows in the tail stands out next to the part that dominates on
+# average.
+#
+#   TRACE_SAMPLE_RATE=1 TRACE_FILE=/tmp/traces.jsonl python LambdaTools/localServer.py ...
+#   python LambdaTools/traceReport.py /tmp/traces.jsonl --tail 99
+#
+# CloudWatch exports work as they are: anything before the JSON on a line is
+# ignored, as are lines that are not traces. --folded writes collapsed stacks
+# (self time in microseconds) for flamegraph.pl or speedscope.
+
+class FlameNode:
+    def __init__(self, name):
+        self.name = name
+        self.total_ms = 0.0
+        self.self_ms = 0.0
+        self.tail_ms = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.children = {}
+
+    def child(self, name):
+        if name not in self.children:
+            self.children[name] = FlameNode(name)
+        return self.children[name]
+
+    def add(self, span, in_tail):
+        duration = span.get('duration_ms', 0)
+        children = span.get('children', [])
+        self.total_ms += duration
+        # Spans run on other threads can overlap their parent's other children
+        self.self_ms += max(duration - sum(child.get('duration_ms', 0) for child in children), 0)
+        if in_tail:
+            self.tail_ms += duration
+        self.calls += 1
+        if span.get('error'):
+            self.errors += 1
+        for child in children:
+            self.child(child['name']).add(child, in_tail)
+
+class TraceGroup:
+    def __init__(self, key):
+        self.key = key
+        self.traces = []
+        self.histogram = LatencyHistogram()
+
+    def add(self, trace):
+        self.traces.append(trace)
+        self.histogram.record(trace.get('duration_ms', 0) / 1000)
+
+    def flame(self, tail_percentile):
+        # Traces at or above the percentile count as the tail
+        threshold = self.histogram.percentile_ms(tail_percentile)
+        root = FlameNode(self.traces[0]['name'])
+        tail_count = 0
+        for trace in self.traces:
+            in_tail = trace.get('duration_ms', 0) >= threshold
+            tail_count += in_tail
+            root.add(trace, in_tail)
+        return root, tail_count
+
+def parse_line(line):
+    start = line.find('{')
+    if start < 0:
+        return None
+    try:
+        record = json.loads(line[start:])
+    except ValueError:
+        return None
+    if not isinstance(record, dict) or record.get('type') != 'trace':
+        return None
+    return record
+
+def read_traces(paths):
+    for path in paths:
+        with (sys.stdin if path == '-' else open(path)) as f:
+            for line in f:
+                trace = parse_line(line)
+                if trace is not None:
+                    yield trace
+
+def group_key(trace):
+    action = (trace.get('attrs') or {}).get('action')
+    return f"{trace['name']} {action}" if action else trace['name']
+
+def group_traces(traces, action_filter=None):
+    groups = {}
+    for trace in traces:
+        key = group_key(trace)
+        if action_filter and action_filter not in key:
+            continue
+        if key not in groups:
+            groups[key] = TraceGroup(key)
+        groups[key].add(trace)
+    return sorted(groups.values(), key=lambda group: -len(group.traces))
+
+def flame_rows(node, root, tail_count, trace_count, min_share, depth=0):
+    # Depth-first rows of the merged tree, largest children first
+    share = node.total_ms / root.total_ms * 100 if root.total_ms else 0
+    tail_share = node.tail_ms / root.tail_ms * 100 if root.tail_ms else 0
+    if depth and max(share, tail_share) < min_share:
+        return []
+    rows = [{
+        'depth': depth,
+        'name': node.name,
+        'share': share,
+        'self_share': node.self_ms / root.total_ms * 100 if root.total_ms else 0,
+        'tail_share': tail_share,
+        'avg_ms': node.total_ms / trace_count,
+        'tail_avg_ms': node.tail_ms / tail_count if tail_count else 0,
+        'calls': node.calls / trace_count,
+        'errors': node.errors
+    }]
+    for child in sorted(node.children.values(), key=lambda child: -child.total_ms):
+        rows.extend(flame_rows(child, root, tail_count, trace_count, min_share, depth + 1))
+    return rows
+
+def print_group(group, tail_percentile, min_share):
+    histogram = group.histogram
+    print(f"{group.key}  traces {len(group.traces)}  "
+          f"p50 {histogram.percentile_ms(50):.1f}ms  p95 {histogram.percentile_ms(95):.1f}ms  "
+          f"p99 {histogram.percentile_ms(99):.1f}ms  max {histogram.max_us / 1000:.1f}ms")
+
+    root, tail_count = group.flame(tail_percentile)
+    print(f"  {'total':>6} {'self':>6} {'p' + format(tail_percentile, 'g') + '+':>6} "
+          f"{'avg ms':>8} {'tail ms':>8} {'calls':>6}  span")
+    for row in flame_rows(root, root, tail_count, len(group.traces), min_share):
+        errors = f"  ({row['errors']} errors)" if row['errors'] else ''
+        print(f"  {row['share']:5.1f}% {row['self_share']:5.1f}% {row['tail_share']:5.1f}% "
+              f"{row['avg_ms']:8.2f} {row['tail_avg_ms']:8.2f} {row['calls']:6.1f}  "
+              f"{'  ' * row['depth']}{row['name']}{errors}")
+    print()
+
+def folded_lines(group):
+    # "group;span;child <self time in us>" per merged path
+    root, _ = group.flame(100)
+    lines = []
+
+    def walk(node, prefix):
+        path = f"{prefix};{node.name}" if prefix else node.name
+        if node.self_ms:
+            lines.append(f"{path} {round(node.self_ms * 1000)}")
+        for child in node.children.values():
+            walk(child, path)
+
+    # Keep the action in the root frame, so actions don't merge
+    root.name = group.key.replace(' ', ':')
+    walk(root, '')
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize tracing.py trace lines per handler and action')
+    parser.add_argument('files', nargs='+', help="Trace files (JSON lines, CloudWatch exports); '-' for stdin")
+    parser.add_argument('--action', help='Only groups whose handler/action contains this text')
+    parser.add_argument('--tail', type=float, default=95, help='Percentile from which traces count as tail (default 95)')
+    parser.add_argument('--min-share', type=float, default=1.0,
+                        help='Hide spans below this percentage of total and tail time (default 1)')
+    parser.add_argument('--folded', help='Also write collapsed stacks to this file')
+    args = parser.parse_args()
+
+    groups = group_traces(read_traces(args.files), args.action)
+    if not groups:
+        print("No traces found")
+        return
+
+    for group in groups:
+        print_group(group, args.tail, args.min_share)
+
+    if args.folded:
+        with open(args.folded, 'w') as f:
+            for group in groups:
+                f.write('\n'.join(folded_lines(group)) + '\n')
+
+if __name__ == "__main__":
+    main()
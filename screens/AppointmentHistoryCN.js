@@ -18,6 +18,7 @@ import { LinearGradient } from "expo-linear-gradient";
 import { useFocusEffect } from "@react-navigation/native";
 import { useAutomaticLogout } from "../screens/AutoLogout";
 import AsyncStorage from "@react-native-async-storage/async-storage";
+import { dbHandlingHeaders } from "../utils/dbHandling";
 
 const API_ENDPOINT =
   "https://uqzl6jyqvg.execute-api.ap-south-1.amazonaws.com/dev";
@@ -99,9 +100,7 @@ const AppointmentHistoryCN = ({ navigation }) => {
 
       const response = await fetch(`${API_ENDPOINT}/dbHandling`, {
         method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
+        headers: await dbHandlingHeaders(),
         body: JSON.stringify({
           action: "get_navigator_clients",
           data: {
@@ -157,9 +156,7 @@ const AppointmentHistoryCN = ({ navigation }) => {
 
       const response = await fetch(`${API_ENDPOINT}/dbHandling`, {
         method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
+        headers: await dbHandlingHeaders(),
         body: JSON.stringify({
           action: "get_client_appointment_history",
           data: {
@@ -224,9 +221,7 @@ const AppointmentHistoryCN = ({ navigation }) => {
 
       const response = await fetch(`${API_ENDPOINT}/dbHandling`, {
         method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
+        headers: await dbHandlingHeaders(),
         body: JSON.stringify({
           action: "get_navigator_appointment_history",
           data: {
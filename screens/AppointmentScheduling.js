@@ -16,6 +16,7 @@ import AsyncStorage from "@react-native-async-storage/async-storage";
 import { useFocusEffect } from "@react-navigation/native";
 import { useAutomaticLogout } from "../screens/AutoLogout";
 import { sendNotificationToUser } from "../utils/NotificationHandler";
+import { dbHandlingHeaders } from "../utils/dbHandling";
 
 const API_ENDPOINT =
   "https://uqzl6jyqvg.execute-api.ap-south-1.amazonaws.com/dev";
@@ -88,9 +89,7 @@ const AppointmentScheduling = ({ navigation }) => {
 
       const response = await fetch(`${API_ENDPOINT}/dbHandling`, {
         method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
+        headers: await dbHandlingHeaders(),
         body: JSON.stringify({
           action: "get_client_cn_calendly",
           data: {
@@ -189,7 +188,12 @@ const AppointmentScheduling = ({ navigation }) => {
 
         console.log("Processing booking:", bookingId);
         saveBookingData(data.data)
-          .then(() => {
+          .then((saved) => {
+            if (!saved) {
+              // saveBookingData has already told the user what went wrong
+              processedBookingIds.current.delete(bookingId);
+              return;
+            }
             Alert.alert(
               "Booking Confirmed",
               "Your appointment has been scheduled successfully!"
@@ -205,6 +209,14 @@ const AppointmentScheduling = ({ navigation }) => {
     }
   };
 
+  // Calendly's own cancellation page for the invitee of a booking response
+  const calendlyCancelUrl = (bookingData) => {
+    const inviteeUuid = bookingData?.invitee?.uuid;
+    return inviteeUuid
+      ? `https://calendly.com/cancellations/${inviteeUuid}`
+      : null;
+  };
+
   const saveBookingData = async (bookingData) => {
     try {
       // Extract the start_time from the response
@@ -254,9 +266,7 @@ const AppointmentScheduling = ({ navigation }) => {
       // Save directly to the database
       const response = await fetch(`${API_ENDPOINT}/dbHandling`, {
         method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
+        headers: await dbHandlingHeaders(),
         body: JSON.stringify({
           action: "create_appointment",
           data: {
@@ -305,6 +315,31 @@ const AppointmentScheduling = ({ navigation }) => {
         await AsyncStorage.setItem("hasAppointment", "true");
 
         return true;
+      } else if (result.statusCode === 409) {
+        // The database rejected an overlapping booking, but Calendly has
+        // already booked it, so the Calendly event has to be cancelled too
+        const cancelUrl = calendlyCancelUrl(bookingData);
+        if (cancelUrl) {
+          Alert.alert(
+            "Time Unavailable",
+            "You or your care navigator already have an appointment at this time. Please cancel this Calendly booking, then choose another time.",
+            [
+              {
+                text: "Cancel Booking",
+                onPress: () =>
+                  webViewRef.current?.injectJavaScript(
+                    `window.location.href = ${JSON.stringify(cancelUrl)}; true;`
+                  ),
+              },
+            ]
+          );
+        } else {
+          Alert.alert(
+            "Time Unavailable",
+            "You or your care navigator already have an appointment at this time. Please cancel this booking using the link in your Calendly confirmation email, then choose another time."
+          );
+        }
+        return false;
       } else {
         throw new Error(
           result.body?.error || "Failed to create appointment in database"
@@ -331,6 +331,9 @@ export const AutomaticLogoutScreen = ({ navigation }) => {
         return;
       }
 
+      // The refresh token lets the server drop its cached refresh result
+      const refreshToken = await AsyncStorage.getItem("refreshToken");
+
       // Call the logout API endpoint
       const response = await fetch(SIGNOUT_API_ENDPOINT, {
         method: "POST",
@@ -339,6 +342,7 @@ export const AutomaticLogoutScreen = ({ navigation }) => {
         },
         body: JSON.stringify({
           accessToken: accessToken,
+          refreshToken: refreshToken,
         }),
       });
 
@@ -15,6 +15,7 @@ import { LinearGradient } from "expo-linear-gradient";
 import { useFocusEffect } from "@react-navigation/native";
 import { useAutomaticLogout } from "../screens/AutoLogout";
 import AsyncStorage from "@react-native-async-storage/async-storage";
+import { dbHandlingHeaders } from "../utils/dbHandling";
 
 const API_ENDPOINT =
   "https://uqzl6jyqvg.execute-api.ap-south-1.amazonaws.com/dev";
@@ -83,9 +84,7 @@ const CalendarCN = ({ navigation }) => {
 
       const response = await fetch(`${API_ENDPOINT}/dbHandling`, {
         method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
+        headers: await dbHandlingHeaders(),
         body: JSON.stringify({
           action: "get_cn_calendly_name",
           data: {
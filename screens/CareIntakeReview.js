@@ -13,6 +13,7 @@ import {
   useColorScheme,
 } from "react-native";
 import AsyncStorage from "@react-native-async-storage/async-storage";
+import { dbHandlingHeaders } from "../utils/dbHandling";
 
 const API_ENDPOINT =
   "https://uqzl6jyqvg.execute-api.ap-south-1.amazonaws.com/dev";
@@ -182,9 +183,7 @@ const CareIntakeReview = ({ navigation, route }) => {
       // Calling the Lambda function through API Gateway for care navigator assignment
       const response = await fetch(`${API_ENDPOINT}/dbHandling`, {
         method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
+        headers: await dbHandlingHeaders(),
         body: JSON.stringify({
           action: "assign_care_navigator",
           data: {
@@ -285,9 +284,7 @@ const CareIntakeReview = ({ navigation, route }) => {
       }
       const updateActive = await fetch(`${API_ENDPOINT}/dbHandling`, {
         method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
+        headers: await dbHandlingHeaders(),
         body: JSON.stringify({
           action: "active_user",
           data: {
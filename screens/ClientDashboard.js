@@ -23,6 +23,7 @@ import { LinearGradient } from "expo-linear-gradient";
 import { useFocusEffect } from "@react-navigation/native";
 import { useAutomaticLogout } from "../screens/AutoLogout";
 import AsyncStorage from "@react-native-async-storage/async-storage";
+import { dbHandlingHeaders } from "../utils/dbHandling";
 
 const API_ENDPOINT =
   "https://uqzl6jyqvg.execute-api.ap-south-1.amazonaws.com/dev";
@@ -66,9 +67,7 @@ const ClientDashboard = ({ navigation }) => {
           try {
             const response = await fetch(`${API_ENDPOINT}/dbHandling`, {
               method: "POST",
-              headers: {
-                "Content-Type": "application/json",
-              },
+              headers: await dbHandlingHeaders(),
               body: JSON.stringify({
                 action: "get_client_care_plan",
                 data: {
@@ -126,9 +125,7 @@ const ClientDashboard = ({ navigation }) => {
         // Fetch active appointment from database
         const response = await fetch(`${API_ENDPOINT}/dbHandling`, {
           method: "POST",
-          headers: {
-            "Content-Type": "application/json",
-          },
+          headers: await dbHandlingHeaders(),
           body: JSON.stringify({
             action: "get_active_appointment",
             data: {
@@ -215,9 +212,7 @@ const ClientDashboard = ({ navigation }) => {
           try {
             const response = await fetch(`${API_ENDPOINT}/dbHandling`, {
               method: "POST",
-              headers: {
-                "Content-Type": "application/json",
-              },
+              headers: await dbHandlingHeaders(),
               body: JSON.stringify({
                 action: "complete_appointment",
                 data: {
@@ -18,6 +18,7 @@ import { LinearGradient } from "expo-linear-gradient";
 import { useFocusEffect } from "@react-navigation/native";
 import { useAutomaticLogout } from "../screens/AutoLogout";
 import { sendAppointmentCancellationNotification } from "../utils/NotificationHandler";
+import { dbHandlingHeaders } from "../utils/dbHandling";
 
 const API_ENDPOINT =
   "https://uqzl6jyqvg.execute-api.ap-south-1.amazonaws.com/dev";
@@ -68,9 +69,7 @@ const HandleAppointmentsCN = ({ navigation }) => {
     try {
       const response = await fetch(`${API_ENDPOINT}/dbHandling`, {
         method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
+        headers: await dbHandlingHeaders(),
         body: JSON.stringify({
           action: "cancel_appointment",
           data: {
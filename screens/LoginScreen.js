@@ -16,6 +16,7 @@ import { Ionicons } from "@expo/vector-icons";
 import { LinearGradient } from "expo-linear-gradient";
 import { useResetTimerOnLogin } from "./AutoLogout";
 import AsyncStorage from "@react-native-async-storage/async-storage";
+import { dbHandlingHeaders } from "../utils/dbHandling";
 
 const API_ENDPOINT =
   "https://uqzl6jyqvg.execute-api.ap-south-1.amazonaws.com/dev";
@@ -48,6 +49,30 @@ const LoginScreen = ({ navigation }) => {
     return isValid;
   };
 
+  // Single users table lookup through the DB Lambda
+  const fetchUserField = async (action) => {
+    const fieldResponse = await fetch(`${API_ENDPOINT}/dbHandling`, {
+      method: "POST",
+      headers: await dbHandlingHeaders(),
+      body: JSON.stringify({
+        action: action,
+        data: {
+          username: username.trim(),
+        },
+      }),
+    });
+
+    const fieldResult = await fieldResponse.json();
+
+    if (!fieldResult.body) {
+      throw new Error("Invalid server response format");
+    }
+
+    return typeof fieldResult.body === "string"
+      ? JSON.parse(fieldResult.body)
+      : fieldResult.body;
+  };
+
   const handleLogin = async () => {
     if (validateForm()) {
       setIsLoading(true);
@@ -64,6 +89,7 @@ const LoginScreen = ({ navigation }) => {
           body: JSON.stringify({
             username: username.trim(),
             password: password,
+            includeProfile: true,
           }),
         });
 
@@ -152,30 +178,14 @@ const LoginScreen = ({ navigation }) => {
           // case 3: temporary password client will always be identified with the session string, so need of this case
           // case 4: CNs that need to update the profile page data will get directed to profile screen with a polite alert request to update it
 
-          try {
-            const statusResponse = await fetch(`${API_ENDPOINT}/dbHandling`, {
-              method: "POST",
-              headers: {
-                "Content-Type": "application/json",
-              },
-              body: JSON.stringify({
-                action: "get_user_status",
-                data: {
-                  username: username.trim(),
-                },
-              }),
-            });
-
-            const statusResult = await statusResponse.json();
-
-            if (!statusResult.body) {
-              throw new Error("Invalid server response format");
-            }
+          // Role and status come back with the sign-in (includeProfile) when the
+          // server could fetch them; otherwise they are looked up separately
+          const profile = parsedBody.user;
 
-            const parsedStatusResult =
-              typeof statusResult.body === "string"
-                ? JSON.parse(statusResult.body)
-                : statusResult.body;
+          try {
+            const parsedStatusResult = profile
+              ? { status: profile.status }
+              : await fetchUserField("get_user_status");
 
             if (
               parsedStatusResult.status !== undefined &&
@@ -192,32 +202,9 @@ const LoginScreen = ({ navigation }) => {
                 });
               } else if (status === 2) {
                 try {
-                  const roleResponse = await fetch(
-                    `${API_ENDPOINT}/dbHandling`,
-                    {
-                      method: "POST",
-                      headers: {
-                        "Content-Type": "application/json",
-                      },
-                      body: JSON.stringify({
-                        action: "get_user_role",
-                        data: {
-                          username: username.trim(),
-                        },
-                      }),
-                    }
-                  );
-
-                  const roleResult = await roleResponse.json();
-
-                  if (!roleResult.body) {
-                    throw new Error("Invalid server response format");
-                  }
-
-                  const parsedRoleResult =
-                    typeof roleResult.body === "string"
-                      ? JSON.parse(roleResult.body)
-                      : roleResult.body;
+                  const parsedRoleResult = profile
+                    ? { role: profile.role }
+                    : await fetchUserField("get_user_role");
 
                   if (
                     parsedRoleResult.role !== undefined &&
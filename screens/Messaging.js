@@ -21,6 +21,7 @@ import SideNavigationCN from "../Components/SideNavigationCN";
 import BottomNavigationCN from "../Components/BottomNavigationCN";
 import { database } from "../firebaseConfig.js";
 import { ref, onValue, push, remove, ref as dbRef } from "firebase/database";
+import { dbHandlingHeaders } from "../utils/dbHandling";
 
 const API_ENDPOINT = "https://uqzl6jyqvg.execute-api.ap-south-1.amazonaws.com/dev";
 
@@ -50,7 +51,7 @@ const ChatScreen = ({ navigation, route }) => {
         try {
           const response = await fetch(`${API_ENDPOINT}/dbHandling`, {
             method: "POST",
-            headers: { "Content-Type": "application/json" },
+            headers: await dbHandlingHeaders(),
             body: JSON.stringify({
               action: "get_client_care_navigator",
               data: { client_username: userId },
@@ -16,6 +16,7 @@ import SideNavigationCN from "../Components/SideNavigationCN";
 import BottomNavigationCN from "../Components/BottomNavigationCN";
 import { database } from "../firebaseConfig.js";
 import { ref, onValue } from "firebase/database";
+import { dbHandlingHeaders } from "../utils/dbHandling";
 
 const DB_API_ENDPOINT = "https://uqzl6jyqvg.execute-api.ap-south-1.amazonaws.com/dev/dbHandling";
 
@@ -33,9 +34,7 @@ const MessagingCN = ({ navigation }) => {
     try {
       const dbResponse = await fetch(DB_API_ENDPOINT, {
         method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
+        headers: await dbHandlingHeaders(),
         body: JSON.stringify({
           action: "get_client_details",
           data: {
@@ -81,7 +80,7 @@ const MessagingCN = ({ navigation }) => {
           "https://uqzl6jyqvg.execute-api.ap-south-1.amazonaws.com/dev/dbHandling",
           {
             method: "POST",
-            headers: { "Content-Type": "application/json" },
+            headers: await dbHandlingHeaders(),
             body: JSON.stringify({
               action: "get_care_navigator_clients",
               data: { care_navigator_username: storedId },
@@ -21,6 +21,7 @@ import { useAutomaticLogout } from "../../screens/AutoLogout";
 import { useFocusEffect } from "@react-navigation/native";
 import AsyncStorage from "@react-native-async-storage/async-storage";
 import DateTimePicker from "@react-native-community/datetimepicker";
+import { dbHandlingHeaders } from "../../utils/dbHandling";
 
 const DB_API_ENDPOINT =
   "https://uqzl6jyqvg.execute-api.ap-south-1.amazonaws.com/dev/dbHandling";
@@ -103,9 +104,7 @@ const EditProfile = ({ navigation }) => {
           // Fetch fresh data from database
           const dbResponse = await fetch(DB_API_ENDPOINT, {
             method: "POST",
-            headers: {
-              "Content-Type": "application/json",
-            },
+            headers: await dbHandlingHeaders(),
             body: JSON.stringify({
               action: isCareNavigator ? "get_cn_details" : "get_client_details",
               data: {
@@ -271,9 +270,7 @@ const EditProfile = ({ navigation }) => {
     try {
       const statusResponse = await fetch(DB_API_ENDPOINT, {
         method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
+        headers: await dbHandlingHeaders(),
         body: JSON.stringify({
           action: "get_user_status",
           data: {
@@ -303,9 +300,7 @@ const EditProfile = ({ navigation }) => {
           const appUser = await AsyncStorage.getItem("appUser");
           const activeCNResponse = await fetch(DB_API_ENDPOINT, {
             method: "POST",
-            headers: {
-              "Content-Type": "application/json",
-            },
+            headers: await dbHandlingHeaders(),
             body: JSON.stringify({
               action: "active_user",
               data: {
@@ -336,9 +331,7 @@ const EditProfile = ({ navigation }) => {
 
       const response = await fetch(DB_API_ENDPOINT, {
         method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
+        headers: await dbHandlingHeaders(),
         body: JSON.stringify({
           action: action,
           data: {
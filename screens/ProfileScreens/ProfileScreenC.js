@@ -18,6 +18,7 @@ import { Ionicons, MaterialIcons, Feather } from "@expo/vector-icons";
 import { LinearGradient } from "expo-linear-gradient";
 import { useAutomaticLogout } from "../../screens/AutoLogout";
 import { useFocusEffect } from "@react-navigation/native";
+import { dbHandlingHeaders } from "../../utils/dbHandling";
 
 const SIGNOUT_API_ENDPOINT =
   "https://uqzl6jyqvg.execute-api.ap-south-1.amazonaws.com/dev/signOut";
@@ -80,9 +81,7 @@ const ProfileScreenC = ({ navigation }) => {
           // Fetch client details from database
           const dbResponse = await fetch(DB_API_ENDPOINT, {
             method: "POST",
-            headers: {
-              "Content-Type": "application/json",
-            },
+            headers: await dbHandlingHeaders(),
             body: JSON.stringify({
               action: "get_client_details",
               data: {
@@ -367,6 +366,9 @@ const ProfileScreenC = ({ navigation }) => {
         return;
       }
 
+      // The refresh token lets the server drop its cached refresh result
+      const refreshToken = await AsyncStorage.getItem("refreshToken");
+
       // Call the logout API endpoint
       const response = await fetch(SIGNOUT_API_ENDPOINT, {
         method: "POST",
@@ -375,6 +377,7 @@ const ProfileScreenC = ({ navigation }) => {
         },
         body: JSON.stringify({
           accessToken: accessToken,
+          refreshToken: refreshToken,
         }),
       });
 
@@ -18,6 +18,7 @@ import { Ionicons, MaterialIcons, Feather } from "@expo/vector-icons";
 import { LinearGradient } from "expo-linear-gradient";
 import { useAutomaticLogout } from "../../screens/AutoLogout";
 import { useFocusEffect } from "@react-navigation/native";
+import { dbHandlingHeaders } from "../../utils/dbHandling";
 
 const SIGNOUT_API_ENDPOINT =
   "https://uqzl6jyqvg.execute-api.ap-south-1.amazonaws.com/dev/signOut";
@@ -80,9 +81,7 @@ const ProfileScreenCN = ({ navigation }) => {
           // Fetch client details from database
           const dbResponse = await fetch(DB_API_ENDPOINT, {
             method: "POST",
-            headers: {
-              "Content-Type": "application/json",
-            },
+            headers: await dbHandlingHeaders(),
             body: JSON.stringify({
               action: "get_cn_details",
               data: {
@@ -366,6 +365,9 @@ const ProfileScreenCN = ({ navigation }) => {
         return;
       }
 
+      // The refresh token lets the server drop its cached refresh result
+      const refreshToken = await AsyncStorage.getItem("refreshToken");
+
       const response = await fetch(SIGNOUT_API_ENDPOINT, {
         method: "POST",
         headers: {
@@ -373,6 +375,7 @@ const ProfileScreenCN = ({ navigation }) => {
         },
         body: JSON.stringify({
           accessToken: accessToken,
+          refreshToken: refreshToken,
         }),
       });
 
@@ -16,7 +16,7 @@ import {
 } from "react-native";
 import { Ionicons } from "@expo/vector-icons";
 import { LinearGradient } from "expo-linear-gradient";
-import { signUp, confirmSignUp, resendSignUpCode } from "aws-amplify/auth";
+import { confirmSignUp, resendSignUpCode } from "aws-amplify/auth";
 
 const API_ENDPOINT =
   "https://uqzl6jyqvg.execute-api.ap-south-1.amazonaws.com/dev";
@@ -80,48 +80,64 @@ export const SignUpScreen = ({ navigation }) => {
       setIsLoading(true);
 
       try {
-        // Sign up the user with Cognito
-        console.log(`${username} ${email} ${password}`);
-
-        const signUpResponse = await signUp({
-          username: username,
-          password: password,
-          options: {
-            userAttributes: {
-              email: email,
-              preferred_username: username,
-            },
+        // Sign up through the auth Lambda, which also creates the users row
+        // and removes the Cognito user again if that insert fails
+        const signUpResponse = await fetch(`${API_ENDPOINT}/signUp`, {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json",
           },
+          body: JSON.stringify({
+            username: username,
+            password: password,
+            email: email,
+          }),
         });
-        console.log("User signed up successfully:", signUpResponse);
-
-        const createdAt = new Date()
-          .toLocaleString("sv-SE", {
-            timeZone: "Asia/Colombo",
-          })
-          .replace(" ", "T");
-
-        const dbCreateUserResponse = await fetch(
-          `${API_ENDPOINT}/dbHandling `,
-          {
-            method: "POST",
-            headers: {
-              "Content-Type": "application/json",
-            },
-            body: JSON.stringify({
-              action: "create_user",
-              data: {
-                username: username.trim().toLowerCase(),
-                email: email,
-                role: 0,
-                status: 0,
-                calendly_name: null,
-                created_at: createdAt,
+        const signUpResult = await signUpResponse.json();
+        const parsedBody =
+          typeof signUpResult.body === "string"
+            ? JSON.parse(signUpResult.body)
+            : signUpResult;
+        console.log("Sign up response:", parsedBody);
+
+        if (!parsedBody.success) {
+          const error = new Error(parsedBody.message);
+          error.name = parsedBody.code;
+          throw error;
+        }
+
+        // Deployments without the DB handler configured leave the profile to the app.
+        // There is no access token yet, so the DB handler only accepts this
+        // while it runs with DB_AUTH_MODE=optional
+        if (!parsedBody.profileCreated) {
+          const createdAt = new Date()
+            .toLocaleString("sv-SE", {
+              timeZone: "Asia/Colombo",
+            })
+            .replace(" ", "T");
+
+          const dbCreateUserResponse = await fetch(
+            `${API_ENDPOINT}/dbHandling `,
+            {
+              method: "POST",
+              headers: {
+                "Content-Type": "application/json",
               },
-            }),
-          }
-        );
-        console.log("User saved into DB:", dbCreateUserResponse);
+              body: JSON.stringify({
+                action: "create_user",
+                data: {
+                  username: username.trim().toLowerCase(),
+                  email: email,
+                  role: 0,
+                  status: 0,
+                  calendly_name: null,
+                  created_at: createdAt,
+                },
+              }),
+            }
+          );
+          console.log("User saved into DB:", dbCreateUserResponse);
+        }
 
         // Navigate to verification screen on success
         setIsLoading(false);
@@ -18,6 +18,7 @@ import { LinearGradient } from "expo-linear-gradient";
 import { useFocusEffect } from "@react-navigation/native";
 import { useAutomaticLogout } from "../screens/AutoLogout";
 import AsyncStorage from "@react-native-async-storage/async-storage";
+import { dbHandlingHeaders } from "../utils/dbHandling";
 
 const API_ENDPOINT =
   "https://uqzl6jyqvg.execute-api.ap-south-1.amazonaws.com/dev";
@@ -31,6 +32,9 @@ const ViewReadinessDetailsCN = ({ navigation }) => {
   const [error, setError] = useState("");
   const [selectedClient, setSelectedClient] = useState(null);
   const [readinessDetails, setReadinessDetails] = useState(null);
+  // Readiness of every listed client, fetched in one request; null for
+  // clients without an active appointment
+  const [readinessByClient, setReadinessByClient] = useState({});
 
   const questions = [
     "Experiencing any new or worsening symptoms?",
@@ -108,9 +112,7 @@ const ViewReadinessDetailsCN = ({ navigation }) => {
 
       const response = await fetch(`${API_ENDPOINT}/dbHandling`, {
         method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
+        headers: await dbHandlingHeaders(),
         body: JSON.stringify({
           action: "get_navigator_clients",
           data: {
@@ -128,6 +130,10 @@ const ViewReadinessDetailsCN = ({ navigation }) => {
         setClientsList(parsedResult.data);
         if (parsedResult.data.length === 0) {
           setError("No clients assigned to you");
+        } else {
+          await loadCaseloadReadiness(
+            parsedResult.data.map((client) => client.client_username)
+          );
         }
       } else {
         console.warn("Failed to load clients list:", parsedResult);
@@ -145,6 +151,45 @@ const ViewReadinessDetailsCN = ({ navigation }) => {
     }
   };
 
+  // Load readiness details for the whole caseload at once
+  const loadCaseloadReadiness = async (clientUsernames) => {
+    try {
+      const response = await fetch(`${API_ENDPOINT}/dbHandling`, {
+        method: "POST",
+        headers: await dbHandlingHeaders(),
+        body: JSON.stringify({
+          action: "get_clients_readiness_details",
+          data: {
+            client_usernames: clientUsernames,
+          },
+        }),
+      });
+
+      const result = await response.json();
+      const parsedBody =
+        typeof result.body === "string" ? JSON.parse(result.body) : result.body;
+
+      if (result.statusCode === 200 && parsedBody?.data) {
+        // Keyed the way viewClientReadinessDetails looks clients up
+        const byClient = {};
+        parsedBody.data.forEach((details) => {
+          byClient[details.client_username.trim().toLowerCase()] = details;
+        });
+        (parsedBody.not_found || []).forEach((clientUsername) => {
+          byClient[clientUsername.trim().toLowerCase()] = null;
+        });
+        setReadinessByClient(byClient);
+      } else {
+        console.warn("Failed to load caseload readiness:", parsedBody);
+        setReadinessByClient({});
+      }
+    } catch (error) {
+      // Details are then fetched per client when selected
+      console.error("Error loading caseload readiness:", error);
+      setReadinessByClient({});
+    }
+  };
+
   // Handle refresh
   const handleRefresh = useCallback(async () => {
     setIsRefreshing(true);
@@ -155,6 +200,21 @@ const ViewReadinessDetailsCN = ({ navigation }) => {
   // View readiness details for a specific client
   const viewClientReadinessDetails = async (clientUsername) => {
     resetTimer();
+    const username = clientUsername.trim().toLowerCase();
+    if (username in readinessByClient) {
+      if (readinessByClient[username]) {
+        setReadinessDetails(readinessByClient[username]);
+        setSelectedClient(clientUsername);
+      } else {
+        Alert.alert(
+          "No Data",
+          `No active appointment or readiness questionnaire found for ${clientUsername}`
+        );
+        setReadinessDetails(null);
+        setSelectedClient(null);
+      }
+      return;
+    }
     try {
       setIsLoading(true);
       setError("");
@@ -166,9 +226,7 @@ const ViewReadinessDetailsCN = ({ navigation }) => {
 
       const response = await fetch(`${API_ENDPOINT}/dbHandling`, {
         method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
+        headers: await dbHandlingHeaders(),
         body: JSON.stringify({
           action: "get_client_readiness_details",
           data: {
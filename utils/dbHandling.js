@@ -0,0 +1,13 @@
+import AsyncStorage from "@react-native-async-storage/async-storage";
+
+// Headers for requests to the DB handling Lambda (/dbHandling). The signed-in
+// user's Cognito access token goes along as a bearer token, and the handler
+// takes the caller's username from it instead of from the request body.
+export const dbHandlingHeaders = async () => {
+  const accessToken = await AsyncStorage.getItem("accessToken");
+  const headers = { "Content-Type": "application/json" };
+  if (accessToken) {
+    headers.Authorization = `Bearer ${accessToken}`;
+  }
+  return headers;
+};